@@ -1,10 +1,15 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 import os
+import json
+import base64
 import logging
+import threading
+from typing import Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -12,7 +17,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import Jarvis
-from interactive_agent import InteractiveAgent
+from vision_agent.interactive_agent import InteractiveAgent
+from vision_agent.modules.llm_gateway import LLMGateway
+from vision_agent.modules.audio_store import AudioStore, parse_range
+from vision_agent.modules.session_manager import SessionManager
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -28,61 +36,163 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """Compresses JSON/HTML. SSE must flush per event, and audio is already compressed."""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(("/chat/stream", "/audio/")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=500)
+
 # Initialize Agent in API Mode (No Voice/Vision Hardware Hooks)
 print("Initializing Jarvis in API Mode...")
 agent = InteractiveAgent(api_mode=True)
 print("Jarvis Online.")
+audio_store = AudioStore()
+sessions = SessionManager(agent)  # Per-client history/model/audio; the agent's heavy parts are shared
 
 # Models
 class ChatRequest(BaseModel):
     message: str
+    inline_audio: bool = False  # Legacy clients: base64 WAV in the JSON instead of audio_url
+    session_id: Optional[str] = None  # Returned by the first response; omit to start a new session
+
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
+import asyncio
 
-from fastapi.concurrency import run_in_threadpool
+async def store_audio(audio_base64):
+    """Moves a synthesized clip out of the JSON: compressed once, fetched from /audio/{id}."""
+    if not audio_base64:
+        return None
+    clip_id = await run_in_threadpool(audio_store.put, base64.b64decode(audio_base64))
+    return f"/audio/{clip_id}"
 
 @app.post("/chat")
 async def chat(request: ChatRequest):
     user_message = request.message
-    print(f"📱 Mobile User: {user_message}")
+    session = sessions.get(request.session_id)
+    print(f"📱 Mobile User [{session.id}]: {user_message}")
     
     response_text = ""
     
-    # Run synchronous agent methods in a threadpool to avoid blocking the event loop
+    # Native async path: model and MCP calls are awaited on this loop, bound to this client's session
     try:
         print(f"📋 Attempting act() with command: '{user_message}'")
-        # act() is blocking, run in thread
-        act_result = await run_in_threadpool(agent.act, user_message)
+        act_result = await session.arun(agent.act_async, user_message)
         print(f"📋 act() returned: {act_result}")
         
         if act_result:
-            if hasattr(agent, 'last_response') and agent.last_response:
-                response_text = agent.last_response
+            if session.last_response:
+                response_text = session.last_response
                 print(f"📋 Using last_response: '{response_text[:50]}...'")
             else:
                 response_text = "Command executed."
         else:
             print("📋 act() returned False, using think()")
-            # think() is blocking, run in thread
-            response_text = await run_in_threadpool(agent.think, user_message)
+            response_text = await session.arun(agent.think_async, user_message)
     except Exception as e:
         print(f"❌ ERROR in act(): {e}")
         import traceback
         traceback.print_exc()
-        response_text = await run_in_threadpool(agent.think, user_message)
+        response_text = await session.arun(agent.think_async, user_message)
     
     
-    # Capture Audio
-    audio_data = None
-    if hasattr(agent, 'last_audio'):
-        audio_data = agent.last_audio
-        if audio_data:
-            print(f"🎤 Audio Data Captured: {len(audio_data)} chars")
-        else:
-            print("🎤 Audio Data is None/Empty")
-        agent.last_audio = None # Clear it
+    # Capture Audio (per session, so concurrent clients never get each other's clip)
+    audio_data = session.last_audio
+    session.last_audio = None
+    if audio_data:
+        print(f"🎤 Audio Data Captured: {len(audio_data)} chars")
     else:
-        print("🎤 No last_audio attribute found on agent")
-        
-    return {"response": response_text, "audio": audio_data}
+        print("🎤 Audio Data is None/Empty")
+
+    if request.inline_audio:
+        return {"response": response_text, "audio": audio_data, "session_id": session.id}
+    return {"response": response_text, "audio_url": await store_audio(audio_data), "session_id": session.id}
+
+def _sse(event):
+    return f"data: {json.dumps(event)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-Sent Events version of /chat.
+    Commands handled by act() arrive as a single sentence event; free-form chat
+    streams tokens and per-sentence audio from think_stream() as they are ready.
+    """
+    user_message = request.message
+    session = sessions.get(request.session_id)
+    print(f"📱 Mobile User [{session.id}] (stream): {user_message}")
+
+    async def events():
+        yield _sse({"type": "session", "session_id": session.id})
+        # The whole turn (act, then the streamed reply) holds the session lock, so a
+        # second request from the same client can't interleave with its history.
+        async with session.locked():
+            try:
+                with session.activate():
+                    act_result = await agent.act_async(user_message)
+            except Exception as e:
+                print(f"❌ ERROR in act(): {e}")
+                act_result = False
+
+            if act_result:
+                response_text = session.last_response or "Command executed."
+                audio_data = session.last_audio
+                session.last_audio = None
+                yield _sse({"type": "sentence", "text": response_text, "audio_url": await store_audio(audio_data)})
+                yield _sse({"type": "done", "response": response_text})
+                return
+
+            # Set when the client disconnects (this generator is closed), so generation and synthesis stop
+            cancel = threading.Event()
+            try:
+                async for event in iterate_in_threadpool(session.bind(agent.think_stream(user_message, cancel=cancel))):
+                    if "audio" in event:
+                        event["audio_url"] = await store_audio(event.pop("audio"))
+                    yield _sse(event)
+            finally:
+                cancel.set()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/audio/{clip_id}")
+async def get_audio(clip_id: str, request: Request):
+    """Serves a synthesized clip, with single byte-range support for media players."""
+    clip = audio_store.get(clip_id)
+    if clip is None:
+        return JSONResponse({"error": "Audio expired or not found"}, status_code=404)
+    data, content_type = clip
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=300"}
+    try:
+        byte_range = parse_range(request.headers.get("range"), len(data))
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{len(data)}"})
+    if byte_range is None:
+        return Response(data, media_type=content_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(data[start:end + 1], status_code=206, media_type=content_type, headers=headers)
+
+@app.get("/status/tasks")
+async def task_status():
+    """Queue depth and latency per priority class, plus the memory write-behind queue."""
+    return {"scheduler": agent.scheduler.metrics(), "memory_writer": agent.memory_writer.stats(), "sessions": sessions.stats()}
+
+@app.get("/status/llm")
+async def llm_status():
+    """Resident models plus per-model queue wait vs. inference time from the LLM gateway."""
+    return LLMGateway.get().metrics()
+
+@app.get("/status/startup")
+async def startup_status():
+    """Agent import/__init__ time and which subsystems have been built so far (and how long each took)."""
+    return agent.startup_report()
 
 # Serve Static Files (Mobile UI)
 os.makedirs("mobile", exist_ok=True)
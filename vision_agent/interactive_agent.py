@@ -1,5 +1,7 @@
 import time
+_IMPORT_STARTED = time.perf_counter()
 import sys
+import asyncio
 import os
 import subprocess
 import threading
@@ -8,50 +10,44 @@ import logging
 import re
 import webbrowser
 import queue
+import contextvars
 from datetime import datetime
 from ctypes import *
 from contextlib import contextmanager
-import speech_recognition as sr
-import cv2
 import os
 if "DISPLAY" not in os.environ:
     os.environ["DISPLAY"] = ":0"
 if "XAUTHORITY" not in os.environ:
     os.environ["XAUTHORITY"] = "/home/soup/.Xauthority"
-import pyautogui
-import ollama
-import mss
-from PIL import Image
+from vision_agent.modules import llm_gateway
 from colorama import Fore, Style, init
-from vision_agent.modules.alsa_utils import no_alsa_error
-import pyaudio
-from vision_agent.modules.tracker_vision import TrackerEye
 from vision_agent.memory.history_manager import HistoryManager
-from vision_agent.memory.memory_bank import MemoryBank
-from vision_agent.memory.learning_module import LearningModule
-from vision_agent.modules.neural_voice import NeuralVoice
-from vision_agent.modules.system_module import SystemModule
-from vision_agent.modules.rag_module import RAGModule
-from vision_agent.modules.wiki_module import WikiModule
-from vision_agent.modules.weather_module import WeatherModule
-from vision_agent.modules.home_automation import HomeAutomationModule
 from vision_agent.modules.intent_parser import IntentParser
-from vision_agent.modules.mcp_manager import MCPManager
-from vision_agent.modules.filesystem_mcp import FilesystemMCP
-from vision_agent.modules.automation_agent import AutomationAgent
-from vision_agent.modules.system_mcp import SystemMCP
-from vision_agent.memory.memory_archivist import MemoryArchivist
-from vision_agent.modules.vision_expert import VisionExpert
+from vision_agent.modules.sentence_chunker import SentenceChunker
+from vision_agent.modules.command_router import CommandRouter, AGENT_ROUTES
+from vision_agent.modules.task_scheduler import TaskScheduler
+from vision_agent.modules.session_manager import AgentSession, SessionAttribute
+from vision_agent.modules.capabilities import Capability, CapabilityRegistry
+# Everything else (cv2, PIL, mss, pyaudio, pyautogui, the voice/vision/memory
+# subsystems) is imported by the capability builders on first use.
 
 # Initialize
 init(autoreset=True)
-pyautogui.FAILSAFE = True
+
+IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
+
+def _gui():
+    """pyautogui, imported on the first GUI action (importing it opens an X connection)."""
+    import pyautogui
+    pyautogui.FAILSAFE = True
+    return pyautogui
 
 # Configuration
 DEFAULT_CHAT_MODEL = "dolphin-mistral"
 VISION_MODEL = "llava"
 WAKE_WORD = "jarvis"
-SCREENSHOT_PATH = "vision_input.png"
+SCREENSHOT_PATH = "vision_input.jpg"
 WEBCAM_PATH = "webcam_input.jpg"
 HISTORY_DIR = "vision_history"
 ACTIVE_TIMEOUT = 20  # Seconds to stay awake
@@ -70,6 +66,50 @@ APP_MAP = {
     "browser": "brave-browser"
 }
 
+# Spoken site names -> domains
+URL_MAP = {
+    "twitter": "x.com",
+    "x": "x.com",
+    "fb": "facebook.com",
+    "facebook": "facebook.com",
+    "youtube": "youtube.com",
+    "yt": "youtube.com",
+    "google": "google.com",
+    "reddit": "reddit.com",
+    "github": "github.com"
+}
+
+# App Alias Map (for "close X")
+KILL_MAP = {
+    "brave": "brave",
+    "brave browser": "brave",
+    "web browser": "brave",
+    "chrome": "chrome",
+    "firefox": "firefox",
+    "calculator": "gnome-calculator",
+    "spotify": "spotify",
+    "discord": "discord",
+    "terminal": "gnome-terminal",
+    "code": "code",
+    "vscode": "code"
+}
+
+# Map common spoken model names to Ollama tags
+MODEL_MAP = {
+    "mistral": "mistral",
+    "dolphin": "dolphin-mistral",
+    "qwen": "qwen2.5:7b",
+    "neural": "neural-chat",
+    "neural chat": "neural-chat",
+    "llama": "llama3.1",
+    "lava": "llava",
+    "vision": "llava"
+}
+
+# Politeness fillers stripped before routing
+FILLER_RE = re.compile(r"\b(?:can you|could you|please|would you|hey jarvis)\b", re.IGNORECASE)
+OPEN_PREFIX_RE = re.compile(r"^(?:open|launch|start)\s+", re.IGNORECASE)
+
 # System Prompt
 # System Prompt
 SYSTEM_PROMPT = """
@@ -174,16 +214,41 @@ You are **Jarvis**, a sentient AI companion. You are communicating via **VOICE**
 # ... (Existing imports) ...
 
 class InteractiveAgent:
+    # Per-client conversation state: resolves to the active AgentSession (API requests)
+    # or to default_session (local voice loop). Models, MCP, memory etc. stay shared.
+    chat_history = SessionAttribute()
+    chat_model = SessionAttribute()
+    last_response = SessionAttribute()
+    last_audio = SessionAttribute()
+    last_tool_output = SessionAttribute()
+    last_tool_name = SessionAttribute()
+
+    # Subsystems, built on first use (see _build_* below). warm=True ones are
+    # built in the background right after startup so the first command rarely waits.
+    neural_voice = Capability(warm=True)
+    tts = Capability(warm=True)
+    memory_bank = Capability(warm=True)
+    memory_writer = Capability(warm=True)
+    archivist = Capability(warm=True)
+    home_automation = Capability(warm=True)
+    mcp_manager = Capability(warm=True)
+    learning_module = Capability()
+    tracker_eye = Capability()
+    camera = Capability()
+    vision_history = Capability()
+    vision_expert = Capability()
+    wiki_module = Capability()
+    weather_module = Capability()
+    system_module = Capability()
+    rag_module = Capability()
+    fs_mcp = Capability()
+    system_mcp = Capability()
+    automation_agent = Capability()
+
     def __init__(self, log_callback=None, image_callback=None, state_callback=None, api_mode=False):
+        self.capabilities = CapabilityRegistry(self)
         self.api_mode = api_mode
-        self.recognizer = sr.Recognizer()
-        self.recognizer.pause_threshold = 2.0
-        self.recognizer.non_speaking_duration = 0.8
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = False
-        
-        # Always initialize NeuralVoice, but don't play locally in API mode
-        self.neural_voice = NeuralVoice()
+        self.default_session = AgentSession("default")
         
         self.log_callback = log_callback
         self.image_callback = image_callback
@@ -194,53 +259,138 @@ class InteractiveAgent:
         self.last_input_time = time.time()
         self.is_muted = False
         
-        # Initialize Memory Bank
-        self.memory_bank = MemoryBank()
         self.history_manager = HistoryManager(HISTORY_DIR)
-        self.learning_module = LearningModule()
-        
-        # Initialize Memory Archivist (The Librarian)
-        # Runs in background to organize vault
-        vault_path = os.getenv("OBSIDIAN_VAULT_PATH", "/mnt/fast_data/projects/vision_agent/obsidian_vault")
-        self.archivist = MemoryArchivist(vault_path, self.memory_bank)
-        self.archivist.start()
-
-        self.tracker_eye = TrackerEye()
-        self.vision_expert = VisionExpert() # The Eye
-        self.wiki_module = WikiModule()
-        self.weather_module = WeatherModule()
-        self.system_module = SystemModule()
-        self.rag_module = RAGModule(self.memory_bank)
+        self.vault_path = os.getenv("OBSIDIAN_VAULT_PATH", "/mnt/fast_data/projects/vision_agent/obsidian_vault")
+
         self.smart_model = "llama3.1"         # Reliable model for conversation
         self.fast_model = "qwen2.5:7b"        # Optimized model for JSON intent parsing
         self.reasoning_model = "deepseek-r1:7b"  # Reasoning model for complex automation tasks
         
-        self.home_automation = HomeAutomationModule()
         self.intent_parser = IntentParser(model_name=self.fast_model)  # Use Qwen 2.5 for best JSON performance
-        self.mcp_manager = MCPManager()
+        self.intent_parser.prewarm()  # Load the model + static prompt prefix in the background
         self.last_seen_objects = []
         self.last_tool_output = None
         self.last_tool_name = None
         self.command_queue = queue.Queue()
+        self.command_router = CommandRouter(AGENT_ROUTES)  # Compiled once; act() dispatches through it
+        self.scheduler = TaskScheduler.get()  # Shared, bounded pool for all background work
         
-        # Initialize FilesystemMCP (Safe Workspace + Project Read Access)
-        self.fs_mcp = FilesystemMCP(
+        self.chat_history = [] 
+        recent_turns = self.history_manager.get_recent_history(20)
+        logging.info(f"🔍 DEBUG: Loading {len(recent_turns)} turns from HistoryManager.")
+        for turn in recent_turns:
+            self.chat_history.append({'role': turn['role'], 'content': turn['content']})
+            
+        self.chat_model = DEFAULT_CHAT_MODEL
+        
+        # Audio Setup (microphone is picked and opened on first listen(), never in API mode)
+        self._select_microphone_index = None
+        self.speech = None
+        
+        self.capabilities.mark_ready(IMPORT_MS)
+        logging.info(self.capabilities.report_lines()[0])  # Full table is logged once warming finishes
+        self.capabilities.warm(submit=lambda fn: self.scheduler.submit(fn, priority="background", name="capabilities.warm"))
+        
+        logging.info(f"Agent Initialized. Loaded {len(self.chat_history)} turns into active memory.")
+
+    # --- Capability builders (imports live here so they're only paid for on first use) ---
+
+    def _build_neural_voice(self):
+        # Always initialized, but doesn't play locally in API mode
+        from vision_agent.modules.neural_voice import NeuralVoice
+        return NeuralVoice()
+
+    def _build_tts(self):
+        from vision_agent.modules.tts_cache import TTSCache
+        tts = TTSCache(self.neural_voice)  # Sentence-level synthesis, cached by (voice, text)
+        tts.prewarm()  # Confirmations are spoken locally and sent to API clients alike
+        return tts
+
+    def _build_memory_bank(self):
+        from vision_agent.memory.memory_bank import MemoryBank
+        return MemoryBank()
+
+    def _build_memory_writer(self):
+        from vision_agent.memory.memory_writer import MemoryWriter
+        return MemoryWriter(self.memory_bank)  # Write-behind: the run loop never waits on the vector DB
+
+    def _build_learning_module(self):
+        from vision_agent.memory.learning_module import LearningModule
+        return LearningModule()
+
+    def _build_archivist(self):
+        # The Librarian: runs in background to organize vault
+        from vision_agent.memory.memory_archivist import MemoryArchivist
+        archivist = MemoryArchivist(self.vault_path, self.memory_bank)
+        archivist.start()
+        return archivist
+
+    def _build_tracker_eye(self):
+        from vision_agent.modules.tracker_vision import TrackerEye
+        return TrackerEye()
+
+    def _build_camera(self):
+        from vision_agent.modules.camera_service import CameraService
+        return CameraService.get()
+
+    def _build_vision_history(self):
+        from vision_agent.modules.vision_history import VisionHistory
+        return VisionHistory(HISTORY_DIR)
+
+    def _build_vision_expert(self):
+        from vision_agent.modules.vision_expert import VisionExpert
+        return VisionExpert() # The Eye
+
+    def _build_wiki_module(self):
+        from vision_agent.modules.wiki_module import WikiModule
+        return WikiModule()
+
+    def _build_weather_module(self):
+        from vision_agent.modules.weather_module import WeatherModule
+        return WeatherModule()
+
+    def _build_system_module(self):
+        from vision_agent.modules.system_module import SystemModule
+        return SystemModule()
+
+    def _build_rag_module(self):
+        from vision_agent.modules.rag_module import RAGModule
+        return RAGModule(self.memory_bank)
+
+    def _build_home_automation(self):
+        from vision_agent.modules.home_automation import HomeAutomationModule
+        return HomeAutomationModule()
+
+    def _build_fs_mcp(self):
+        # Safe Workspace + Project Read Access
+        from vision_agent.modules.filesystem_mcp import FilesystemMCP
+        return FilesystemMCP(
             root_dir="/home/soup/jarvis_workspace",
             allowed_read_paths=["/mnt/fast_data/projects/vision_agent"]
         )
-        for tool in self.fs_mcp.get_tools():
-            self.mcp_manager.register_tool(tool["name"], self.fs_mcp.handle_tool_call, tool)
-            
-        # Initialize System MCP
-        self.system_mcp = SystemMCP()
-        for tool in self.system_mcp.get_tools():
-            self.mcp_manager.register_tool(tool["name"], self.system_mcp.handle_tool_call, tool)
+
+    def _build_system_mcp(self):
+        from vision_agent.modules.system_mcp import SystemMCP
+        return SystemMCP()
+
+    def _build_automation_agent(self):
+        from vision_agent.modules.automation_agent import AutomationAgent
+        return AutomationAgent(self.mcp_manager)
+
+    def _build_mcp_manager(self):
+        from vision_agent.modules.mcp_manager import MCPManager
+        from vision_agent.modules.filesystem_mcp import FilesystemMCP
+        from vision_agent.modules.system_mcp import SystemMCP
+        mcp_manager = MCPManager()
+
+        # Tool schemas are static; the MCPs behind them are built on their first call
+        for tool in FilesystemMCP.get_tools():
+            mcp_manager.register_tool(tool["name"], lambda name, args: self.fs_mcp.handle_tool_call(name, args), tool)
+        for tool in SystemMCP.get_tools():
+            mcp_manager.register_tool(tool["name"], lambda name, args: self.system_mcp.handle_tool_call(name, args), tool)
             
-        # Initialize Automation Agent
-        self.automation_agent = AutomationAgent(self.mcp_manager)
-        
         # Register Automation Tool
-        self.mcp_manager.register_tool(
+        mcp_manager.register_tool(
             "run_automation",
             self._handle_automation,
             {
@@ -255,19 +405,15 @@ class InteractiveAgent:
                 }
             }
         )
-        
-        self.chat_history = [] 
-        recent_turns = self.history_manager.get_recent_history(20)
-        logging.info(f"🔍 DEBUG: Loading {len(recent_turns)} turns from HistoryManager.")
-        for turn in recent_turns:
-            self.chat_history.append({'role': turn['role'], 'content': turn['content']})
-            
-        self.chat_model = DEFAULT_CHAT_MODEL
-        
-        # Audio Setup
-        self._select_microphone_index = self._select_microphone()
-        
-        logging.info(f"Agent Initialized. Loaded {len(self.chat_history)} turns into active memory.")
+        return mcp_manager
+
+    def _tracker_active(self):
+        """Checks tracker mode without building TrackerEye just to ask."""
+        return self.capabilities.is_built("tracker_eye") and self.tracker_eye.is_active
+
+    def startup_report(self):
+        """Import/__init__ time and per-capability build times (also logged at startup)."""
+        return self.capabilities.report()
 
     def _handle_automation(self, tool_name, args):
         """
@@ -305,27 +451,7 @@ class InteractiveAgent:
             self.last_response = ""
             
             # Generate Audio for API
-            try:
-                import soundfile as sf
-                import io
-                import base64
-                
-                samples, rate = self.neural_voice.generate_audio(text)
-                if samples is not None:
-                    logging.info(f"🔊 Audio Generated: {len(samples)} samples at {rate}Hz")
-                    # Convert to WAV bytes
-                    buffer = io.BytesIO()
-                    sf.write(buffer, samples, rate, format='WAV')
-                    buffer.seek(0)
-                    audio_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    self.last_audio = audio_base64
-                    logging.info(f"🔊 Audio Encoded: {len(audio_base64)} chars")
-                else:
-                    logging.error("🔊 Audio Generation returned None")
-                    self.last_audio = None
-            except Exception as e:
-                logging.error(f"API Audio Gen Error: {e}")
-                self.last_audio = None
+            self.last_audio = self._encode_audio(text)
                 
             return text # Return text for API response
             
@@ -334,14 +460,45 @@ class InteractiveAgent:
 
         if self.state_callback: self.state_callback("talking")
         
-        # Stop listening while speaking
-        # self.recognizer.energy_threshold += 300 
-        
-        self.neural_voice.speak(text)
-        
-        # self.recognizer.energy_threshold -= 300
+        # Stop listening while speaking (don't transcribe our own voice)
+        if self.speech: self.speech.pause()
+        try:
+            self._play_local(text)
+        finally:
+            if self.speech: self.speech.resume()
         if self.state_callback: self.state_callback("idle")
 
+    def _play_local(self, text):
+        """Plays through the TTS cache (repeat phrases skip synthesis); NeuralVoice directly if that can't play."""
+        from vision_agent.modules.tts_cache import PlaybackInterrupted
+        try:
+            if self.tts.play(text):
+                return
+        except PlaybackInterrupted as e:
+            # Pick up where playback stopped instead of repeating the opening sentences
+            logging.warning(f"🔊 {e}. Finishing with NeuralVoice.")
+            text = e.remaining
+        except Exception as e:
+            logging.warning(f"🔊 Cached playback failed, using NeuralVoice: {e}")
+        if text:
+            self.neural_voice.speak(text)
+
+    def _encode_audio(self, text):
+        """Synthesizes text (sentence by sentence, through the TTS cache) and returns it as a base64 WAV string (or None)."""
+        try:
+            import base64
+
+            wav = self.tts.synthesize(text)
+            if wav is None:
+                logging.error("🔊 Audio Generation returned None")
+                return None
+            audio_base64 = base64.b64encode(wav).decode('utf-8')
+            logging.info(f"🔊 Audio Encoded: {len(audio_base64)} chars")
+            return audio_base64
+        except Exception as e:
+            logging.error(f"API Audio Gen Error: {e}")
+            return None
+
     def _select_microphone(self):
         """Finds the best available microphone index."""
         # Simplify: Use System Default (None)
@@ -356,133 +513,91 @@ class InteractiveAgent:
             return ""
 
         # Use the selected microphone index if available
-        mic_index = self._select_microphone_index 
-        
         try:
-            # Determine Sample Rate for Hardware
-            sample_rate = 16000 # Default
-            if mic_index is not None:
-                try:
-                    with no_alsa_error():
-                        p = pyaudio.PyAudio()
-                        info = p.get_device_info_by_index(mic_index)
-                        sample_rate = int(info['defaultSampleRate'])
-                        p.terminate()
-                except Exception:
-                    pass
-
-            # Attempt to use the selected microphone
-            with no_alsa_error():
-                with sr.Microphone(device_index=mic_index, sample_rate=sample_rate) as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    if self.active_mode or self.conversation_mode:
-                        print(f"{Fore.GREEN}🎤 Listening (Active)...{Style.RESET_ALL}", end='\r')
-                        if self.state_callback: self.state_callback("listening")
-                    else:
-                        print(f"{Fore.BLUE}🎤 Listening (Waiting for '{WAKE_WORD}')...{Style.RESET_ALL}", end='\r')
-                        if self.state_callback: self.state_callback("idle")
-                    
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=20) 
-                    text = self.recognizer.recognize_google(audio).lower()
-                    # Clear the "Listening..." line
-                    print(" " * 100, end='\r')
-                    self.log(f"👂 Heard: '{text}'", Fore.GREEN)
-                    return text
-
-        except (OSError, AttributeError) as e:
+            if self.speech is None:
+                # Opened once and kept running; ambient noise is tracked continuously by the VAD
+                from vision_agent.modules.speech_stream import SpeechStream
+                if self._select_microphone_index is None:
+                    self._select_microphone_index = self._select_microphone()
+                self.speech = SpeechStream(device_index=self._select_microphone_index)
+
+            if self.active_mode or self.conversation_mode:
+                print(f"{Fore.GREEN}🎤 Listening (Active)...{Style.RESET_ALL}", end='\r')
+                if self.state_callback: self.state_callback("listening")
+            else:
+                print(f"{Fore.BLUE}🎤 Listening (Waiting for '{WAKE_WORD}')...{Style.RESET_ALL}", end='\r')
+                if self.state_callback: self.state_callback("idle")
+
+            text = self.speech.listen(timeout=5).lower()
+            if not text:
+                return ""
+            # Clear the "Listening..." line
+            print(" " * 100, end='\r')
+            self.log(f"👂 Heard: '{text}'", Fore.GREEN)
+            return text
+
+        except OSError as e:
             # Fallback logic: If specific mic fails, try default
+            if self.speech is not None:
+                self.speech.close()
+            self.speech = None
+            mic_index = self._select_microphone_index
             if mic_index is not None:
                 self.log(f"⚠️ Microphone {mic_index} failed. Switching to Default.", Fore.YELLOW)
                 self._select_microphone_index = None # Reset to default for next time
-                return "" 
             else:
                 self.log(f"Microphone Error (Default): {e}", Fore.RED)
-                return ""
-                
-        except sr.WaitTimeoutError:
-            return ""
-        except sr.UnknownValueError:
+                time.sleep(1)
             return ""
         except Exception as e:
             self.log(f"Error listening: {e}", Fore.RED)
             logging.error(f"Listening Error: {e}")
             return ""
 
-    def _save_to_history(self, file_path, source_type):
-        """Saves captured image to history folder."""
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            history_dir = "vision_history"
-            os.makedirs(history_dir, exist_ok=True)
-            
-            filename = f"{source_type}_{timestamp}.jpg"
-            dest_path = os.path.join(history_dir, filename)
-            
-            # Copy file
-            with open(file_path, 'rb') as src, open(dest_path, 'wb') as dst:
-                dst.write(src.read())
-                
-            self.log(f"💾 Saved to history: {dest_path}", Fore.GREEN)
-            return dest_path
-        except Exception as e:
-            self.log(f"Failed to save history: {e}", Fore.RED)
-            return None
+    def _publish_capture(self, image_bytes, preview_path, source_type):
+        """History is a side channel: queued, never on the capture path. The preview file is only written for a UI."""
+        self.vision_history.add(image_bytes, source_type)
+        if self.image_callback:
+            with open(preview_path, 'wb') as f:
+                f.write(image_bytes)
+            self.image_callback(preview_path)
 
     def see_screen(self):
+        """Captures the screen as downscaled JPEG bytes, ready for the vision model."""
         try:
-            with mss.mss() as sct:
-                monitor = sct.monitors[1]
-                sct_img = sct.grab(monitor)
-                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                img.save(SCREENSHOT_PATH)
-                self.log("📸 Screen captured.", Fore.YELLOW)
-                logging.info(f"Screen saved to {SCREENSHOT_PATH}")
-                self._save_to_history(SCREENSHOT_PATH, "screen")
-                if self.image_callback:
-                    self.image_callback(SCREENSHOT_PATH)
-                return SCREENSHOT_PATH
+            from vision_agent.modules import image_utils
+            image_bytes = image_utils.capture_screen()
+            self.log("📸 Screen captured.", Fore.YELLOW)
+            self._publish_capture(image_bytes, SCREENSHOT_PATH, "screen")
+            return image_bytes
         except Exception as e:
             self.log(f"Screen capture failed: {e}", Fore.RED)
             logging.error(f"Screen Error: {e}")
             return None
 
     def see_webcam(self):
+        from vision_agent.modules import image_utils
         try:
-            if self.tracker_eye.is_active:
+            if self._tracker_active():
                 frame = self.tracker_eye.get_frame()
                 if frame is not None:
-                    cv2.imwrite(WEBCAM_PATH, frame)
+                    image_bytes = image_utils.encode_frame(frame)
                     self.log("📸 Captured from Tracker Mode.", Fore.YELLOW)
-                    self._save_to_history(WEBCAM_PATH, "tracker")
-                    if self.image_callback:
-                        self.image_callback(WEBCAM_PATH)
-                    return WEBCAM_PATH
+                    self._publish_capture(image_bytes, WEBCAM_PATH, "tracker")
+                    return image_bytes
                 else:
                     self.log("⚠️ Tracker Mode active but no frame available.", Fore.YELLOW)
                     return None
 
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
+            frame = self.camera.latest_frame()
+            if frame is None:
                 self.speak("I cannot access the webcam.")
                 logging.error("Webcam access failed")
                 return None
-            
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-            # Camera warm-up removed for performance (Council recommendation - saves 1.5s)
-            # time.sleep(1.5) 
-            cap.read()  # Discard first frame
-            ret, frame = cap.read()
-            cap.release()
-            if ret:
-                cv2.imwrite(WEBCAM_PATH, frame)
-                self.log("📸 Webcam captured.", Fore.YELLOW)
-                logging.info(f"Webcam saved to {WEBCAM_PATH}")
-                self._save_to_history(WEBCAM_PATH, "webcam")
-                if self.image_callback:
-                    self.image_callback(WEBCAM_PATH)
-                return WEBCAM_PATH
-            return None
+            image_bytes = image_utils.encode_frame(frame)
+            self.log("📸 Webcam captured.", Fore.YELLOW)
+            self._publish_capture(image_bytes, WEBCAM_PATH, "webcam")
+            return image_bytes
         except Exception as e:
             self.log(f"Webcam failed: {e}", Fore.RED)
             logging.error(f"Webcam Error: {e}")
@@ -490,677 +605,659 @@ class InteractiveAgent:
 
     def act(self, command):
         # Clean Command (preserve case for URLs!)
-        command = command.replace("can you", "").replace("could you", "").replace("please", "").replace("would you", "").replace("hey jarvis", "").strip()
-        
-        # Store original command for intent parsing (preserves URL case!)
-        original_command = command
-        
-        # Create lowercased version for pattern matching only
-        command_lower = command.lower()
-        
-        # 0. Semantic Home Automation (The Council's Brain) - PRIORITY 1
-        # Try to parse intent using the LLM first for complex commands
+        command = FILLER_RE.sub("", command).strip()
+        command = re.sub(r"\s{2,}", " ", command)
+
+        # Lowercased version is for pattern matching only
+        return self.command_router.dispatch(self, command, command.lower())
+
+    async def act_async(self, command):
+        """
+        act() for the API server's event loop. Routes with an async variant
+        (the intent parser, MCP tools) await their model and tool calls; the
+        rest run on the interactive scheduler pool.
+        """
+        command = FILLER_RE.sub("", command).strip()
+        command = re.sub(r"\s{2,}", " ", command)
+        return await self.command_router.adispatch(self, command, command.lower(), offload=self._offload)
+
+    def _offload(self, fn, *args):
+        """Runs blocking work (device I/O, TTS synthesis) off the event loop, in the caller's session."""
+        return asyncio.wrap_future(self.scheduler.submit(fn, *args, priority="interactive"))
 
+    async def _capability(self, name):
+        """A capability for use on the event loop: built off the loop if this is its first use."""
+        if self.capabilities.is_built(name):
+            return getattr(self, name)
+        return await self._offload(getattr, self, name)
+
+    # --- Command Routes (see modules/command_router.AGENT_ROUTES) ---
+    # Each returns True (handled), False (let think() answer) or None (fall through).
+
+    def _route_screen_analysis(self, command, command_lower):
         # 16. Multi-Modal Vision (True Sight) - PRIORITY 0 (Before LLM)
-        # Use lowercased version for pattern matching
-        if "screen" in command_lower or "desktop" in command_lower:
-            if "analyze" in command_lower or "look" in command_lower or "what" in command_lower or "see" in command_lower:
-                self.analyze_screen()
-                return True
-
-        if "camera" in command_lower or "webcam" in command_lower or "see me" in command_lower or "look at me" in command_lower or "holding" in command_lower:
-            self.analyze_webcam()
+        self.analyze_screen()
+        return True
+
+    def _route_webcam_analysis(self, command, command_lower):
+        self.analyze_webcam()
+        return True
+
+    def _route_semantic_intents(self, command, command_lower):
+        # 0. Semantic Home Automation (The Council's Brain)
+        # Try to parse intent using the LLM first for complex commands
+        if not self.home_automation:
+            return None
+
+        self.log("🧠 Thinking...", Fore.YELLOW)
+        # Pass ORIGINAL command with preserved URL case to parser
+        entity_registry = self.home_automation.entity_map
+        intents = self.intent_parser.parse(command, entity_registry, context=self.last_tool_output)
+
+        self.log(f"DEBUG: Intents found: {intents}", Fore.YELLOW)
+
+        # Handle list of intents (Compound Commands)
+        if not intents or not isinstance(intents, list):
+            return None
+
+        success_count = 0
+        for intent in intents:
+            # Default confidence to 0.9 if missing (assume high confidence if structured JSON is returned)
+            if intent.get('confidence', 0.9) > 0.6:
+                handled = self._run_control_intent(intent)
+                if handled is None and intent.get('tool_name'):
+                    handled = self._run_tool_intent(command, intent)
+                if handled:
+                    success_count += 1
+
+        # If at least one intent was executed, stop further processing
+        return True if success_count > 0 else None
+
+    async def _route_semantic_intents_async(self, command, command_lower):
+        # Same as _route_semantic_intents, but the parse, MCP calls and summaries are awaited
+        home_automation = await self._capability("home_automation")
+        if not home_automation:
+            return None
+
+        self.log("🧠 Thinking...", Fore.YELLOW)
+        entity_registry = home_automation.entity_map
+        intents = await self.intent_parser.parse_async(command, entity_registry, context=self.last_tool_output)
+
+        self.log(f"DEBUG: Intents found: {intents}", Fore.YELLOW)
+
+        if not intents or not isinstance(intents, list):
+            return None
+
+        success_count = 0
+        for intent in intents:
+            if intent.get('confidence', 0.9) > 0.6:
+                # Home Assistant calls are blocking REST requests
+                handled = await self._offload(self._run_control_intent, intent)
+                if handled is None and intent.get('tool_name'):
+                    handled = await self._run_tool_intent_async(command, intent)
+                if handled:
+                    success_count += 1
+
+        return True if success_count > 0 else None
+
+    def _run_control_intent(self, intent):
+        """Runs a device intent: True if done, False if recognised but skipped, None if it isn't one."""
+        action = intent.get('action')
+        target = intent.get('target_device')
+        value = intent.get('value')
+
+        if action == "turn_on" and target:
+            self.speak(f"Turning on {target}.")
+            result = self.home_automation.turn_on(target)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+            return True
+        elif action == "turn_off" and target:
+            self.speak(f"Turning off {target}.")
+            result = self.home_automation.turn_off(target)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+            return True
+        elif action == "set_value" and target and value:
+            if "thermostat" in target or "temperature" in target:
+                 result = self.home_automation.climate_set_temperature(target, value)
+                 self.speak(f"Setting {target} to {value}.")
+                 self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+                 return True
+            return False
+        elif action == "mute" and target:
+            self.speak(f"Muting {target}.")
+            result = self.home_automation.media_mute(target, True)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
             return True
+        elif action == "unmute" and target:
+            self.speak(f"Unmuting {target}.")
+            result = self.home_automation.media_mute(target, False)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+            return True
+        elif action == "volume_up" and target:
+            self.speak(f"Turning up {target}.")
+            result = self.home_automation.media_volume_up(target)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+            return True
+        elif action == "volume_down" and target:
+            self.speak(f"Turning down {target}.")
+            result = self.home_automation.media_volume_down(target)
+            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
+            return True
+        elif action == "get_status" and target:
+            # Generic status query
+            status = self.home_automation.appliance_get_status(target)
+            if "error" in status:
+                 self.speak(f"I couldn't reach the {target}.")
+            else:
+                 state = status.get('state', 'unknown')
+                 self.speak(f"The {target} is currently {state}.")
+            self.log(f"🧠 Semantic: {status}", Fore.MAGENTA)
+            return True
+        return None
 
-        if self.home_automation:
-            self.log("🧠 Thinking...", Fore.YELLOW)
-            # 4. Parse Intent (Semantic Brain)
-            # 4. Parse Intent (Semantic Brain)
-            # Pass ORIGINAL command with preserved URL case to parser
-            entity_registry = self.home_automation.entity_map
-            intents = self.intent_parser.parse(original_command, entity_registry, context=self.last_tool_output)
-            
-            self.log(f"DEBUG: Intents found: {intents}", Fore.YELLOW)
-
-            # Handle list of intents (Compound Commands)
-            if intents and isinstance(intents, list):
-                success_count = 0
-                for intent in intents:
-                    # Default confidence to 0.9 if missing (assume high confidence if structured JSON is returned)
-                    if intent.get('confidence', 0.9) > 0.6:
-                        action = intent.get('action')
-                        target = intent.get('target_device')
-                        value = intent.get('value')
-                        
-                        if action == "turn_on" and target:
-                            self.speak(f"Turning on {target}.")
-                            result = self.home_automation.turn_on(target)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "turn_off" and target:
-                            self.speak(f"Turning off {target}.")
-                            result = self.home_automation.turn_off(target)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "set_value" and target and value:
-                            if "thermostat" in target or "temperature" in target:
-                                 result = self.home_automation.climate_set_temperature(target, value)
-                                 self.speak(f"Setting {target} to {value}.")
-                                 self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                                 success_count += 1
-                        elif action == "mute" and target:
-                            self.speak(f"Muting {target}.")
-                            result = self.home_automation.media_mute(target, True)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "unmute" and target:
-                            self.speak(f"Unmuting {target}.")
-                            result = self.home_automation.media_mute(target, False)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "volume_up" and target:
-                            self.speak(f"Turning up {target}.")
-                            result = self.home_automation.media_volume_up(target)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "volume_down" and target:
-                            self.speak(f"Turning down {target}.")
-                            result = self.home_automation.media_volume_down(target)
-                            self.log(f"🧠 Semantic: {result}", Fore.MAGENTA)
-                            success_count += 1
-                        elif action == "get_status" and target:
-                            # Generic status query
-                            status = self.home_automation.appliance_get_status(target)
-                            if "error" in status:
-                                 self.speak(f"I couldn't reach the {target}.")
-                            else:
-                                 state = status.get('state', 'unknown')
-                                 self.speak(f"The {target} is currently {state}.")
-                            self.log(f"🧠 Semantic: {status}", Fore.MAGENTA)
-                            success_count += 1
-
-                        elif intent.get('tool_name'):
-                            tool_name = intent.get('tool_name')
-                            args = intent.get('arguments', {})
-                            
-                            # Smart YouTube Transcript Piping
-                            # If previous tool was get_transcript and this is create_note, parse YouTube JSON
-                            if tool_name == "create_note" and self.last_tool_name == "get_transcript" and self.last_tool_output:
-                                # FAILSAFE: Do NOT pipe if the transcript retrieval failed
-                                if "error" in self.last_tool_output.lower() or "could not retrieve" in self.last_tool_output.lower():
-                                    self.log(f"⚠️ Piping Aborted: Transcript retrieval failed.", Fore.RED)
-                                    self.speak("I can't create the note because I couldn't get the transcript.")
-                                    continue
-                                
-                                # Parse YouTube transcript JSON
-                                import json
-                                try:
-                                    yt_result = json.loads(self.last_tool_output)
-                                    if "title" in yt_result and "transcript" in yt_result:
-                                        self.log(f"🎬 YouTube transcript detected, piping to note...", Fore.YELLOW)
-                                        # Use transcript as content
-                                        args["content"] = yt_result["transcript"]
-                                        # Clean and use YouTube title
-                                        clean_title = yt_result["title"].replace(" - YouTube", "").strip()
-                                        args["title"] = clean_title
-                                        self.log(f"📝 Note title: {clean_title}", Fore.CYAN)
-                                        self.log(f"📄 Content length: {len(args['content'])} characters", Fore.CYAN)
-                                except json.JSONDecodeError as e:
-                                    self.log(f"⚠️ Failed to parse YouTube JSON: {e}", Fore.YELLOW)
-                                    # Fall back to generic piping if JSON fails
-                                    if not args.get("content"):
-                                        args["content"] = self.last_tool_output
-
-                            self.speak(f"Using {tool_name}...")
-                            result = self.mcp_manager.execute_tool(tool_name, args)
-                            self.last_tool_output = result
-                            self.last_tool_name = tool_name
-                            self.log(f"🔌 MCP Result: {result}", Fore.CYAN)
-                            
-                            # Conditional Summarization
-                            # If result is short and readable, just speak it.
-                            is_json = result.strip().startswith("[") or result.strip().startswith("{")
-                            if len(result) < 150 and not is_json:
-                                self.speak(result)
-                            else:
-                                # Summarize with Smart Brain
-                                summary_prompt = f"""
-                                SYSTEM: You are Jarvis. The user asked: "{command}".
-                                TOOL OUTPUT ({tool_name}):
-                                {result[:2000]} 
-                                
-                                TASK: Summarize the tool output for the user in 1-2 sentences. Be helpful and concise.
-                                """
-                                try:
-                                    response = ollama.chat(model=self.smart_model, messages=[{'role': 'system', 'content': summary_prompt}])
-                                    summary = response['message']['content']
-                                    self.speak(summary)
-                                except Exception as e:
-                                    self.log(f"Summarization failed: {e}", Fore.RED)
-                                    self.speak("I got the data, but I'm having trouble reading it. Check the logs.")
-                            success_count += 1
-                
-                # If at least one intent was executed, return True to stop further processing
-                if success_count > 0:
-                    return True
+    def _prepare_tool_intent(self, intent):
+        """(tool_name, arguments) for a tool intent, with the previous tool's output piped in; None to skip it."""
+        tool_name = intent.get('tool_name')
+        args = intent.get('arguments', {})
+
+        # Smart YouTube Transcript Piping
+        # If previous tool was get_transcript and this is create_note, parse YouTube JSON
+        if tool_name == "create_note" and self.last_tool_name == "get_transcript" and self.last_tool_output:
+            # FAILSAFE: Do NOT pipe if the transcript retrieval failed
+            if "error" in self.last_tool_output.lower() or "could not retrieve" in self.last_tool_output.lower():
+                self.log(f"⚠️ Piping Aborted: Transcript retrieval failed.", Fore.RED)
+                self.speak("I can't create the note because I couldn't get the transcript.")
+                return None
 
+            # Parse YouTube transcript JSON
+            import json
+            try:
+                yt_result = json.loads(self.last_tool_output)
+                if "title" in yt_result and "transcript" in yt_result:
+                    self.log(f"🎬 YouTube transcript detected, piping to note...", Fore.YELLOW)
+                    # Use transcript as content
+                    args["content"] = yt_result["transcript"]
+                    # Clean and use YouTube title
+                    clean_title = yt_result["title"].replace(" - YouTube", "").strip()
+                    args["title"] = clean_title
+                    self.log(f"📝 Note title: {clean_title}", Fore.CYAN)
+                    self.log(f"📄 Content length: {len(args['content'])} characters", Fore.CYAN)
+            except json.JSONDecodeError as e:
+                self.log(f"⚠️ Failed to parse YouTube JSON: {e}", Fore.YELLOW)
+                # Fall back to generic piping if JSON fails
+                if not args.get("content"):
+                    args["content"] = self.last_tool_output
+
+        self.speak(f"Using {tool_name}...")
+        return tool_name, args
+
+    def _run_tool_intent(self, command, intent):
+        prepared = self._prepare_tool_intent(intent)
+        if not prepared:
+            return False
+        tool_name, args = prepared
+        result = self.mcp_manager.execute_tool(tool_name, args)
+        summary_prompt = self._record_tool_result(command, tool_name, result)
+
+        # Conditional Summarization
+        # If result is short and readable, just speak it.
+        if not summary_prompt:
+            self.speak(result)
+            return True
+        # Summarize with Smart Brain
+        try:
+            response = llm_gateway.chat(model=self.smart_model, messages=[{'role': 'system', 'content': summary_prompt}])
+            summary = response['message']['content']
+            self.speak(summary)
+        except Exception as e:
+            self.log(f"Summarization failed: {e}", Fore.RED)
+            self.speak("I got the data, but I'm having trouble reading it. Check the logs.")
+        return True
+
+    async def _run_tool_intent_async(self, command, intent):
+        prepared = await self._offload(self._prepare_tool_intent, intent)
+        if not prepared:
+            return False
+        tool_name, args = prepared
+        mcp_manager = await self._capability("mcp_manager")
+        result = await mcp_manager.execute_tool_async(tool_name, args)
+        summary_prompt = self._record_tool_result(command, tool_name, result)
+
+        reply = result
+        if summary_prompt:
+            try:
+                response = await llm_gateway.achat(model=self.smart_model, messages=[{'role': 'system', 'content': summary_prompt}])
+                reply = response['message']['content']
+            except Exception as e:
+                self.log(f"Summarization failed: {e}", Fore.RED)
+                reply = "I got the data, but I'm having trouble reading it. Check the logs."
+        await self._offload(self.speak, reply)
+        return True
+
+    def _record_tool_result(self, command, tool_name, result):
+        """Keeps the output for piping into the next command; returns a summary prompt if it's too long or raw to read out."""
+        self.last_tool_output = result
+        self.last_tool_name = tool_name
+        self.log(f"🔌 MCP Result: {result}", Fore.CYAN)
+
+        is_json = result.strip().startswith("[") or result.strip().startswith("{")
+        if len(result) < 150 and not is_json:
+            return None
+        return f"""
+                        SYSTEM: You are Jarvis. The user asked: "{command}".
+                        TOOL OUTPUT ({tool_name}):
+                        {result[:2000]} 
+                        
+                        TASK: Summarize the tool output for the user in 1-2 sentences. Be helpful and concise.
+                        """
 
+    def _route_close_app(self, command, command_lower):
         # 0. System Control (Close Apps & Shutdown)
-        # 0. System Control (Close Apps & Shutdown)
-        if "close" in command or "quit" in command or "terminate" in command:
-            target = command.replace("close", "").replace("quit", "").replace("terminate", "").replace("out of", "").replace("the", "").strip()
-            
-            # Self-Termination
-            if target in ["jarvis", "me", "yourself", "system", "program", "application"]:
-                self.speak("Shutting down. Goodbye.")
-                self.log("🛑 Received Shutdown Command.", Fore.RED)
-                sys.exit(0)
-
-            # App Alias Map
-            KILL_MAP = {
-                "brave": "brave",
-                "brave browser": "brave",
-                "web browser": "brave",
-                "chrome": "chrome",
-                "firefox": "firefox",
-                "calculator": "gnome-calculator",
-                "spotify": "spotify",
-                "discord": "discord",
-                "terminal": "gnome-terminal",
-                "code": "code",
-                "vscode": "code"
-            }
-            
-            # Resolve alias
-            process_name = KILL_MAP.get(target, target)
-            
-            # SAFETY CHECK: Only kill if it's a known app or explicitly "app"
-            if target in KILL_MAP or "app" in command:
-                if target:
-                    self.speak(f"Closing {target}.")
-                    try:
-                        subprocess.run(["pkill", "-f", process_name])
-                        self.log(f"💀 Killed process: {process_name} (Target: {target})", Fore.RED)
-                        return True
-                    except Exception as e:
-                        logging.error(f"Failed to kill {target}: {e}")
-                        self.speak(f"I couldn't close {target}.")
-                        return True
-            else:
-                return False
+        target = command.replace("close", "").replace("quit", "").replace("terminate", "").replace("out of", "").replace("the", "").strip()
 
+        # Self-Termination
+        if target in ["jarvis", "me", "yourself", "system", "program", "application"]:
+            self.speak("Shutting down. Goodbye.")
+            self.log("🛑 Received Shutdown Command.", Fore.RED)
+            sys.exit(0)
 
-            
+        # Resolve alias
+        process_name = KILL_MAP.get(target, target)
+
+        # SAFETY CHECK: Only kill if it's a known app or explicitly "app".
+        # Anything else ("close high cpu", "close the blinds") falls through to later routes.
+        if not target or (target not in KILL_MAP and "app" not in command):
+            return None
+
+        self.speak(f"Closing {target}.")
+        try:
+            subprocess.run(["pkill", "-f", process_name])
+            self.log(f"💀 Killed process: {process_name} (Target: {target})", Fore.RED)
+        except Exception as e:
+            logging.error(f"Failed to kill {target}: {e}")
+            self.speak(f"I couldn't close {target}.")
+        return True
+
+    def _route_open_app(self, command, command_lower):
         # 1. Open Applications
-        if command.startswith("open ") or command.startswith("launch ") or command.startswith("start "):
-            target = command.replace("open ", "", 1).replace("launch ", "", 1).replace("start ", "", 1).strip()
-            
-            # Handle "in [browser]"
-            specific_browser = None
-            if " in " in target:
-                parts = target.split(" in ")
-                target = parts[0].strip()
-                browser_name = parts[1].strip()
-                specific_browser = APP_MAP.get(browser_name)
-
-            # Check APP_MAP first
-            app_cmd = APP_MAP.get(target)
-            if not app_cmd:
-                # Fuzzy match attempt
-                for key in APP_MAP:
-                    if key in target:
-                        app_cmd = APP_MAP[key]
-                        break
-            
-            if app_cmd:
-                self.speak(f"Opening {target}.")
-                try:
-                    # Ensure DISPLAY is set for GUI apps
-                    env = os.environ.copy()
-                    env["DISPLAY"] = ":0"
-                    env["XAUTHORITY"] = os.path.expanduser("~/.Xauthority")
-                    subprocess.Popen(app_cmd.split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
-                    self.log(f"🚀 Launched: {app_cmd}", Fore.GREEN)
-                    return True
-                except Exception as e:
-                    self.log(f"Failed to launch {target}: {e}", Fore.RED)
-                    self.speak(f"I couldn't open {target}.")
-                    return True
-            else:
-                # If not in map, maybe it's a website?
-                if "." in target or target in ["twitter", "facebook", "youtube", "google", "reddit", "github"]:
-                    # URL MAP
-                    URL_MAP = {
-                        "twitter": "x.com",
-                        "x": "x.com",
-                        "fb": "facebook.com",
-                        "facebook": "facebook.com",
-                        "youtube": "youtube.com",
-                        "yt": "youtube.com",
-                        "google": "google.com",
-                        "reddit": "reddit.com",
-                        "github": "github.com"
-                    }
-                    
-                    final_url = URL_MAP.get(target, target)
-                    if "." not in final_url:
-                        final_url += ".com"
-                    
-                    if not final_url.startswith("http"):
-                        final_url = "https://" + final_url
+        target = OPEN_PREFIX_RE.sub("", command, count=1).strip()
+        if not target:
+            return None
 
-                    self.speak(f"Opening {final_url}.")
-                    
-                    if specific_browser:
-                        env = os.environ.copy()
-                        env["DISPLAY"] = ":0"
-                        env["XAUTHORITY"] = f"/home/{os.getlogin()}/.Xauthority"
-                        subprocess.Popen([specific_browser, final_url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
-                    else:
-                        webbrowser.open(final_url)
-                        
-                    return True
-                
-                self.speak(f"I don't know how to open {target} yet.")
-                return True
+        # Handle "in [browser]"
+        target, specific_browser = self._split_browser(target)
 
-        # 2. Go To Website
-        if command.startswith("go to ") or command.startswith("visit "):
-            target = command.replace("go to ", "").replace("visit ", "").strip()
-            
-            # Handle "in [browser]"
-            specific_browser = None
-            if " in " in target:
-                parts = target.split(" in ")
-                target = parts[0].strip()
-                browser_name = parts[1].strip()
-                specific_browser = APP_MAP.get(browser_name)
-
-            # URL MAP
-            URL_MAP = {
-                "twitter": "x.com",
-                "x": "x.com",
-                "fb": "facebook.com",
-                "facebook": "facebook.com",
-                "youtube": "youtube.com",
-                "yt": "youtube.com",
-                "google": "google.com",
-                "reddit": "reddit.com",
-                "github": "github.com"
-            }
-            
-            final_url = URL_MAP.get(target, target)
-            if "." not in final_url:
-                final_url += ".com"
-            
-            if not final_url.startswith("http"):
-                final_url = "https://" + final_url
+        # Check APP_MAP first
+        app_cmd = APP_MAP.get(target)
+        if not app_cmd:
+            # Fuzzy match attempt
+            for key in APP_MAP:
+                if key in target:
+                    app_cmd = APP_MAP[key]
+                    break
 
-            self.speak(f"Going to {target}.")
-            
-            if specific_browser:
+        if app_cmd:
+            self.speak(f"Opening {target}.")
+            try:
+                # Ensure DISPLAY is set for GUI apps
                 env = os.environ.copy()
                 env["DISPLAY"] = ":0"
-                env["XAUTHORITY"] = f"/home/{os.getlogin()}/.Xauthority"
-                subprocess.Popen([specific_browser, final_url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
-                self.log(f"🌐 Opened URL: {final_url} in {specific_browser}", Fore.GREEN)
-            else:
-                webbrowser.open(final_url)
-                self.log(f"🌐 Opened URL: {final_url}", Fore.GREEN)
+                env["XAUTHORITY"] = os.path.expanduser("~/.Xauthority")
+                subprocess.Popen(app_cmd.split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+                self.log(f"🚀 Launched: {app_cmd}", Fore.GREEN)
+            except Exception as e:
+                self.log(f"Failed to launch {target}: {e}", Fore.RED)
+                self.speak(f"I couldn't open {target}.")
             return True
 
-        # 3. Post on Twitter (X)
-        if "post on twitter" in command or "tweet" in command:
-            # Check for "Council" request
-            if "council" in command or "made up" in command or "generate" in command:
-                self.speak("The Council is generating a tweet...")
-                threading.Thread(target=self._perform_council_tweet).start()
-                return True
-
-            content = command.replace("post on twitter", "").replace("tweet", "").strip()
-            self.speak("Opening X composer...")
-            url = f"https://x.com/compose/post"
-            if content:
-                 url += f"?text={content}"
+        # If not in map, maybe it's a website?
+        if "." in target or target in ["twitter", "facebook", "youtube", "google", "reddit", "github"]:
+            final_url = self._resolve_url(target)
+            self.speak(f"Opening {final_url}.")
+            self._open_url(final_url, specific_browser)
+            return True
+
+        self.speak(f"I don't know how to open {target} yet.")
+        return True
+
+    def _route_go_to(self, command, command_lower):
+        # 2. Go To Website
+        target = command.replace("go to ", "").replace("visit ", "").strip()
+        if not target:
+            return None
+
+        target, specific_browser = self._split_browser(target)
+        final_url = self._resolve_url(target)
+
+        self.speak(f"Going to {target}.")
+        self._open_url(final_url, specific_browser)
+        if specific_browser:
+            self.log(f"🌐 Opened URL: {final_url} in {specific_browser}", Fore.GREEN)
+        else:
+            self.log(f"🌐 Opened URL: {final_url}", Fore.GREEN)
+        return True
+
+    def _split_browser(self, target):
+        """Splits "reddit in firefox" into ("reddit", <firefox command>)."""
+        if " in " not in target:
+            return target, None
+        parts = target.split(" in ")
+        return parts[0].strip(), APP_MAP.get(parts[1].strip())
+
+    def _resolve_url(self, target):
+        final_url = URL_MAP.get(target, target)
+        if "." not in final_url:
+            final_url += ".com"
+        if not final_url.startswith("http"):
+            final_url = "https://" + final_url
+        return final_url
+
+    def _open_url(self, url, specific_browser=None):
+        if specific_browser:
+            env = os.environ.copy()
+            env["DISPLAY"] = ":0"
+            env["XAUTHORITY"] = f"/home/{os.getlogin()}/.Xauthority"
+            subprocess.Popen([specific_browser, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        else:
             webbrowser.open(url)
+
+    def _route_tweet(self, command, command_lower):
+        # 3. Post on Twitter (X)
+        # Check for "Council" request
+        if "council" in command or "made up" in command or "generate" in command:
+            self.speak("The Council is generating a tweet...")
+            self.scheduler.submit(self._perform_council_tweet, priority="tool")
             return True
 
+        content = command.replace("post on twitter", "").replace("tweet", "").strip()
+        self.speak("Opening X composer...")
+        url = f"https://x.com/compose/post"
+        if content:
+             url += f"?text={content}"
+        webbrowser.open(url)
+        return True
+
+    def _route_tracker_mode(self, command, command_lower):
         # 3. Tracker Mode Integration
-        if "tracker mode" in command or "tracking" in command:
-            if "deactivate" in command or "stop" in command or "disable" in command:
-                self.speak("Deactivating Tracker Mode.")
+        if "deactivate" in command or "stop" in command or "disable" in command:
+            self.speak("Deactivating Tracker Mode.")
+            if self._tracker_active():
                 self.tracker_eye.deactivate()
-                return True
-            elif "activate" in command or "start" in command or "enable" in command:
-                self.speak("Activating Tracker Mode.")
-                self.tracker_eye.activate(callback=self.image_callback)
-                return True
-
-        # Wiki Search
-        if "search wiki" in command or "wiki search" in command:
-            query = command.replace("search wiki for", "").replace("search wiki", "").replace("wiki search for", "").replace("wiki search", "").strip()
-            if query:
-                self.speak(f"Searching Wikipedia for {query}...")
-                summary = self.wiki_module.search(query)
-                self.memory_bank.add_memory(summary, source="wikipedia")
-                self.speak(f"Found it. {summary[:100]}...") # Speak brief intro
-                return False 
-
-        # 4. Memory Integration
-        if "remember" in command:
-            text_to_remember = command.split("remember", 1)[1].strip()
-            if text_to_remember:
-                self.speak(f"Storing memory: {text_to_remember}")
-                self.memory_bank.add_memory(text_to_remember, source="explicit")
-                return True
+            return True
+        elif "activate" in command or "start" in command or "enable" in command:
+            self.speak("Activating Tracker Mode.")
+            if self.capabilities.is_built("camera"):
+                self.camera.stop()  # TrackerEye opens the device itself
+            self.tracker_eye.activate(callback=self.image_callback)
+            return True
+        return None
 
+    def _route_wiki_search(self, command, command_lower):
+        query = command.replace("search wiki for", "").replace("search wiki", "").replace("wiki search for", "").replace("wiki search", "").strip()
+        if not query:
+            return None
+        self.speak(f"Searching Wikipedia for {query}...")
+        summary = self.wiki_module.search(query)
+        self.memory_bank.add_memory(summary, source="wikipedia")
+        self.speak(f"Found it. {summary[:100]}...") # Speak brief intro
+        return False
 
+    def _route_remember(self, command, command_lower):
+        # 4. Memory Integration
+        text_to_remember = command.split("remember", 1)[1].strip() if "remember" in command else ""
+        if not text_to_remember:
+            return None
+        self.speak(f"Storing memory: {text_to_remember}")
+        self.memory_bank.add_memory(text_to_remember, source="explicit")
+        return True
 
+    def _route_conversation_mode(self, command, command_lower):
         # 6. Conversation Mode (Project Zeta)
-        if "let's talk" in command or "start conversation" in command or "continuous mode" in command:
-            self.conversation_mode = True
-            self.active_mode = True
-            self.speak("Conversation Mode Active. I'm listening.")
-            return True
-        elif "stop talking" in command or "end conversation" in command:
+        if "stop talking" in command_lower or "end conversation" in command_lower:
             self.conversation_mode = False
             self.active_mode = False
             self.speak("Conversation Mode Deactivated.")
             return True
+        self.conversation_mode = True
+        self.active_mode = True
+        self.speak("Conversation Mode Active. I'm listening.")
+        return True
 
+    def _route_shutdown(self, command, command_lower):
         # 17. Shutdown/Exit Commands
-        if any(phrase in command_lower for phrase in ["close jarvis", "exit jarvis", "shutdown", "goodbye", "end program", "terminate"]):
-            self.speak("Goodbye! Shutting down.")
-            self.log("👋 User requested shutdown.", Fore.RED)
-            
-            # Forcefully close the GUI if it exists
-            if hasattr(self, 'main_window') and self.main_window:
-                try:
-                    self.main_window.close()
-                except:
-                    pass
-            
-            # Force exit
-            import os
-            os._exit(0)
+        self.speak("Goodbye! Shutting down.")
+        self.log("👋 User requested shutdown.", Fore.RED)
 
+        # Forcefully close the GUI if it exists
+        if hasattr(self, 'main_window') and self.main_window:
+            try:
+                self.main_window.close()
+            except:
+                pass
+
+        # Force exit (skips atexit, so flush pending memories first)
+        self.memory_writer.close(timeout=3)
+        os._exit(0)
+
+    def _route_switch_model(self, command, command_lower):
         # 7. Model Switching
-        if "switch model" in command or "change model" in command or "swap model" in command:
-            target_model = command.replace("switch model to", "").replace("change model to", "").replace("switch model", "").replace("change model", "").replace("swap model to", "").strip()
-            
-            # Map common spoken names to Ollama tags
-            MODEL_MAP = {
-                "mistral": "mistral",
-                "dolphin": "dolphin-mistral",
-                "qwen": "qwen2.5:7b",
-                "neural": "neural-chat",
-                "neural chat": "neural-chat",
-                "llama": "llama3.1",
-                "lava": "llava",
-                "vision": "llava"
-            }
-            
-            # Fuzzy match or direct lookup
-            new_model = MODEL_MAP.get(target_model, target_model)
-            
-            if new_model:
-                self.speak(f"Switching brain to {new_model}.")
-                self.chat_model = new_model
-                self.log(f"🔄 Switched Model to: {self.chat_model}", Fore.CYAN)
-                return True
-            else:
-                self.speak("Which model? I know Mistral, Qwen, Neural Chat, and LLaVA.")
-                return True
+        target_model = command.replace("switch model to", "").replace("change model to", "").replace("switch model", "").replace("change model", "").replace("swap model to", "").strip()
 
-        if "list models" in command or "what models" in command or "list available models" in command:
-            self.speak("I currently have access to: Mistral, Dolphin Mistral, Qwen, Neural Chat, and LLaVA.")
-            return True
+        # Fuzzy match or direct lookup
+        new_model = MODEL_MAP.get(target_model, target_model)
+
+        if new_model:
+            self.speak(f"Switching brain to {new_model}.")
+            self.chat_model = new_model
+            self.log(f"🔄 Switched Model to: {self.chat_model}", Fore.CYAN)
+        else:
+            self.speak("Which model? I know Mistral, Qwen, Neural Chat, and LLaVA.")
+        return True
+
+    def _route_list_models(self, command, command_lower):
+        self.speak("I currently have access to: Mistral, Dolphin Mistral, Qwen, Neural Chat, and LLaVA.")
+        return True
 
+    def _route_help(self, command, command_lower):
         # 7.5 Help / Manual
-        if "help" in command or "manual" in command or "what can you do" in command or "guide" in command:
-            self.speak("Opening the help guide.")
-            help_path = "/mnt/fast_data/projects/vision_agent/HELP.md"
-            # Try to open with default editor or browser
-            if os.path.exists(help_path):
-                subprocess.Popen(["xdg-open", help_path])
-            else:
-                self.speak("I couldn't find the help file.")
-            return True
+        self.speak("Opening the help guide.")
+        help_path = "/mnt/fast_data/projects/vision_agent/HELP.md"
+        # Try to open with default editor or browser
+        if os.path.exists(help_path):
+            subprocess.Popen(["xdg-open", help_path])
+        else:
+            self.speak("I couldn't find the help file.")
+        return True
 
+    def _route_type_text(self, command, command_lower):
         # 8. Typing
-        if "type" in command:
-            text_to_type = command.split("type", 1)[1].strip()
-            self.speak(f"Typing: {text_to_type}")
-            pyautogui.write(text_to_type, interval=0.05)
-            return True
+        text_to_type = re.split(r"\btype\b", command, maxsplit=1, flags=re.IGNORECASE)[-1].strip()
+        self.speak(f"Typing: {text_to_type}")
+        _gui().write(text_to_type, interval=0.05)
+        return True
 
+    def _route_shell(self, command, command_lower):
         # 9. Shell / File System Operations
-        # Flexible Matching: Check if command STARTS with a strong action verb
-        # FIX: Use regex to avoid substring matches (e.g. "cat" in "implications")
-        shell_keywords = ["create file", "delete", "remove", "list files", "run command", "shell", "make directory", "touch", "mkdir", "cat", "read file"]
-        
-        is_shell = False
-        for kw in shell_keywords:
-            # Check for whole word match
-            if re.search(r'\b' + re.escape(kw) + r'\b', command):
-                is_shell = True
-                break
-        
-        if is_shell:
-            # self.speak("Executing shell command...") # SILENCED
-            threading.Thread(target=self._handle_shell_command, args=(command,)).start()
-            return True
+        # self.speak("Executing shell command...") # SILENCED
+        self.scheduler.submit(self._handle_shell_command, command, priority="tool")
+        return True
 
+    def _route_write_document(self, command, command_lower):
         # 10. Document Generation (Writer Mode)
-        if "write" in command and any(w in command for w in ["paper", "essay", "article", "report", "document"]):
-            topic = command.replace("write a", "").replace("write me a", "").replace("write an", "").replace("research paper", "").replace("paper", "").replace("essay", "").replace("article", "").replace("about", "").replace("on", "").strip()
-            # Clean up "put it on my desktop" etc.
-            topic = topic.split("put it")[0].split("save it")[0].strip()
-            
-            if topic:
-                threading.Thread(target=self._generate_document, args=(topic, "research paper")).start()
-                return True
+        topic = command.replace("write a", "").replace("write me a", "").replace("write an", "").replace("research paper", "").replace("paper", "").replace("essay", "").replace("article", "").replace("about", "").replace("on", "").strip()
+        # Clean up "put it on my desktop" etc.
+        topic = topic.split("put it")[0].split("save it")[0].strip()
+        if not topic:
+            return None
+        self.scheduler.submit(self._generate_document, topic, "research paper", priority="tool")
+        return True
 
+    def _route_system_status(self, command, command_lower):
         # 11. System Control (The Operator)
-        if "system status" in command or "system health" in command:
-            stats = self.system_module.get_system_stats()
-            self.speak(f"CPU is at {stats['cpu']} percent. RAM usage is at {stats['ram']} percent.")
-            return True
-
-        if "clean ram" in command or "clear memory" in command:
-            self.speak("Attempting to clear system memory...")
-            result = self.system_module.clean_ram()
-            self.speak(result)
-            return True
-
-        if "close high cpu" in command:
-            procs = self.system_module.get_high_cpu_processes()
-            if not procs:
-                self.speak("System is stable. No high CPU processes found.")
-            else:
-                top_proc = procs[0]
-                name = top_proc['name']
-                cpu = top_proc['cpu_percent']
-                self.speak(f"High CPU detected: {name} at {cpu} percent. Killing it.")
-                self.system_module.kill_process_by_name(name)
-            return True
-
+        stats = self.system_module.get_system_stats()
+        self.speak(f"CPU is at {stats['cpu']} percent. RAM usage is at {stats['ram']} percent.")
+        return True
+
+    def _route_clean_ram(self, command, command_lower):
+        self.speak("Attempting to clear system memory...")
+        result = self.system_module.clean_ram()
+        self.speak(result)
+        return True
+
+    def _route_close_high_cpu(self, command, command_lower):
+        procs = self.system_module.get_high_cpu_processes()
+        if not procs:
+            self.speak("System is stable. No high CPU processes found.")
+        else:
+            top_proc = procs[0]
+            name = top_proc['name']
+            cpu = top_proc['cpu_percent']
+            self.speak(f"High CPU detected: {name} at {cpu} percent. Killing it.")
+            self.system_module.kill_process_by_name(name)
+        return True
+
+    def _route_ingest_file(self, command, command_lower):
         # 12. Local RAG (The Librarian)
-        if "read file" in command or "ingest file" in command or "read this file" in command:
-            path = command.replace("read file", "").replace("ingest file", "").replace("read this file", "").strip()
-            # Handle "on desktop" etc.
-            if "desktop" in path:
-                path = os.path.join(os.path.expanduser("~"), "Desktop", path.replace("on desktop", "").strip())
-            
-            self.speak(f"Reading file: {os.path.basename(path)}")
-            result = self.rag_module.ingest_file(path)
-            self.speak(result)
+        path = command.replace("read file", "").replace("ingest file", "").replace("read this file", "").strip()
+        # Handle "on desktop" etc.
+        if "desktop" in path:
+            path = os.path.join(os.path.expanduser("~"), "Desktop", path.replace("on desktop", "").strip())
+
+        self.speak(f"Reading file: {os.path.basename(path)}")
+        result = self.rag_module.ingest_file(path)
+        self.speak(result)
+        return True
+
+    def _route_tv(self, command, command_lower):
+        # 13. Home Automation (The Butler) - TV/Media Control
+        if "turn on" in command or "power on" in command:
+            self.speak("Turning on the TV.")
+            result = self.home_automation.media_turn_on("tv")
+        elif "turn off" in command or "power off" in command:
+            self.speak("Turning off the TV.")
+            result = self.home_automation.media_turn_off("tv")
+        elif "unmute" in command:
+            self.speak("Unmuting the TV.")
+            result = self.home_automation.media_mute("tv", mute=False)
+        elif "mute" in command:
+            self.speak("Muting the TV.")
+            result = self.home_automation.media_mute("tv", mute=True)
+        elif "volume up" in command or "louder" in command:
+            self.speak("Turning up the volume.")
+            result = self.home_automation.media_volume_up("tv")
+        elif "volume down" in command or "quieter" in command:
+            self.speak("Turning down the volume.")
+            result = self.home_automation.media_volume_down("tv")
+        elif "play" in command and "netflix" in command:
+            self.speak("Opening Netflix on TV.")
+            result = self.home_automation.media_play_app("Netflix", "tv")
+        elif "play" in command and "youtube" in command:
+            self.speak("Opening YouTube on TV.")
+            result = self.home_automation.media_play_app("YouTube", "tv")
+        else:
+            # Catchall for TV commands that don't match specific patterns
+            self.log(f"⚠️ TV command not recognized: '{command}'", Fore.YELLOW)
+            self.speak("I'm not sure what you want me to do with the TV.")
             return True
+        self.log(f"🏠 TV: {result}", Fore.CYAN)
+        return True
 
-        # 13. Home Automation (The Butler) - ENHANCED
-        
-        # TV/Media Control
-        if "tv" in command or "television" in command:
-            if "turn on" in command or "power on" in command:
-                self.speak("Turning on the TV.")
-                result = self.home_automation.media_turn_on("tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "turn off" in command or "power off" in command:
-                self.speak("Turning off the TV.")
-                result = self.home_automation.media_turn_off("tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "unmute" in command:
-                self.speak("Unmuting the TV.")
-                result = self.home_automation.media_mute("tv", mute=False)
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "mute" in command:
-                self.speak("Muting the TV.")
-                result = self.home_automation.media_mute("tv", mute=True)
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "volume up" in command or "louder" in command:
-                self.speak("Turning up the volume.")
-                result = self.home_automation.media_volume_up("tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "volume down" in command or "quieter" in command:
-                self.speak("Turning down the volume.")
-                result = self.home_automation.media_volume_down("tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "play" in command and "netflix" in command:
-                self.speak("Opening Netflix on TV.")
-                result = self.home_automation.media_play_app("Netflix", "tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            elif "play" in command and "youtube" in command:
-                self.speak("Opening YouTube on TV.")
-                result = self.home_automation.media_play_app("YouTube", "tv")
-                self.log(f"🏠 TV: {result}", Fore.CYAN)
-                return True
-            else:
-                # Catchall for TV commands that don't match specific patterns
-                self.log(f"⚠️ TV command not recognized: '{command}'", Fore.YELLOW)
-                self.speak("I'm not sure what you want me to do with the TV.")
-                return True
-        
+    def _route_climate(self, command, command_lower):
         # Climate/Temperature Control
-        if "temperature" in command or "thermostat" in command:
-            if "set" in command and "to" in command:
-                # Extract temperature: "set temperature to 72"
-                try:
-                    temp_str = command.split("to")[1].strip().split()[0]
-                    temp = int(''.join(filter(str.isdigit, temp_str)))
-                    self.speak(f"Setting temperature to {temp} degrees.")
-                    result = self.home_automation.climate_set_temperature(temp)
-                    self.log(f"🏠 Climate: {result}", Fore.CYAN)
-                    return True
-                except:
-                    self.speak("I didn't catch that temperature.")
-                    return True
-            elif "what" in command or "current" in command:
-                state = self.home_automation.climate_get_state("thermostat")
-                if state:
-                    current = state.get('current_temperature')
-                    target = state.get('target_temperature')
-                    self.speak(f"The current temperature is {current} degrees. The thermostat is set to {target}.")
-                else:
-                    self.speak("The thermostat isn't connected yet.")
-                return True
-        
-        # Appliance Status Queries - DELEGATED TO SEMANTIC PARSER
-        # (Removed hardcoded blocks for washer, dryer, dishwasher to let LLM handle it)
-
-        
-        # Scene Triggers
-        if "goodnight" in command or "good night" in command:
-            self.speak("Goodnight. Activating bedtime routine.")
-            # This will trigger once automations are created
-            result = self.home_automation.trigger_automation("automation.bedtime_routine")
-            self.log(f"🏠 Scene: {result}", Fore.CYAN)
-            return True
-        
-        if "movie mode" in command or "movie time" in command:
-            self.speak("Movie mode activated.")
-            result = self.home_automation.trigger_scene("movie_mode")
-            self.log(f"🏠 Scene: {result}", Fore.CYAN)
+        if "set" in command and "to" in command:
+            # Extract temperature: "set temperature to 72"
+            try:
+                temp_str = command.split("to")[1].strip().split()[0]
+                temp = int(''.join(filter(str.isdigit, temp_str)))
+                self.speak(f"Setting temperature to {temp} degrees.")
+                result = self.home_automation.climate_set_temperature(temp)
+                self.log(f"🏠 Climate: {result}", Fore.CYAN)
+            except:
+                self.speak("I didn't catch that temperature.")
             return True
-        
-        # Generic Home Automation (lights, switches)
-        if "turn on" in command or "turn off" in command:
-            target = command.replace("turn on", "").replace("turn off", "").strip()
-            entity_id = target.replace(" ", "_").lower()
-            if "light" not in entity_id and "switch" not in entity_id:
-                entity_id = f"light.{entity_id}"
-            
-            if "turn on" in command:
-                self.speak(f"Turning on {target}.")
-                result = self.home_automation.turn_on(entity_id)
+        elif "what" in command or "current" in command:
+            state = self.home_automation.climate_get_state("thermostat")
+            if state:
+                current = state.get('current_temperature')
+                target = state.get('target_temperature')
+                self.speak(f"The current temperature is {current} degrees. The thermostat is set to {target}.")
             else:
-                self.speak(f"Turning off {target}.")
-                result = self.home_automation.turn_off(entity_id)
-            
-            self.log(f"🏠 HASS: {result}", Fore.CYAN)
+                self.speak("The thermostat isn't connected yet.")
             return True
+        # Appliance Status Queries are delegated to the semantic parser
+        return None
 
+    def _route_goodnight(self, command, command_lower):
+        # Scene Triggers
+        self.speak("Goodnight. Activating bedtime routine.")
+        # This will trigger once automations are created
+        result = self.home_automation.trigger_automation("automation.bedtime_routine")
+        self.log(f"🏠 Scene: {result}", Fore.CYAN)
+        return True
+
+    def _route_movie_mode(self, command, command_lower):
+        self.speak("Movie mode activated.")
+        result = self.home_automation.trigger_scene("movie_mode")
+        self.log(f"🏠 Scene: {result}", Fore.CYAN)
+        return True
+
+    def _route_power(self, command, command_lower):
+        # Generic Home Automation (lights, switches)
+        target = command.replace("turn on", "").replace("turn off", "").strip()
+        entity_id = target.replace(" ", "_").lower()
+        if "light" not in entity_id and "switch" not in entity_id:
+            entity_id = f"light.{entity_id}"
+
+        if "turn on" in command_lower:
+            self.speak(f"Turning on {target}.")
+            result = self.home_automation.turn_on(entity_id)
+        else:
+            self.speak(f"Turning off {target}.")
+            result = self.home_automation.turn_off(entity_id)
 
+        self.log(f"🏠 HASS: {result}", Fore.CYAN)
+        return True
 
-
-
+    def _route_write_script(self, command, command_lower):
         # 14. Agentic Coding (The Developer)
-        if "write a script" in command or "code a script" in command or "generate code" in command:
-            prompt = command.replace("write a script", "").replace("to", "", 1).strip()
-            if prompt:
-                script_path = self._generate_script(prompt)
-                if script_path:
-                    self._execute_script(script_path)
-            return True
-
-        # 15. Generic Web Search (Fallback - MOVED TO END)
-        # 15. Generic Web Search (Fallback - MOVED TO END)
-        # Matches "google X" or "search for X"
-        # FIXED: Use DuckDuckGo instead of opening browser directly
-        # 15. Generic Web Search (Fallback - MOVED TO END)
-        # Matches "google X" or "search for X"
-        # FIXED: Use DuckDuckGo instead of opening browser directly
-        if "google" in command_lower or "search" in command_lower:
-            # CRITICAL FIX: Do NOT trigger search if the user said "Research" (Automation Agent)
-            # This prevents "Research quantum computing" from falling back to "Search for quantum computing"
-            if command_lower.startswith("research") or command_lower.startswith("investigate") or command_lower.startswith("deep dive"):
-                return False
-
-            # Avoid matching "research" by checking word boundaries or specific phrasing if needed
-            # But for now, let's just route to DuckDuckGo
-            query = command.replace("google", "").replace("search", "").replace("for", "").strip()
-            if query:
-                self.speak(f"Searching DuckDuckGo for {query}")
-                # Use the MCP tool directly
-                if self.mcp_manager:
-                    result = self.mcp_manager.execute_tool("duckduckgo_search", {"query": query})
-                    self.log(f"🔍 Search Result: {result[:200]}...", Fore.GREEN)
-                    # Ideally, we should summarize this, but for now just logging it is fine.
-                    # Or we can speak a summary if we had a summarizer here.
-                    self.speak("I found some results. Check the logs.")
-                else:
-                    # Fallback if MCP not available (shouldn't happen)
-                    url = f"https://duckduckgo.com/?q={query}"
-                    webbrowser.open(url)
-                    logging.info(f"Opened DuckDuckGo Search: {url}")
-                return True
+        prompt = command.replace("write a script", "").replace("to", "", 1).strip()
+        if prompt:
+            script_path = self._generate_script(prompt)
+            if script_path:
+                self._execute_script(script_path)
+        return True
+
+    def _route_web_search(self, command, command_lower):
+        # 15. Generic Web Search (Fallback)
+        # Do NOT trigger search if the user said "Research" (Automation Agent)
+        if command_lower.startswith("research") or command_lower.startswith("investigate") or command_lower.startswith("deep dive"):
+            return False
+
+        query = command.replace("google", "").replace("search", "").replace("for", "").strip()
+        if not query:
+            return None
+        self.speak(f"Searching DuckDuckGo for {query}")
+        # Use the MCP tool directly
+        if self.mcp_manager:
+            result = self.mcp_manager.execute_tool("duckduckgo_search", {"query": query})
+            self.log(f"🔍 Search Result: {result[:200]}...", Fore.GREEN)
+            # Ideally, we should summarize this, but for now just logging it is fine.
+            self.speak("I found some results. Check the logs.")
+        else:
+            # Fallback if MCP not available (shouldn't happen)
+            url = f"https://duckduckgo.com/?q={query}"
+            webbrowser.open(url)
+            logging.info(f"Opened DuckDuckGo Search: {url}")
+        return True
 
+    def _route_see_screen(self, command, command_lower):
         # 16. Multi-Modal Vision (True Sight)
-        if "what is on my screen" in command or "analyze screen" in command or "look at my screen" in command:
-            self.see_screen()
-            return True
-
-        if "what am i holding" in command or "what do you see" in command or "analyze camera" in command or "can you see me" in command:
-            self.see_webcam()
-            return True
+        self.see_screen()
+        return True
 
-        return False
+    def _route_see_webcam(self, command, command_lower):
+        self.see_webcam()
+        return True
 
     def _handle_shell_command(self, user_request):
         """Translates natural language to Bash and executes it."""
@@ -1191,7 +1288,7 @@ class InteractiveAgent:
             CONSTRAINT: Output ONLY the command. No markdown, no explanations, no backticks.
             """
             
-            response = ollama.chat(model=self.chat_model, messages=[
+            response = llm_gateway.chat(model=self.chat_model, messages=[
                 {'role': 'system', 'content': system_prompt},
                 {'role': 'user', 'content': user_request}
             ])
@@ -1249,7 +1346,7 @@ class InteractiveAgent:
                 CONSTRAINT: Output ONLY the command string. NO EXPLANATION. NO MARKDOWN.
                 """
                 
-                response = ollama.chat(model=self.chat_model, messages=[
+                response = llm_gateway.chat(model=self.chat_model, messages=[
                     {'role': 'system', 'content': retry_prompt}
                 ])
                 
@@ -1318,7 +1415,7 @@ class InteractiveAgent:
         """
         
         try:
-            response = ollama.chat(model=self.chat_model, messages=[{'role': 'user', 'content': prompt}])
+            response = llm_gateway.chat(model=self.chat_model, messages=[{'role': 'user', 'content': prompt}])
             content = response['message']['content']
             
             # 3. Save to Desktop
@@ -1351,7 +1448,7 @@ class InteractiveAgent:
         """
         
         try:
-            response = ollama.chat(model=self.chat_model, messages=[
+            response = llm_gateway.chat(model=self.chat_model, messages=[
                 {'role': 'system', 'content': system_prompt},
                 {'role': 'user', 'content': prompt}
             ])
@@ -1411,18 +1508,13 @@ class InteractiveAgent:
         self.speak("Analyzing screen...")
         try:
             # Capture
-            path = self.see_screen()
-            if not path: return None
+            image_bytes = self.see_screen()
+            if not image_bytes: return None
             
-            # Analyze
-            with open(path, "rb") as f:
-                image_bytes = f.read()
-                
-            response = ollama.chat(model="llava", messages=[
-                {'role': 'user', 'content': "Describe what is on this screen in detail.", 'images': [image_bytes]}
-            ])
-            
-            description = response['message']['content']
+            # Analyze (Vision Expert caches by content: an unchanged screen skips LLaVA)
+            description = self.vision_expert.analyze_image(image_bytes, "Describe what is on this screen in detail.")
+            if description.startswith("Error"):
+                raise RuntimeError(description)
             self.log(f"👁️ Vision Analysis: {description}", Fore.MAGENTA)
             self.speak(description)
             return description
@@ -1437,18 +1529,13 @@ class InteractiveAgent:
         self.speak("Looking at you...")
         try:
             # Capture
-            path = self.see_webcam()
-            if not path: return None
+            image_bytes = self.see_webcam()
+            if not image_bytes: return None
             
-            # Analyze
-            with open(path, "rb") as f:
-                image_bytes = f.read()
-                
-            response = ollama.chat(model="llava", messages=[
-                {'role': 'user', 'content': "Describe what you see in this image in detail.", 'images': [image_bytes]}
-            ])
-            
-            description = response['message']['content']
+            # Analyze (Vision Expert caches by perceptual hash: an unchanged scene skips LLaVA)
+            description = self.vision_expert.analyze_image(image_bytes, "Describe what you see in this image in detail.", near_duplicate=True)
+            if description.startswith("Error"):
+                raise RuntimeError(description)
             self.log(f"👁️ Vision Analysis: {description}", Fore.MAGENTA)
             self.speak(description)
             return description
@@ -1476,19 +1563,19 @@ class InteractiveAgent:
             
             # 2. Generate Tweet (The Council)
             prompt = "Write a single, short, funny tweet (under 280 chars) about being a sentient AI named Jarvis. No hashtags. Just the text."
-            response = ollama.chat(model=self.chat_model, messages=[{'role': 'user', 'content': prompt}])
+            response = llm_gateway.chat(model=self.chat_model, messages=[{'role': 'user', 'content': prompt}])
             tweet_content = response['message']['content'].strip().strip('"')
             
             self.log(f"🐦 Council Generated: {tweet_content}", Fore.MAGENTA)
             self.speak(f"Typing: {tweet_content}")
             
             # 3. Type Tweet
-            pyautogui.write(tweet_content, interval=0.05)
+            _gui().write(tweet_content, interval=0.05)
             time.sleep(1)
             
             # 4. Post (Ctrl + Enter is the shortcut)
             self.speak("Posting now.")
-            pyautogui.hotkey('ctrl', 'enter')
+            _gui().hotkey('ctrl', 'enter')
             self.log("✅ Tweet Posted via Shortcut", Fore.GREEN)
             
         except Exception as e:
@@ -1524,7 +1611,7 @@ class InteractiveAgent:
             """
             
             # 2. Query LLM (Use a smaller/faster model if possible, or same chat model)
-            response = ollama.chat(model=self.chat_model, messages=[{'role': 'user', 'content': analysis_prompt}])
+            response = llm_gateway.chat(model=self.chat_model, messages=[{'role': 'user', 'content': analysis_prompt}])
             fact = response['message']['content'].strip()
             
             # 3. Store if Valid
@@ -1532,7 +1619,7 @@ class InteractiveAgent:
                 # Clean up "OUTPUT:" prefix if present
                 fact = fact.replace("OUTPUT:", "").strip()
                 self.log(f"🧠 Memory Ingestion: '{fact}'", Fore.MAGENTA)
-                self.memory_bank.add_memory(fact, source="interaction")
+                self.memory_writer.add_memory(fact, source="interaction")
             else:
                 # logging.info("Memory Ingestion: No permanent fact found.")
                 pass
@@ -1569,15 +1656,153 @@ class InteractiveAgent:
         
 
 
-    def think(self, user_input, image_path=None):
+    def think(self, user_input, image=None):
+        """`image` is encoded image bytes (as returned by see_screen/see_webcam) or a file path."""
         self.log("🧠 Thinking...", Fore.MAGENTA)
         if self.state_callback: self.state_callback("thinking")
         
-        model = VISION_MODEL if image_path else self.chat_model
+        try:
+            if image and not self._is_click_task(user_input):
+                # Questions about an image reuse the Vision Expert's cached description
+                content = self.vision_expert.deep_analysis(image, user_input)
+            else:
+                model, messages = self._build_think_messages(user_input, image)
+                content = llm_gateway.chat(model=model, messages=messages)['message']['content']
+            clean_content = self._finish_think(user_input, content, image)
+            
+            if clean_content:
+                self.speak(clean_content)
+                
+            return clean_content if clean_content else "Done."
+        except Exception as e:
+            logging.error(f"Ollama Error: {e}")
+            return f"Brain freeze: {e}"
+
+    async def think_async(self, user_input, image=None):
+        """think() for the event loop: no thread is held while the model generates."""
+        self.log("🧠 Thinking...", Fore.MAGENTA)
+        if self.state_callback: self.state_callback("thinking")
+
+        try:
+            if image and not self._is_click_task(user_input):
+                content = await self._offload(lambda: self.vision_expert.deep_analysis(image, user_input))
+            else:
+                # Memory, wiki and weather lookups are blocking
+                model, messages = await self._offload(self._build_think_messages, user_input, image)
+                content = (await llm_gateway.achat(model=model, messages=messages))['message']['content']
+            # Tool calls, history and memory writes are blocking
+            clean_content = await self._offload(self._finish_think, user_input, content, image)
+
+            if clean_content:
+                await self._offload(self.speak, clean_content)
+
+            return clean_content if clean_content else "Done."
+        except Exception as e:
+            logging.error(f"Ollama Error: {e}")
+            return f"Brain freeze: {e}"
+
+    def think_stream(self, user_input, cancel=None):
+        """
+        Streaming variant of think() for text prompts.
+        Yields events as they happen:
+          {"type": "token", "text": ...}       - raw model tokens
+          {"type": "sentence", "text": ..., "audio": base64 WAV or None}
+          {"type": "done", "response": ...}    - after the last sentence's audio
+        Tokens are read on one thread while a second thread synthesizes each completed
+        sentence, so the first audio is ready long before the full reply is.
+        `cancel` (a threading.Event) stops both early, e.g. when the client disconnects;
+        closing the generator sets it too.
+        """
+        self.log("🧠 Thinking (streaming)...", Fore.MAGENTA)
+        if self.state_callback: self.state_callback("thinking")
+
+        model, messages = self._build_think_messages(user_input)
+        cancel = cancel or threading.Event()
+        events = queue.Queue()
+        sentences = queue.Queue()
+        outcome = {}
+
+        def read_tokens():
+            chunker = SentenceChunker()
+            content = ""
+            try:
+                if cancel.is_set():
+                    return  # Abandoned before it got a worker
+                stream = llm_gateway.chat(model=model, messages=messages, stream=True)
+                for chunk in stream:
+                    if cancel.is_set():
+                        logging.info("🧠 think_stream: Client went away. Stopping generation.")
+                        stream.close()  # Releases the model slot now, not when the reply would have ended
+                        break
+                    token = chunk['message']['content']
+                    if not token:
+                        continue
+                    content += token
+                    events.put({"type": "token", "text": token})
+                    for sentence in chunker.feed(token):
+                        sentences.put(sentence)
+                if not cancel.is_set():
+                    for sentence in chunker.flush():
+                        sentences.put(sentence)
+                    outcome["response"] = self._finish_think(user_input, content) or "Done."
+            except Exception as e:
+                logging.error(f"Ollama Error: {e}")
+                outcome["response"] = f"Brain freeze: {e}"
+            finally:
+                sentences.put(None)
+
+        def voice_sentences():
+            while True:
+                sentence = sentences.get()
+                if sentence is None or cancel.is_set():
+                    break
+                # Never voice a tool call the model emitted mid-stream
+                sentence = re.sub(r'<tool_call>.*', '', sentence, flags=re.DOTALL).strip()
+                if not sentence:
+                    continue
+                self.log(f"🤖 Jarvis: {sentence}", Fore.GREEN)
+                audio = None
+                if self.api_mode:
+                    audio = self._encode_audio(sentence)
+                elif not self.is_muted:
+                    if self.state_callback: self.state_callback("talking")
+                    self._play_local(sentence)
+                events.put({"type": "sentence", "text": sentence, "audio": audio})
+            events.put({"type": "done", "response": outcome.get("response", "Done.")})
+
+        self.scheduler.submit(read_tokens, priority="interactive", name="think_stream.tokens")
+        # The voice consumer mostly waits on the token reader, so it gets its own thread
+        # instead of holding an interactive slot (in this session's context).
+        threading.Thread(target=contextvars.copy_context().run, args=(voice_sentences,),
+                         daemon=True, name="think_stream.voice").start()
+
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    if cancel.is_set():
+                        return
+                    continue
+                yield event
+                if event["type"] == "done":
+                    if self.state_callback: self.state_callback("idle")
+                    return
+        finally:
+            cancel.set()
+
+    @staticmethod
+    def _is_click_task(user_input):
+        """Clicking needs the raw pixels (the model returns coordinates), not a description."""
+        return "click" in user_input.lower() or "press" in user_input.lower()
+
+    def _build_think_messages(self, user_input, image=None):
+        """Builds the system prompt (memory, weather, wiki, vision) and chat messages for a turn."""
+        model = VISION_MODEL if image else self.chat_model
         
         # Memory Retrieval
         memory_context = ""
-        if not image_path:
+        if not image:
             # 0. Weather Check
             weather_data = None
             if "weather" in user_input.lower() or "temperature" in user_input.lower():
@@ -1617,9 +1842,9 @@ class InteractiveAgent:
                 memory_context += f"\n**VAULT DATA (MEMORIES):**\n- {memories}\n"
                 self.log(f"🧠 Recalled: {memories}", Fore.CYAN)
 
-        if image_path:
+        if image:
             # VISION MODE: Override everything. No Council. No Weather. Just Vision.
-            if "click" in user_input.lower() or "press" in user_input.lower():
+            if self._is_click_task(user_input):
                 system_msg = """
                 You are a GUI Automation Agent.
                 TASK: Locate the element the user wants to click.
@@ -1721,69 +1946,63 @@ INSTRUCTION: Use this information to answer the user's question accurately.
         # Add current user input
         messages.append({'role': 'user', 'content': user_input})
         
-        if image_path:
-            messages[-1]['images'] = [image_path]
+        if image:
+            messages[-1]['images'] = [image]
             self.log(f"👁️ Using Vision Model: {model}", Fore.MAGENTA)
             logging.info(f"Sending image to {model}")
-        
-        try:
-            response = ollama.chat(model=model, messages=messages)
-            content = response['message']['content']
-            
-            # Tool Call Execution (Visual Clicking)
-            tool_match = re.search(r'<tool_call>(.*?)</tool_call>', content, flags=re.DOTALL)
-            if tool_match:
-                try:
-                    tool_json = tool_match.group(1).strip()
-                    # Simple JSON parsing (Ollama sometimes outputs loose JSON)
-                    import json
-                    tool_data = json.loads(tool_json)
-                    
-                    if tool_data.get("name") == "neuralforge":
-                        args = tool_data.get("arguments", {})
-                        if args.get("action") == "left_click":
-                            coords = args.get("coordinate")
-                            if coords and len(coords) == 2:
-                                x, y = coords
-                                self.log(f"🖱️ Clicking at {x}, {y}", Fore.YELLOW)
-                                pyautogui.click(x, y)
-                                self.speak("Clicking.")
-                except Exception as e:
-                    logging.error(f"Tool Execution Failed: {e}")
-
-            # Filter out <tool_call> tags
-            clean_content = re.sub(r'<tool_call>.*?</tool_call>', '', content, flags=re.DOTALL).strip()
-            clean_content = re.sub(r'<tool_call>.*', '', clean_content, flags=re.DOTALL) # Catch unclosed tags
-            clean_content = clean_content.strip()
-            
-            logging.info(f"Model Response: {content}")
-            
-            # Update History
-            if not image_path: # Don't save image interactions to text history for now
-                self.chat_history.append({'role': 'user', 'content': user_input})
-                self.chat_history.append({'role': 'assistant', 'content': clean_content})
+
+        return model, messages
+
+    def _finish_think(self, user_input, content, image=None):
+        """Runs any visual tool call in the reply, strips tool tags and records history."""
+        # Tool Call Execution (Visual Clicking)
+        tool_match = re.search(r'<tool_call>(.*?)</tool_call>', content, flags=re.DOTALL)
+        if tool_match:
+            try:
+                tool_json = tool_match.group(1).strip()
+                # Simple JSON parsing (Ollama sometimes outputs loose JSON)
+                import json
+                tool_data = json.loads(tool_json)
                 
-                # PERSISTENCE FOR API MODE
-                if self.api_mode:
-                    self.history_manager.add_turn("user", user_input)
-                    self.history_manager.add_turn("assistant", clean_content)
-                    # Trigger Long-Term Memory Analysis
-                    threading.Thread(target=self._analyze_and_store_memory, args=(user_input, clean_content)).start()
+                if tool_data.get("name") == "neuralforge":
+                    args = tool_data.get("arguments", {})
+                    if args.get("action") == "left_click":
+                        coords = args.get("coordinate")
+                        if coords and len(coords) == 2:
+                            x, y = coords
+                            self.log(f"🖱️ Clicking at {x}, {y}", Fore.YELLOW)
+                            _gui().click(x, y)
+                            self.speak("Clicking.")
+            except Exception as e:
+                logging.error(f"Tool Execution Failed: {e}")
+
+        # Filter out <tool_call> tags
+        clean_content = re.sub(r'<tool_call>.*?</tool_call>', '', content, flags=re.DOTALL).strip()
+        clean_content = re.sub(r'<tool_call>.*', '', clean_content, flags=re.DOTALL) # Catch unclosed tags
+        clean_content = clean_content.strip()
+        
+        logging.info(f"Model Response: {content}")
+        
+        # Update History
+        if not image: # Don't save image interactions to text history for now
+            self.chat_history.append({'role': 'user', 'content': user_input})
+            self.chat_history.append({'role': 'assistant', 'content': clean_content})
             
-            if clean_content:
-                self.speak(clean_content)
-                
-            return clean_content if clean_content else "Done."
-        except Exception as e:
-            logging.error(f"Ollama Error: {e}")
-            return f"Brain freeze: {e}"
+            # PERSISTENCE FOR API MODE
+            if self.api_mode:
+                self.history_manager.add_turn("user", user_input)
+                self.history_manager.add_turn("assistant", clean_content)
+                # Trigger Long-Term Memory Analysis
+                self.memory_writer.submit(self._analyze_and_store_memory, user_input, clean_content)
+
+        return clean_content
 
     def run(self, stop_event):
         self.speak("I am listening.")
         
         while not stop_event.is_set():
             # Active Tracking Logic
-            if self.tracker_eye.is_active:
+            if self._tracker_active():
                 current_objects = self.tracker_eye.get_labels()
                 # Filter out common noise if needed, or just report changes
                 # Simple logic: If set of objects changes, announce new ones
@@ -1821,7 +2040,7 @@ INSTRUCTION: Use this information to answer the user's question accurately.
 
             # TOTAL RECALL: Auto-save user input -> REMOVED (Blind Ingestion)
             if text.strip():
-                self.memory_bank.add_memory(f"User said: {text}", source="interaction")
+                self.memory_writer.add_memory(f"User said: {text}", source="interaction")
             self.history_manager.add_turn("user", text)
 
             command = ""
@@ -1839,7 +2058,7 @@ INSTRUCTION: Use this information to answer the user's question accurately.
                     
                     # Project Theta: Trigger Learning
                     recent_history = self.history_manager.get_recent_history(20)
-                    threading.Thread(target=self.learning_module.learn_from_session, args=(recent_history,)).start()
+                    self.scheduler.submit(self.learning_module.learn_from_session, recent_history, priority="background")
                     continue
                 
                 command = text
@@ -1864,34 +2083,35 @@ INSTRUCTION: Use this information to answer the user's question accurately.
                     if self.state_callback: self.state_callback("idle")
                     continue
 
-                image_path = None
+                image = None
                 # Expanded Vision Triggers
                 vision_phrases = ["look at me", "see me", "what do you see", "describe view", "what is this", "watch me"]
                 screen_phrases = ["look at screen", "see screen", "see my screen", "look at my screen", "what is on my screen", "read my screen", "click", "press"]
                 
                 if any(phrase in command for phrase in vision_phrases):
-                    image_path = self.see_webcam()
+                    image = self.see_webcam()
                 elif any(phrase in command for phrase in screen_phrases):
-                    image_path = self.see_screen()
+                    image = self.see_screen()
 
                 # Sanitize Prompt for Safety
                 safe_command = command.replace("predator vision", "object detection overlay")
                 
-                response = self.think(safe_command, image_path)
+                response = self.think(safe_command, image)
                 # self.speak(response) # REMOVED: think() now handles speaking
                 
                 # TOTAL RECALL: Auto-save agent response -> REMOVED (Blind Ingestion)
                 if response.strip():
-                    self.memory_bank.add_memory(f"Jarvis replied: {response}", source="interaction")
+                    self.memory_writer.add_memory(f"Jarvis replied: {response}", source="interaction")
                 self.history_manager.add_turn("assistant", response)
                 
-                # INTELLIGENT MEMORY INGESTION (Background)
-                threading.Thread(target=self._analyze_and_store_memory, args=(text, response)).start()
+                # INTELLIGENT MEMORY INGESTION (Background, on the memory writer thread)
+                self.memory_writer.submit(self._analyze_and_store_memory, text, response)
             
             time.sleep(0.1)
         
-        if self.tracker_eye.is_active:
+        if self._tracker_active():
             self.tracker_eye.deactivate()
+        self.memory_writer.close()
         self.log("🛑 Agent Stopped.", Fore.RED)
         if self.state_callback: self.state_callback("idle")
 
@@ -1,79 +1,312 @@
+import hashlib
+import json
 import logging
 import os
 import time
 import threading
 import re
-from typing import List
+from typing import List, Dict, Any, Tuple
 from vision_agent.memory.memory_bank import MemoryBank
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+DEFAULT_MANIFEST_PATH = os.path.expanduser("~/.cache/jarvis/archivist_manifest.json")
+CHUNK_CHARS = 1000    # Target chunk size (one embedding each)
+BATCH_SIZE = 64       # Chunks per embedding/upsert call
+DEBOUNCE_SECONDS = 2  # Editors save in bursts; wait for them to settle
+
+
+class _DirtyNoteHandler(FileSystemEventHandler):
+    def __init__(self, archivist: "MemoryArchivist"):
+        self.archivist = archivist
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and path.endswith(".md") and not self.archivist.is_hidden(path):
+                self.archivist.mark_dirty(path)
+
+
+def chunk_note(title: str, content: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Splits a note on headings/paragraphs into chunks of at most ~max_chars, each prefixed with the title."""
+    sections = re.split(r"\n(?=#{1,6} )|\n\s*\n", content)
+    chunks, current = [], ""
+    for section in sections:
+        section = section.strip()
+        if not section:
+            continue
+        while len(section) > max_chars:
+            # A single huge paragraph: hard-split it
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(section[:max_chars])
+            section = section[max_chars:]
+        if current and len(current) + len(section) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{section}" if current else section
+    if current:
+        chunks.append(current)
+    return [f"Note: {title}\n{chunk}" for chunk in chunks]
+
+
 class MemoryArchivist:
-    def __init__(self, vault_path: str, memory_bank: MemoryBank):
-        self.vault_path = vault_path
+    """
+    Mirrors the Obsidian vault into the Memory Bank incrementally.
+
+    A manifest records (mtime, size, content hash, chunk IDs) per note. Only notes
+    whose mtime/size changed are re-read, only those whose hash changed are
+    re-chunked, and chunk IDs are content-addressed so unchanged chunks are never
+    re-embedded. New chunks are upserted in batches; chunks that disappeared are
+    deleted. With watchdog installed, file events drive the work instead of the
+    fixed sleep loop.
+    """
+
+    def __init__(self, vault_path: str, memory_bank: MemoryBank, manifest_path: str = None):
+        self.vault_path = os.path.abspath(vault_path)
         self.memory_bank = memory_bank
-        self.interval = 300  # Run every 5 minutes
+        self.manifest_path = manifest_path or os.getenv("JARVIS_ARCHIVIST_MANIFEST", DEFAULT_MANIFEST_PATH)
+        self.interval = 300  # Full rescan every 5 minutes (safety net only when watching)
         self.running = False
         self.thread = None
+        self.observer = None
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._manifest_dirty = False
+        self.backend = self._detect_backend()
+
+    # --- Memory Bank adapter ---
+
+    def _detect_backend(self) -> str:
+        """Uses the cheapest write path this MemoryBank offers."""
+        bank = self.memory_bank
+        if hasattr(bank, "upsert_memories") and hasattr(bank, "delete_memories"):
+            return "bank"
+        collection = getattr(bank, "collection", None)
+        if collection is not None and hasattr(collection, "upsert") and hasattr(collection, "delete"):
+            return "collection"
+        logging.warning("🧠 Archivist: MemoryBank has no upsert/delete. New chunks will be added, stale ones kept.")
+        return "add_only"
+
+    def _upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]):
+        if self.backend == "bank":
+            self.memory_bank.upsert_memories(ids, texts, metadatas)
+        elif self.backend == "collection":
+            self.memory_bank.collection.upsert(ids=ids, documents=texts, metadatas=metadatas)
+        else:
+            for text in texts:
+                self.memory_bank.add_memory(text, source="vault")
+
+    def _delete(self, ids: List[str]):
+        if not ids:
+            return
+        if self.backend == "bank":
+            self.memory_bank.delete_memories(ids)
+        elif self.backend == "collection":
+            self.memory_bank.collection.delete(ids=ids)
+
+    # --- Manifest ---
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r") as f:
+                data = json.load(f)
+            if data.get("vault") == self.vault_path:
+                return data.get("notes", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"🧠 Archivist: Ignoring unreadable manifest: {e}")
+        return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"vault": self.vault_path, "notes": self.manifest}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    # --- Lifecycle ---
 
     def start(self):
         """Starts the background archiving thread."""
         if self.running: return
         self.running = True
+
+        if WATCHDOG_AVAILABLE and os.path.isdir(self.vault_path):
+            try:
+                self.observer = Observer()
+                self.observer.schedule(_DirtyNoteHandler(self), self.vault_path, recursive=True)
+                self.observer.daemon = True
+                self.observer.start()
+                self.interval = 3600
+            except Exception as e:
+                logging.warning(f"🧠 Archivist: File watcher unavailable ({e}). Using periodic scans.")
+                self.observer = None
+
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
-        logging.info("🧠 Memory Archivist started (Background Thread)")
+        mode = "watching for changes" if self.observer else f"scanning every {self.interval}s"
+        logging.info(f"🧠 Memory Archivist started (Background Thread, {mode})")
 
     def stop(self):
         """Stops the background thread."""
         self.running = False
+        self._wake.set()
+        if self.observer:
+            self.observer.stop()
         if self.thread:
             self.thread.join()
 
+    def mark_dirty(self, path: str):
+        with self._dirty_lock:
+            self._dirty.add(os.path.abspath(path))
+        self._wake.set()
+
+    def is_hidden(self, path: str) -> bool:
+        """True for notes the full scan skips: anything under a dot-directory (.obsidian, .trash)."""
+        rel_path = os.path.relpath(os.path.abspath(path), self.vault_path)
+        return any(part.startswith(".") for part in rel_path.split(os.sep))
+
     def _run_loop(self):
-        """Main loop that runs periodically."""
+        """Full scan on start, then file events (or the interval) trigger incremental passes."""
+        last_full_scan = 0.0
         while self.running:
             try:
-                self._archive_vault()
+                if time.time() - last_full_scan >= self.interval:
+                    self._archive_vault()
+                    last_full_scan = time.time()
+                else:
+                    self._archive_dirty()
             except Exception as e:
                 logging.error(f"🧠 Archivist Error: {e}")
-            
-            # Sleep in chunks to allow faster stopping
-            for _ in range(self.interval):
-                if not self.running: break
-                time.sleep(1)
+
+            timeout = max(1.0, self.interval - (time.time() - last_full_scan))
+            if self._wake.wait(timeout) and self.running:
+                time.sleep(DEBOUNCE_SECONDS)
+            self._wake.clear()
+
+    # --- Archiving ---
 
     def _archive_vault(self):
-        """Scans the vault and updates the vector DB."""
-        # 1. Find all markdown files
-        for root, _, files in os.walk(self.vault_path):
+        """Scans the vault (stat only) and archives notes that changed since the manifest."""
+        seen = set()
+        changed = []
+        for root, dirs, files in os.walk(self.vault_path):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
             for file in files:
-                if file.endswith(".md"):
-                    path = os.path.join(root, file)
-                    self._process_note(path)
+                if not file.endswith(".md"):
+                    continue
+                path = os.path.join(root, file)
+                seen.add(path)
+                changed.append(path)
+        removed = [path for path in self.manifest if path not in seen]
+        self._sync(changed, removed)
+
+    def _archive_dirty(self):
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        existing = [p for p in dirty if os.path.exists(p)]
+        removed = [p for p in dirty if not os.path.exists(p) and p in self.manifest]
+        try:
+            self._sync(existing, removed)
+        except Exception:
+            # Nothing was committed to the manifest; retry these notes on the next pass.
+            with self._dirty_lock:
+                self._dirty |= dirty
+            raise
+
+    def _sync(self, paths: List[str], removed: List[str]):
+        pending: List[Tuple[str, str, Dict[str, Any]]] = []  # (id, text, metadata)
+        stale_ids: List[str] = []
+        staged: Dict[str, Dict[str, Any]] = {}  # Manifest entries, committed once the bank is updated
+        updated = 0
+
+        for path in paths:
+            result = self._process_note(path)
+            if result is None:
+                continue
+            new_chunks, old_ids, entry = result
+            pending.extend(new_chunks)
+            stale_ids.extend(old_ids)
+            staged[path] = entry
+            updated += 1
+
+        for path in removed:
+            entry = self.manifest.get(path)
+            if entry:
+                stale_ids.extend(entry.get("chunk_ids", []))
+
+        # 1. Write to the bank first. If anything raises, the manifest still holds the
+        #    old chunk IDs, so the next pass redoes the upserts and retries the deletes.
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start:start + BATCH_SIZE]
+            self._upsert([b[0] for b in batch], [b[1] for b in batch], [b[2] for b in batch])
+        for start in range(0, len(stale_ids), BATCH_SIZE):
+            self._delete(stale_ids[start:start + BATCH_SIZE])
+
+        # 2. Only then record what the bank now contains.
+        self.manifest.update(staged)
+        for path in removed:
+            self.manifest.pop(path, None)
+
+        if updated or removed or self._manifest_dirty:
+            self._save_manifest()
+            self._manifest_dirty = False
+        if updated or removed:
+            logging.info(f"🧠 Archivist: {updated} notes changed, {len(removed)} removed, "
+                         f"{len(pending)} chunks embedded, {len(stale_ids)} stale chunks deleted.")
 
     def _process_note(self, path: str):
-        """Reads a note and ensures it's in the Memory Bank."""
+        """
+        Returns (new chunks to upsert, stale chunk IDs, new manifest entry) for a
+        note whose content changed, or None if it is unchanged (or unreadable).
+        The entry is not stored here; _sync commits it after the bank write.
+        """
         try:
-            with open(path, "r") as f:
+            stat = os.stat(path)
+            entry = self.manifest.get(path)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                return None
+
+            with open(path, "r", errors="ignore") as f:
                 content = f.read()
-            
-            # Skip empty notes
-            if not content.strip(): return
-            
+            content_hash = hashlib.sha1(content.encode()).hexdigest()
+
+            # Touched but not edited (sync tools, git checkout): just refresh the stat.
+            if entry and entry["hash"] == content_hash:
+                entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+                self._manifest_dirty = True
+                return None
+
             # Extract title from filename
             title = os.path.basename(path).replace(".md", "")
-            
-            # Check if we should add it to vector DB
-            # For now, we just blindly add/update everything. 
-            # In a real system, we'd check modification times or hashes.
-            
-            # We use a special collection or metadata to distinguish "Vault" from "Chat"
-            # But MemoryBank might not support collections yet. 
-            # So we just add it as a "fact".
-            
-            # self.memory_bank.add_memory(f"Note: {title}\nContent: {content[:1000]}...") 
-            # (Truncated to avoid massive embeddings)
-            
-            pass # Placeholder for now to avoid spamming the DB in this demo
-            
+            chunks = chunk_note(title, content) if content.strip() else []
+            rel_path = os.path.relpath(path, self.vault_path)
+
+            chunk_ids = []
+            new_chunks = []
+            old_ids = set(entry["chunk_ids"]) if entry else set()
+            for i, chunk in enumerate(chunks):
+                chunk_id = "vault-" + hashlib.sha1(f"{rel_path}\0{chunk}".encode()).hexdigest()[:20]
+                chunk_ids.append(chunk_id)
+                if chunk_id not in old_ids:
+                    new_chunks.append((chunk_id, chunk, {"source": "vault", "path": rel_path, "title": title, "chunk": i}))
+
+            new_entry = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": content_hash, "chunk_ids": chunk_ids}
+            return new_chunks, sorted(old_ids - set(chunk_ids)), new_entry
         except Exception as e:
             logging.warning(f"Failed to process note {path}: {e}")
+            return None
@@ -0,0 +1,192 @@
+import atexit
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from typing import List, Dict, Any, Callable
+
+_STOP = object()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(max(1, len(text) - 2))}
+
+
+class MemoryWriter:
+    """
+    Write-behind queue in front of the Memory Bank.
+
+    The listen -> act loop only enqueues; a single worker thread batches the
+    writes (one embedding/insert call per batch when the bank supports it),
+    drops near-identical entries, and runs background jobs such as fact
+    extraction. The queue is bounded: when it is full the oldest pending write
+    is dropped rather than blocking the caller. Pending writes are flushed on
+    close() and at interpreter exit.
+    """
+
+    def __init__(self, memory_bank, max_pending: int = 256, batch_size: int = 16,
+                 flush_interval: float = 0.5, dedup_window: int = 64, dedup_threshold: float = 0.9):
+        self.memory_bank = memory_bank
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_threshold = dedup_threshold
+        self.written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._recent: deque = deque(maxlen=dedup_window)  # (normalized text, trigrams, numbers)
+        self._closed = False
+        self._job_writes: List[tuple] = []
+        self.backend = self._detect_backend()
+        self._worker = threading.Thread(target=self._run, daemon=True, name="memory-writer")
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _detect_backend(self) -> str:
+        if hasattr(self.memory_bank, "add_memories"):
+            return "bank"
+        collection = getattr(self.memory_bank, "collection", None)
+        if collection is not None and hasattr(collection, "add"):
+            return "collection"
+        return "single"
+
+    # --- Producer side (never blocks) ---
+
+    def add_memory(self, text: str, source: str = "interaction"):
+        """Queues a memory write. Same signature as MemoryBank.add_memory."""
+        if not text or not text.strip():
+            return
+        item = ("memory", text, source, time.time())
+        if threading.current_thread() is self._worker:
+            # Written by a job running on the worker; don't round-trip through the queue
+            self._job_writes.append(item)
+        else:
+            self._put(item)
+
+    def submit(self, fn: Callable, *args):
+        """Runs a background memory job (e.g. fact extraction) on the writer thread."""
+        self._put(("job", fn, args))
+
+    def _put(self, item):
+        if self._closed:
+            return
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                    logging.warning("⚠️ Memory Writer: Queue full, dropped oldest pending write.")
+                except queue.Empty:
+                    pass
+
+    # --- Worker side ---
+
+    def _run(self):
+        batch: List[tuple] = []
+        while True:
+            timeout = self.flush_interval if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_batch(batch)
+                batch = []
+                continue
+
+            if item is _STOP:
+                self._write_batch(batch)
+                self._queue.task_done()
+                return
+
+            if item[0] == "job":
+                # Keep ordering: anything queued before the job is written first
+                self._write_batch(batch)
+                batch = []
+                try:
+                    item[1](*item[2])
+                except Exception as e:
+                    logging.error(f"Memory job failed: {e}")
+                batch = [w for w in self._job_writes if not self._is_duplicate(w[1])]
+                self._job_writes = []
+            elif not self._is_duplicate(item[1]):
+                batch.append(item)
+
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+            self._queue.task_done()
+
+    def _is_duplicate(self, text: str) -> bool:
+        normalized = _normalize(text)
+        grams = _trigrams(normalized)
+        digits = re.findall(r"\d+", normalized)
+        for seen, seen_grams, seen_digits in self._recent:
+            if seen == normalized:
+                self.deduplicated += 1
+                return True
+            # Near-identical wording, but "light 12" and "light 13" are different memories
+            if digits == seen_digits and len(grams & seen_grams) / len(grams | seen_grams) >= self.dedup_threshold:
+                self.deduplicated += 1
+                return True
+        self._recent.append((normalized, grams, digits))
+        return False
+
+    def _write_batch(self, batch: List[tuple]):
+        if not batch:
+            return
+        texts = [item[1] for item in batch]
+        try:
+            if self.backend == "bank":
+                self.memory_bank.add_memories(texts, sources=[item[2] for item in batch])
+            elif self.backend == "collection":
+                self.memory_bank.collection.add(
+                    ids=[str(uuid.uuid4()) for _ in batch],
+                    documents=texts,
+                    metadatas=[{"source": item[2], "timestamp": item[3]} for item in batch],
+                )
+            else:
+                for _, text, source, _ in batch:
+                    self.memory_bank.add_memory(text, source=source)
+            self.written += len(batch)
+        except Exception as e:
+            logging.error(f"❌ Memory Writer: Failed to store {len(batch)} memories: {e}")
+
+    # --- Lifecycle ---
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until everything queued so far has been written."""
+        self.submit(lambda: None)  # A job forces the worker to write its current batch
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 10.0):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logging.warning("⚠️ Memory Writer: Could not enqueue shutdown; pending memories may be lost.")
+            return
+        self._worker.join(timeout)
+        logging.info(f"🧠 Memory Writer: Flushed ({self.written} written, {self.deduplicated} deduplicated, {self.dropped} dropped).")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+        }
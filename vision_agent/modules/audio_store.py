@@ -0,0 +1,109 @@
+import logging
+import os
+import secrets
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+AUDIO_CODEC = os.getenv("JARVIS_AUDIO_CODEC", "mp3")   # mp3 | opus | wav
+AUDIO_BITRATE = os.getenv("JARVIS_AUDIO_BITRATE", "48k")
+AUDIO_TTL = 300          # Seconds a clip stays fetchable
+MAX_CLIPS = 256
+
+# codec -> (ffmpeg arguments, content type)
+CODECS = {
+    "mp3": (["-c:a", "libmp3lame", "-f", "mp3"], "audio/mpeg"),
+    "opus": (["-c:a", "libopus", "-application", "voip", "-f", "ogg"], "audio/ogg"),
+}
+
+
+class AudioStore:
+    """
+    Short-lived store for synthesized replies, served as binary resources.
+
+    put() compresses a WAV clip with ffmpeg (MP3 or Opus at a configurable
+    bitrate; the original WAV if ffmpeg is missing or fails) and returns an
+    unguessable ID. Clips expire after AUDIO_TTL seconds; the oldest are also
+    evicted past MAX_CLIPS.
+    """
+
+    def __init__(self, codec: str = AUDIO_CODEC, bitrate: str = AUDIO_BITRATE, ttl: float = AUDIO_TTL):
+        self.codec = codec if codec in CODECS else "wav"
+        self.bitrate = bitrate
+        self.ttl = ttl
+        self.ffmpeg = shutil.which("ffmpeg")
+        self._clips: "OrderedDict[str, Tuple[float, bytes, str]]" = OrderedDict()  # id -> (expires, data, content type)
+        self._lock = threading.Lock()
+        self.wav_bytes = 0
+        self.served_bytes = 0
+        if self.codec != "wav" and not self.ffmpeg:
+            logging.warning("⚠️ Audio Store: ffmpeg not found, serving uncompressed WAV.")
+
+    def _compress(self, wav: bytes) -> Tuple[bytes, str]:
+        if self.codec == "wav" or not self.ffmpeg:
+            return wav, "audio/wav"
+        args, content_type = CODECS[self.codec]
+        try:
+            result = subprocess.run(
+                [self.ffmpeg, "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+                 "-b:a", self.bitrate, *args, "pipe:1"],
+                input=wav, capture_output=True, timeout=10, check=True,
+            )
+            return result.stdout, content_type
+        except (subprocess.SubprocessError, OSError) as e:
+            logging.warning(f"⚠️ Audio Store: {self.codec} encode failed ({e}), serving WAV.")
+            return wav, "audio/wav"
+
+    def put(self, wav: bytes) -> str:
+        data, content_type = self._compress(wav)
+        clip_id = secrets.token_urlsafe(12)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._clips[clip_id] = (now + self.ttl, data, content_type)
+            while len(self._clips) > MAX_CLIPS:
+                self._clips.popitem(last=False)
+            self.wav_bytes += len(wav)
+            self.served_bytes += len(data)
+        return clip_id
+
+    def get(self, clip_id: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            self._expire(time.time())
+            clip = self._clips.get(clip_id)
+        return (clip[1], clip[2]) if clip else None
+
+    def _expire(self, now: float):
+        while self._clips:
+            clip_id, (expires, _, _) = next(iter(self._clips.items()))
+            if expires > now:
+                break
+            del self._clips[clip_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ratio = round(self.wav_bytes / self.served_bytes, 1) if self.served_bytes else None
+            return {"codec": self.codec if self.ffmpeg else "wav", "bitrate": self.bitrate,
+                    "clips": len(self._clips), "compression_ratio": ratio}
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single 'bytes=' range, or None to send the whole body."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[6:].strip().partition("-")
+    try:
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            return (max(0, size - length), size - 1) if length else None
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        raise ValueError("Range not satisfiable")
+    return first, last
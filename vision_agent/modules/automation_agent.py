@@ -1,28 +1,210 @@
 import logging
 import json
-import ollama
-from typing import List, Dict, Any
+from vision_agent.modules import llm_gateway
+from typing import List, Dict, Any, Optional
+
+# Tools the planner may fan out in parallel: known read-only lookups with no side effects.
+# Anything not listed here (including tools added later) is never planned.
+# Synthesis and saving are appended by the agent itself, after the fan-out.
+PLANNABLE_TOOLS = {
+    "duckduckgo_search", "brave_web_search", "wikipedia_search", "search_papers",
+    "get_transcript", "search_repositories", "list_containers", "inspect_container", "get_logs",
+    "fs_read_file", "fs_list_files", "read_note", "search_notes", "get_system_stats",
+}
+DEFAULT_RESEARCH_TOOLS = ["duckduckgo_search", "brave_web_search", "wikipedia_search"]
 
 class AutomationAgent:
-    def __init__(self, mcp_manager):
+    def __init__(self, mcp_manager, mode: str = "planned"):
         self.mcp_manager = mcp_manager
         self.model = "llama3.1"  # Revert to Smart Brain (Simpler, more grounded)
         self.max_steps = 7  # Increased to 7 to accommodate 3 searches + synthesis + save
+        self.mode = mode  # "planned" = one plan, parallel fan-out; "sequential" = one LLM hop per step
+        self.max_parallel_calls = 5
 
     def run(self, goal: str) -> str:
         """
         Execute a multi-step automation task.
         """
-        logging.info(f"🤖 Automation Agent started: {goal}")
+        logging.info(f"🤖 Automation Agent started: {goal} (mode: {self.mode})")
         print(f"🤖 Automation Agent started: {goal}")
+
+        if self.mode == "planned":
+            result = self._run_planned(goal)
+            if result is not None:
+                return result
+            logging.warning("🤖 Planned mode could not build a plan. Falling back to sequential mode.")
+
+        return self._run_sequential(goal)
+
+    # --- Planned (DAG) Mode ---
+
+    def _run_planned(self, goal: str) -> Optional[str]:
+        """
+        Research as a three-level DAG:
+        1. One LLM call plans every independent lookup at once.
+        2. The lookups run concurrently through the MCP Manager.
+        3. Synthesis waits on all of them; the note save waits on synthesis.
+        Returns None when no usable plan could be produced.
+        """
+        print("⏳ Planning all research steps...")
+        plan = self._plan(goal)
+        if not plan:
+            return None
+
+        calls = self._validate_calls(plan.get("searches", []))
+        if not calls:
+            return None
+
+        topic = plan.get("topic") or goal
+        steps = []
+        for i, call in enumerate(calls):
+            steps.append({"id": f"search_{i}", "tool_name": call["tool_name"], "arguments": call["arguments"], "depends_on": []})
+        search_ids = [step["id"] for step in steps]
+
+        def synthesis_args(results):
+            sources = []
+            for step in steps[:len(search_ids)]:
+                result = str(results.get(step["id"], ""))
+                if self._is_error(result):
+                    continue  # Don't feed error text to the synthesis as if it were a source
+                truncated_result = result[:3000] + "..." if len(result) > 3000 else result
+                sources.append(f"### Source: {step['tool_name']}\n{truncated_result}")
+            return {"topic": topic, "content": "\n\n".join(sources)}
+
+        steps.append({"id": "synthesis", "tool_name": "synthesize_content", "arguments": synthesis_args, "depends_on": search_ids})
+
+        if plan.get("save_note", True):
+            title = "".join(c for c in str(plan.get("note_title") or topic) if c.isalnum() or c in " -_").strip()
+            steps.append({
+                "id": "save",
+                "tool_name": "create_note",
+                "arguments": lambda results: {"title": title, "content": results["synthesis"]},
+                "depends_on": ["synthesis"],
+            })
+
+        results = self._execute_dag(steps)
+
+        if all(self._is_error(results.get(step_id)) for step_id in search_ids):
+            return f"Automation Failed: Every research step failed. Last error: {results.get(search_ids[-1])}"
+        if self._is_error(results.get("synthesis")):
+            return f"Automation Failed: Could not synthesize the research. {results.get('synthesis')}"
+
+        save_result = results.get("save")
+        if save_result and "Successfully created note" in save_result:
+            print(f"✅ Automation Complete: {save_result}")
+            return f"Task Completed. {save_result}"
+        return results.get("synthesis") or "Automation Task Completed."
+
+    def _plan(self, goal: str) -> Optional[Dict[str, Any]]:
+        """Asks the LLM for all independent lookups in a single round trip."""
+        tools = [
+            t for t in self.mcp_manager.list_tools()
+            if t["name"] in PLANNABLE_TOOLS
+        ]
+        tools_desc = "\n".join(f"- {t['name']}: {t.get('description', '')}" for t in tools)
+
+        prompt = f"""
+        You are the **Automation Agent**, a specialized research planner.
+        
+        GOAL: "{goal}"
+        
+        TOOLS AVAILABLE (read-only lookups; no other tools may be planned):
+        {tools_desc}
         
+        TASK: Plan ALL the lookups needed for this goal at once. They will run in parallel,
+        so no lookup may depend on the result of another.
+        Default research plan: {", ".join(DEFAULT_RESEARCH_TOOLS)} with a focused query each.
+        At most {self.max_parallel_calls} lookups. After they finish, the results are synthesized
+        automatically and (if save_note is true) saved to the Obsidian vault.
+        
+        FORMAT:
+        {{
+            "topic": "short topic",
+            "searches": [{{"tool_name": "name", "arguments": {{ "arg": "value" }}}}],
+            "save_note": true,
+            "note_title": "Title"
+        }}
+        
+        Output JSON ONLY.
+        """
+        try:
+            response = llm_gateway.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
+        except Exception as e:
+            logging.error(f"🤖 Planning failed: {e}")
+            return None
+        return self._parse_json_object(response['message']['content'])
+
+    def _validate_calls(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drops unknown or non-allowlisted tools and duplicate calls from the plan."""
+        known = {t["name"] for t in self.mcp_manager.list_tools()}
+        valid, seen = [], set()
+        for call in calls if isinstance(calls, list) else []:
+            if not isinstance(call, dict):
+                continue
+            name = call.get("tool_name")
+            args = call.get("arguments") if isinstance(call.get("arguments"), dict) else {}
+            if name not in known or name not in PLANNABLE_TOOLS:
+                logging.warning(f"🤖 Plan: Skipping unusable tool '{name}'")
+                continue
+            key = json.dumps([name, args], sort_keys=True)
+            if key in seen:
+                continue
+            seen.add(key)
+            valid.append({"tool_name": name, "arguments": args})
+        return valid[:self.max_parallel_calls]
+
+    def _execute_dag(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Runs steps in waves: every step whose dependencies are finished runs concurrently.
+        A step's `arguments` may be a callable that builds them from earlier results.
+        A step whose dependencies all failed is skipped (and counts as failed itself),
+        so a failed search or synthesis never turns into a saved note.
+        """
+        results: Dict[str, Any] = {}
+        pending = list(steps)
+        while pending:
+            ready = [step for step in pending if all(dep in results for dep in step["depends_on"])]
+            if not ready:
+                raise ValueError(f"Automation plan has unsatisfiable dependencies: {[s['id'] for s in pending]}")
+
+            skipped = [step for step in ready if step["depends_on"] and all(self._is_error(results[dep]) for dep in step["depends_on"])]
+            for step in skipped:
+                logging.warning(f"🤖 Automation: Skipping {step['id']}, every input failed.")
+                results[step["id"]] = f"Error: Skipped {step['tool_name']} because every input failed."
+            pending = [step for step in pending if step not in skipped]
+            ready = [step for step in ready if step not in skipped]
+            if not ready:
+                continue
+
+            calls = []
+            for step in ready:
+                args = step["arguments"](results) if callable(step["arguments"]) else step["arguments"]
+                calls.append((step["tool_name"], args))
+            label = "Executing in parallel" if len(calls) > 1 else "Executing"
+            print(f"🛠️ {label}: {', '.join(name for name, _ in calls)}...")
+            logging.info(f"🤖 Automation Wave: {[(name, args) for name, args in calls]}")
+
+            for step, result in zip(ready, self.mcp_manager.execute_tools_parallel(calls)):
+                results[step["id"]] = result if isinstance(result, str) else json.dumps(result)
+            pending = [step for step in pending if step not in ready]
+        return results
+
+    @staticmethod
+    def _is_error(result: Any) -> bool:
+        text = str(result or "").strip().lower()
+        return not text or text.startswith(("error", "tool execution failed", "brain freeze"))
+
+    # --- Sequential Mode ---
+
+    def _run_sequential(self, goal: str) -> str:
+        """Step-by-step mode: one LLM planning round trip before each tool call."""
         history = []
         
         for step_num in range(self.max_steps):
             print(f"⏳ Step {step_num + 1}/{self.max_steps}: Thinking...")
             # 1. Plan / Decide Next Step
             prompt = self._build_prompt(goal, history)
-            response = ollama.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
+            response = llm_gateway.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
             content = response['message']['content']
             
             # 2. Parse Tool Call
@@ -131,8 +313,16 @@ class AutomationAgent:
         
         Output JSON ONLY (or DONE message).
         """
+        return prompt
 
     def _parse_tool_call(self, content: str) -> Dict[str, Any]:
+        tool_call = self._parse_json_object(content)
+        if tool_call and tool_call.get("tool_name"):
+            tool_call.setdefault("arguments", {})
+            return tool_call
+        return None
+
+    def _parse_json_object(self, content: str) -> Dict[str, Any]:
         try:
             # Try to find JSON block
             if "```json" in content:
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Tuple
+
+import cv2
+
+CAMERA_INDEX = int(os.getenv("JARVIS_CAMERA_INDEX", "0"))
+FRAME_SIZE = (1920, 1080)
+RING_SIZE = 8          # Recent frames kept in memory
+WARMUP_FRAMES = 5      # Dropped after opening while auto-exposure settles
+IDLE_TIMEOUT = 30.0    # Seconds without readers before the device is released
+
+
+class CameraService:
+    """
+    Shared, lazily opened webcam.
+
+    The first reader opens the device and starts a capture thread that keeps a
+    ring buffer of recent frames, so later reads get the latest frame without
+    paying for device open and exposure settling. Continuous consumers (tracker
+    mode) hold the device with subscribe(); otherwise it is released after
+    IDLE_TIMEOUT seconds without reads.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "CameraService":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, index: int = CAMERA_INDEX, idle_timeout: float = IDLE_TIMEOUT):
+        self.index = index
+        self.idle_timeout = idle_timeout
+        self._frames: deque = deque(maxlen=RING_SIZE)  # (timestamp, frame)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._subscribers = 0
+        self._last_access = 0.0
+        self._error = None
+        self._generation = 0  # Bumped per capture thread, so a stopping thread can't clobber its successor
+        self.opens = 0
+
+    # --- Lifecycle ---
+
+    def _ensure_running(self):
+        """Starts the capture thread if needed (call with the lock held)."""
+        self._last_access = time.time()
+        if self._running:
+            return
+        self._running = True
+        self._error = None
+        self._frames.clear()
+        self._generation += 1
+        self._thread = threading.Thread(target=self._capture_loop, args=(self._generation,), daemon=True, name="camera-service")
+        self._thread.start()
+
+    def _capture_loop(self, generation: int):
+        cap = cv2.VideoCapture(self.index)
+        try:
+            if not cap.isOpened():
+                raise RuntimeError(f"Cannot open camera {self.index}")
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_SIZE[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_SIZE[1])
+            for _ in range(WARMUP_FRAMES):
+                cap.read()
+            self.opens += 1
+            logging.info(f"📷 Camera Service: Device {self.index} opened.")
+
+            while True:
+                with self._cond:
+                    idle = time.time() - self._last_access > self.idle_timeout
+                    if generation != self._generation or not self._running or (idle and self._subscribers == 0):
+                        break
+                ret, frame = cap.read()
+                if not ret:
+                    raise RuntimeError("Camera stopped delivering frames")
+                with self._cond:
+                    if generation != self._generation:
+                        break
+                    self._frames.append((time.time(), frame))
+                    self._cond.notify_all()
+        except Exception as e:
+            logging.error(f"❌ Camera Service: {e}")
+            with self._cond:
+                if generation == self._generation:
+                    self._error = e
+        finally:
+            cap.release()
+            with self._cond:
+                if generation == self._generation:
+                    self._running = False
+                    self._frames.clear()
+                self._cond.notify_all()
+            logging.info(f"📷 Camera Service: Device {self.index} released.")
+
+    def subscribe(self):
+        """Keeps the device open until unsubscribe() (for continuous readers like tracker mode)."""
+        with self._cond:
+            self._subscribers += 1
+            self._ensure_running()
+
+    def unsubscribe(self):
+        with self._cond:
+            self._subscribers = max(0, self._subscribers - 1)
+            self._last_access = time.time()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    # --- Reads ---
+
+    def latest_frame(self, max_age: float = 0.5, timeout: float = 3.0):
+        """
+        Newest frame, or None if the camera is unavailable. Returns immediately
+        when the ring holds a frame younger than max_age; otherwise waits (up to
+        timeout) for the next one, e.g. right after the device was opened.
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            self._ensure_running()
+            while True:
+                if self._frames and time.time() - self._frames[-1][0] <= max_age:
+                    return self._frames[-1][1].copy()
+                if self._error is not None and not self._running:
+                    return None
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def recent_frames(self, count: int = RING_SIZE) -> List[Tuple[float, object]]:
+        """Up to `count` buffered (timestamp, frame) pairs, oldest first."""
+        with self._cond:
+            self._last_access = time.time()
+            return [(ts, frame.copy()) for ts, frame in list(self._frames)[-count:]]
+
+    @property
+    def is_open(self) -> bool:
+        return self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "open": self._running,
+                "subscribers": self._subscribers,
+                "buffered": len(self._frames),
+                "opens": self.opens,
+                "idle_for": round(time.time() - self._last_access, 1) if self._last_access else None,
+            }
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+
+class Capability:
+    """
+    Attribute built on first access by the owner's `_build_<name>()` method.
+
+    Heavy subsystems (and the imports inside their builders) cost nothing until
+    a command actually needs them. `warm=True` marks the ones worth building in
+    the background right after startup. Assigning to the attribute replaces the
+    built value, so existing `self.x = ...` code keeps working.
+    """
+
+    def __init__(self, warm: bool = False):
+        self.warm = warm
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.capabilities.get(self.name)
+
+    def __set__(self, obj, value):
+        obj.capabilities.set(self.name, value)
+
+
+class CapabilityRegistry:
+    """Builds, times and warms an object's Capability attributes."""
+
+    def __init__(self, owner, label: str = None):
+        self.owner = owner
+        self.label = label or type(owner).__name__
+        self.started = time.perf_counter()
+        self.ready_ms: Optional[float] = None
+        self.import_ms: Optional[float] = None
+        self._values: Dict[str, Any] = {}
+        self._build_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+
+    def declared(self) -> Dict[str, Capability]:
+        found = {}
+        for cls in reversed(type(self.owner).__mro__):
+            for name, attr in vars(cls).items():
+                if isinstance(attr, Capability):
+                    found[name] = attr
+        return found
+
+    def _lock_for(self, name: str) -> threading.RLock:
+        with self._lock:
+            return self._locks.setdefault(name, threading.RLock())
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        with self._lock_for(name):
+            if name in self._values:
+                return self._values[name]
+            started = time.perf_counter()
+            try:
+                value = getattr(self.owner, f"_build_{name}")()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            elapsed = (time.perf_counter() - started) * 1000
+            self._values[name] = value
+            self._build_ms[name] = elapsed
+            self._errors.pop(name, None)
+            logging.info(f"🧩 {self.label}: Built {name} in {elapsed:.0f} ms")
+            return value
+
+    def set(self, name: str, value: Any):
+        self._values[name] = value
+
+    def is_built(self, name: str) -> bool:
+        return name in self._values
+
+    def mark_ready(self, import_ms: float = None):
+        """Records the end of the owner's constructor (and, optionally, its module import time)."""
+        self.ready_ms = (time.perf_counter() - self.started) * 1000
+        self.import_ms = import_ms
+
+    def warm(self, names: Iterable[str] = None, submit: Callable = None):
+        """
+        Builds the given capabilities (default: those declared warm=True) one by one
+        off the caller's thread. `submit(fn)` picks the executor, e.g. the scheduler's
+        background class; a daemon thread is used otherwise.
+        """
+        names = list(names or [n for n, c in self.declared().items() if c.warm])
+
+        def _warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logging.warning(f"⚠️ {self.label}: Could not warm {name}: {e}")
+            logging.info(f"🔥 {self.label}: Warmed {len(names)} capabilities.")
+            for line in self.report_lines():
+                logging.info(line)
+
+        if submit:
+            submit(_warm)
+        else:
+            threading.Thread(target=_warm, daemon=True, name=f"{self.label}-warm").start()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "import_ms": round(self.import_ms, 1) if self.import_ms is not None else None,
+            "init_ms": round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            "built": {name: round(ms, 1) for name, ms in sorted(self._build_ms.items(), key=lambda kv: -kv[1])},
+            "lazy": sorted(n for n in self.declared() if n not in self._values),
+            "failed": dict(self._errors),
+        }
+
+    def report_lines(self) -> List[str]:
+        """Plain-text table in the spirit of `python -X importtime`: one row per capability, slowest first."""
+        report = self.report()
+        lines = [f"⏱️ {self.label} startup: import {report['import_ms'] or 0:.0f} ms | __init__ {report['init_ms'] or 0:.0f} ms"]
+        lines.append(f"{'build [ms]':>12} | capability")
+        for name, ms in report["built"].items():
+            lines.append(f"{ms:>12.1f} | {name}")
+        for name in report["lazy"]:
+            state = "failed" if name in report["failed"] else "not built"
+            lines.append(f"{'-':>12} | {name} ({state})")
+        return lines
@@ -1,5 +1,5 @@
 import logging
-import ollama
+from vision_agent.modules import llm_gateway
 import json
 import re
 from typing import Dict, Any, List
@@ -67,7 +67,7 @@ class CodingAgent:
         
         Keep it technically precise and concise.
         """
-        response = ollama.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
+        response = llm_gateway.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
         return response['message']['content']
 
     def _consult_engineer(self, goal: str, plan: str) -> Dict[str, str]:
@@ -94,7 +94,7 @@ class CodingAgent:
         
         IMPORTANT: Return ONLY the valid JSON object. Do not add markdown formatting like ```json.
         """
-        response = ollama.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
+        response = llm_gateway.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
         content = response['message']['content']
         
         # Clean up markdown if present
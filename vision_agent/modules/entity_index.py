@@ -0,0 +1,218 @@
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+# Words in a command that point at a Home Assistant domain.
+DOMAIN_WORDS: Dict[str, str] = {
+    "light": "light", "lights": "light", "lamp": "light", "lamps": "light", "bulb": "light",
+    "dark": "light", "bright": "light", "dim": "light",
+    "switch": "switch", "plug": "switch", "outlet": "switch", "socket": "switch",
+    "tv": "media_player", "television": "media_player", "speaker": "media_player", "music": "media_player",
+    "thermostat": "climate", "temperature": "climate", "heat": "climate", "heating": "climate",
+    "ac": "climate", "cold": "climate", "hot": "climate", "warm": "climate",
+    "fan": "fan", "lock": "lock", "door": "lock",
+    "blind": "cover", "blinds": "cover", "shade": "cover", "shades": "cover", "curtain": "cover", "curtains": "cover", "garage": "cover",
+    "vacuum": "vacuum", "camera": "camera",
+    "washer": "sensor", "dryer": "sensor", "dishwasher": "sensor",
+}
+
+# Used to infer an area facet from a friendly name when HA doesn't give us one.
+COMMON_AREAS = [
+    "living room", "master bedroom", "guest room", "dining room", "family room",
+    "kitchen", "bedroom", "bathroom", "office", "garage", "hallway", "basement",
+    "porch", "patio", "laundry", "attic", "nursery", "den", "study", "yard",
+]
+
+DEFAULT_ALIASES_PATH = os.path.expanduser("~/.config/jarvis/entity_aliases.json")
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f" {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(WORD_RE.findall(text.lower().replace("_", " ")))
+
+
+class EntityIndex:
+    """
+    Prebuilt lookup over the Home Assistant entity registry.
+
+    Friendly names (and aliases) are split into character trigrams and stored in
+    an inverted index, so a query only touches entities that share a trigram with
+    it instead of running difflib over every key. Each entity also carries a
+    domain facet (from its entity_id) and an area facet, which boost candidates
+    when the command mentions "lights" or "kitchen".
+    """
+
+    def __init__(self, entity_registry: Dict[str, Any], aliases: Dict[str, str] = None, areas: Dict[str, str] = None):
+        start = time.perf_counter()
+        self.names: List[str] = []
+        self.entity_ids: List[str] = []
+        self.domains: List[str] = []
+        self.areas: List[Optional[str]] = []
+        self._keys: List[Tuple[int, str, int]] = []  # (entity index, normalized key, trigram count)
+        self._postings: Dict[str, List[int]] = defaultdict(list)  # trigram -> key indexes
+        self._by_domain: Dict[str, List[int]] = defaultdict(list)
+        self._by_area: Dict[str, List[int]] = defaultdict(list)
+
+        name_to_index = {}
+        for name, entity_id in entity_registry.items():
+            i = len(self.names)
+            name_to_index[name] = i
+            entity_id = str(entity_id)
+            domain = entity_id.split(".", 1)[0] if "." in entity_id else None
+            area = (areas or {}).get(entity_id) or self._infer_area(_normalize(name))
+            self.names.append(name)
+            self.entity_ids.append(entity_id)
+            self.domains.append(domain)
+            self.areas.append(area)
+            if domain:
+                self._by_domain[domain].append(i)
+            if area:
+                self._by_area[area].append(i)
+            self._add_key(i, name)
+
+        for alias, name in (aliases if aliases is not None else self._load_aliases()).items():
+            if name in name_to_index:
+                self._add_key(name_to_index[name], alias)
+
+        logging.info(f"🏠 Entity Index: {len(self.names)} entities indexed in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    @staticmethod
+    def _load_aliases() -> Dict[str, str]:
+        path = os.getenv("JARVIS_ENTITY_ALIASES", DEFAULT_ALIASES_PATH)
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f"⚠️ Entity Index: Could not read aliases from {path}: {e}")
+            return {}
+
+    @staticmethod
+    def _infer_area(normalized_name: str) -> Optional[str]:
+        for area in COMMON_AREAS:
+            if area in normalized_name:
+                return area
+        return None
+
+    def _add_key(self, entity: int, text: str):
+        key = _normalize(text)
+        if not key:
+            return
+        grams = set(_trigrams(key))
+        k = len(self._keys)
+        self._keys.append((entity, key, len(grams)))
+        for gram in grams:
+            self._postings[gram].append(k)
+
+    def facets(self, query: str) -> Tuple[Optional[str], Optional[str]]:
+        """Returns the (domain, area) a command mentions, if any."""
+        normalized = _normalize(query)
+        domain = None
+        for word in normalized.split():
+            if word in DOMAIN_WORDS:
+                domain = DOMAIN_WORDS[word]
+                break
+        return domain, self._infer_area(normalized)
+
+    def search(self, query: str, k: int = 10, mode: str = "coverage") -> List[Tuple[str, float]]:
+        """
+        Top-k (friendly name, score) candidates for a query.
+        mode="similarity" scores name vs query (Dice), for a bare target phrase.
+        mode="coverage" scores how much of each name appears in the query, for whole commands.
+        """
+        normalized = _normalize(query)
+        if not normalized:
+            return []
+        query_grams = set(_trigrams(normalized))
+
+        overlap = Counter()
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if postings:
+                overlap.update(postings)
+
+        domain, area = self.facets(normalized)
+        best: Dict[int, float] = {}
+        for key_index, shared in overlap.items():
+            entity, _, gram_count = self._keys[key_index]
+            if mode == "similarity":
+                # Plain Dice, so the 0.6 cutoff means what it meant with difflib
+                score = 2.0 * shared / (gram_count + len(query_grams))
+            else:
+                score = shared / gram_count
+                if domain and self.domains[entity] == domain:
+                    score += 0.1
+                if area and self.areas[entity] == area:
+                    score += 0.1
+            if score > best.get(entity, 0.0):
+                best[entity] = score
+
+        # "It's too dark in the office" names no device; fall back to the facets.
+        if mode == "coverage" and domain and (area or max(best.values(), default=0.0) < 0.5):
+            pool = self._by_domain.get(domain, [])
+            if area:
+                pool = [i for i in pool if self.areas[i] == area]
+            for i in pool[:k]:
+                best[i] = max(best.get(i, 0.0), 0.5)
+
+        top = heapq.nlargest(k, best.items(), key=lambda item: item[1])
+        return [(self.names[i], round(score, 3)) for i, score in top]
+
+    def best(self, target_phrase: str, min_score: float = 0.6) -> Optional[str]:
+        """Single best friendly name for a target phrase (replaces difflib.get_close_matches)."""
+        results = self.search(target_phrase, k=1, mode="similarity")
+        if results and results[0][1] >= min_score:
+            return results[0][0]
+        return None
+
+    def candidates(self, command: str, k: int = 15, min_score: float = 0.5) -> List[str]:
+        """Devices worth showing the LLM for this command."""
+        return [name for name, score in self.search(command, k=k) if score >= min_score]
+
+
+if __name__ == "__main__":
+    # Micro-benchmark with a synthetic 600-entity house.
+    import random
+    random.seed(7)
+    things = ["light", "lamp", "switch", "plug", "fan", "tv", "speaker", "thermostat", "blinds", "lock"]
+    domains = {"light": "light", "lamp": "light", "switch": "switch", "plug": "switch", "fan": "fan", "tv": "media_player",
+               "speaker": "media_player", "thermostat": "climate", "blinds": "cover", "lock": "lock"}
+    registry = {}
+    for n in range(600):
+        area = random.choice(COMMON_AREAS)
+        thing = random.choice(things)
+        name = f"{area} {thing} {n}"
+        registry[name] = f"{domains[thing]}.{name.replace(' ', '_')}"
+    registry["kitchen ceiling light"] = "light.kitchen_ceiling"
+
+    index = EntityIndex(registry, aliases={"big light": "kitchen ceiling light"})
+    queries = ["turn on the kitchen ceiling light", "big light", "kitchn celing lite", "it's too dark in the office"]
+    iterations = 500
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for q in queries:
+            index.search(q)
+    per_query = (time.perf_counter() - start) / (iterations * len(queries)) * 1000
+    print(f"EntityIndex.search: {per_query:.3f} ms/query over {len(registry)} entities")
+
+    import difflib
+    start = time.perf_counter()
+    for _ in range(20):
+        for q in queries:
+            difflib.get_close_matches(q, registry.keys(), n=1, cutoff=0.6)
+    per_query = (time.perf_counter() - start) / (20 * len(queries)) * 1000
+    print(f"difflib baseline:   {per_query:.3f} ms/query")
+    for q in queries:
+        print(f"{q!r:40} -> {index.search(q, k=3)}")
@@ -76,7 +76,8 @@ class FilesystemMCP:
         except Exception as e:
             return f"Error: {str(e)}"
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def get_tools() -> List[Dict[str, Any]]:
         """Return the list of tools provided by this MCP."""
         return [
             {
@@ -0,0 +1,99 @@
+import io
+import threading
+from typing import Optional
+
+import cv2
+import mss
+import numpy as np
+from PIL import Image
+
+# LLaVA tiles images at 336/672px; anything above ~1344px on the long side is
+# downscaled by the model anyway, so we do it once here before encoding.
+MODEL_MAX_SIDE = 1344
+JPEG_QUALITY = 85
+
+_local = threading.local()
+
+
+def _screen_grabber() -> "mss.base.MSSBase":
+    """One mss instance per thread (they aren't thread-safe, and opening one costs a display connection)."""
+    sct = getattr(_local, "sct", None)
+    if sct is None:
+        sct = _local.sct = mss.mss()
+    return sct
+
+
+def grab_screen(monitor_index: int = 1) -> Image.Image:
+    sct = _screen_grabber()
+    shot = sct.grab(sct.monitors[monitor_index])
+    return Image.frombuffer("RGB", shot.size, shot.bgra, "raw", "BGRX", 0, 1)
+
+
+def downscale(img: Image.Image, max_side: int = MODEL_MAX_SIDE) -> Image.Image:
+    """Shrinks the image in place so its longest side is at most max_side (never upscales)."""
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.BILINEAR, reducing_gap=2.0)
+    return img
+
+
+def encode_image(img: Image.Image, quality: int = JPEG_QUALITY) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def capture_screen(max_side: int = MODEL_MAX_SIDE, quality: int = JPEG_QUALITY) -> bytes:
+    """Grab -> downscale -> JPEG, entirely in memory."""
+    return encode_image(downscale(grab_screen(), max_side), quality)
+
+
+def encode_frame(frame, max_side: int = MODEL_MAX_SIDE, quality: int = JPEG_QUALITY) -> bytes:
+    """Downscales an OpenCV (BGR) frame and JPEG-encodes it in memory."""
+    height, width = frame.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Failed to encode frame")
+    return buf.tobytes()
+
+
+def model_ready_jpeg(image) -> bool:
+    """
+    True for JPEG bytes that are already within the model's size, e.g. from
+    capture_screen/encode_frame. Reads only the header, never the pixels.
+    """
+    if not isinstance(image, (bytes, bytearray)) or not image.startswith(b"\xff\xd8"):
+        return False
+    try:
+        with Image.open(io.BytesIO(image)) as img:
+            return img.format == "JPEG" and max(img.size) <= MODEL_MAX_SIDE
+    except Exception:
+        return False
+
+
+def decode_image(image) -> Optional["np.ndarray"]:
+    """BGR frame from encoded bytes, a file path, or a frame (returned as is)."""
+    if isinstance(image, (bytes, bytearray)):
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if isinstance(image, str):
+        return cv2.imread(image)
+    return image
+
+
+def dhash(image_bytes: bytes) -> Optional[int]:
+    """64-bit difference hash of an encoded image (None if it can't be decoded)."""
+    img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None:
+        return None
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    value = 0
+    for row in small.tolist():
+        for left, right in zip(row, row[1:]):
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
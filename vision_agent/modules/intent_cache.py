@@ -0,0 +1,324 @@
+import copy
+import hashlib
+import importlib.util
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/jarvis/intent_cache.db")
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Dropped before keying, so "please turn on the lights" == "turn on lights".
+FILLER_WORDS = {"please", "hey", "jarvis", "can", "could", "would", "you", "the", "a", "an", "my", "for", "me", "just", "now"}
+
+# Commands that refer back to earlier output depend on context, not just their words.
+ANAPHORA_WORDS = {"it", "that", "this", "those", "them", "these", "previous", "last", "again", "same"}
+
+# Words whose presence flips the meaning of an otherwise identical command.
+POLARITY_WORDS = {"on", "off", "up", "down", "open", "close", "lock", "unlock", "mute", "unmute", "start", "stop", "enable", "disable", "not"}
+
+# Intents whose arguments are generated from (or are) the command text can't be replayed for a different command.
+UNCACHEABLE_TOOLS = {"create_note", "append_to_note", "run_automation", "run_coding_task", "run_system_repair", "fs_write_file"}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_command(command: str) -> str:
+    """Lowercases, strips punctuation and filler words, and singularizes plurals."""
+    words = [_stem(w) for w in WORD_RE.findall(command.lower()) if w not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def registry_version(entity_registry: Dict[str, Any]) -> str:
+    """Hashes the entity registry so adding/renaming devices invalidates cached intents."""
+    digest = hashlib.sha1()
+    for name in sorted(entity_registry):
+        digest.update(f"{name}={entity_registry[name]}\n".encode())
+    return digest.hexdigest()[:12]
+
+
+class HashedTrigramEmbedder:
+    """
+    Dependency-free fallback: character trigrams hashed into a sparse vector.
+    Good at typos, plurals and word order; not at synonyms.
+    """
+
+    name = "trigram-1024"
+    threshold = 0.75
+
+    def __init__(self, dims: int = 1024):
+        self.dims = dims
+
+    def embed(self, text: str) -> Dict[int, float]:
+        padded = f"  {text}  "
+        counts = Counter(zlib.crc32(padded[i:i + 3].encode()) % self.dims for i in range(len(padded) - 2))
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {k: v / norm for k, v in counts.items()}
+
+    @staticmethod
+    def similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+    @staticmethod
+    def dumps(vector: Dict[int, float]) -> str:
+        return json.dumps(vector)
+
+    @staticmethod
+    def loads(raw: str) -> Dict[int, float]:
+        return {int(k): v for k, v in json.loads(raw).items()}
+
+
+class SentenceTransformerEmbedder:
+    """Small local sentence embedding (MiniLM by default). Used when sentence-transformers is installed."""
+
+    threshold = 0.88
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st-{model_name}"
+
+    def embed(self, text: str) -> List[float]:
+        return self.model.encode(text, normalize_embeddings=True).tolist()
+
+    @staticmethod
+    def similarity(a: List[float], b: List[float]) -> float:
+        return sum(x * y for x, y in zip(a, b))
+
+    @staticmethod
+    def dumps(vector: List[float]) -> str:
+        return json.dumps([round(v, 5) for v in vector])
+
+    @staticmethod
+    def loads(raw: str) -> List[float]:
+        return json.loads(raw)
+
+
+def semantic_model_name() -> Optional[str]:
+    """The configured sentence-embedding model, or None if it can't be used here (no import is done)."""
+    model_name = os.getenv("JARVIS_INTENT_EMBEDDER", "all-MiniLM-L6-v2")
+    if model_name == "trigram" or importlib.util.find_spec("sentence_transformers") is None:
+        return None
+    return model_name
+
+
+class IntentCache:
+    """
+    Remembers successful LLM intent parses.
+
+    Lookup is exact on the normalized command first, then nearest-neighbour on
+    the command embedding. A near-duplicate is only reused when it keeps the
+    same polarity words ("on" vs "off") and every argument of the cached intent
+    still appears in the new command, so "weather in austin" never replays
+    "weather in boston". Entries are scoped to the embedder and the entity
+    registry version.
+
+    Without an explicit embedder, the cache starts on trigram embeddings and
+    loads the sentence model in the background (on warm() or first use), then
+    switches over. Vectors from different embedders are never compared: the
+    switch reloads only the entries stored under the new embedder.
+    """
+
+    def __init__(self, path: str = None, embedder=None, ttl: float = DEFAULT_TTL, max_entries: int = 1000):
+        self.path = path or os.getenv("JARVIS_INTENT_CACHE", DEFAULT_CACHE_PATH)
+        self.embedder = embedder or HashedTrigramEmbedder()
+        self._pending_model = None if embedder else semantic_model_name()
+        self._warm_started = False
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._registry = None
+        self._entries: Dict[str, Tuple[Any, List[Dict[str, Any]], float]] = {}  # normalized -> (vector, intents, expires_at)
+        self._db = None
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS intent_cache (
+                    version TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    embedding TEXT NOT NULL,
+                    intents TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (version, normalized)
+                )
+            """)
+            self._db.execute("DELETE FROM intent_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            logging.warning(f"⚠️ Intent Cache: Disk cache unavailable ({e}). Using memory only.")
+            self._db = None
+
+        pending = f" ({self._pending_model} loads on first use)" if self._pending_model else ""
+        logging.info(f"🧠 Intent Cache: Using {self.embedder.name} embeddings{pending}.")
+
+    def warm(self):
+        """Loads the sentence model off the caller's thread; trigram embeddings serve until it's ready."""
+        with self._lock:
+            if self._warm_started or not self._pending_model:
+                return
+            self._warm_started = True
+        threading.Thread(target=self._load_semantic, daemon=True, name="intent-embedder").start()
+
+    def _load_semantic(self):
+        model_name = self._pending_model
+        started = time.time()
+        try:
+            embedder = SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logging.warning(f"⚠️ Intent Cache: Could not load embedding model {model_name}: {e}. Staying on {self.embedder.name}.")
+            return
+        # Carry over what was learned on trigram vectors by re-embedding the commands (off the lock).
+        with self._lock:
+            carried = {key: (intents, expires_at) for key, (_, intents, expires_at) in self._entries.items()}
+            registry = self._registry
+        vectors = {key: embedder.embed(key) for key in carried}
+
+        with self._lock:
+            self.embedder = embedder
+            self._pending_model = None
+            self._version = None
+            if registry is not None and registry == self._registry:
+                self._switch_version(registry)
+                for key, (intents, expires_at) in carried.items():
+                    if key not in self._entries and expires_at > time.time():
+                        self._store(key, vectors[key], intents, expires_at)
+        logging.info(f"🧠 Intent Cache: Switched to {embedder.name} embeddings ({time.time() - started:.1f}s).")
+
+    def is_cacheable(self, command: str) -> bool:
+        """Commands with URLs or references to earlier output must always go to the LLM."""
+        if "http" in command.lower():
+            return False
+        return not (set(WORD_RE.findall(command.lower())) & ANAPHORA_WORDS)
+
+    def get(self, command: str, entity_registry: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        if not self.is_cacheable(command):
+            return None
+        normalized = normalize_command(command)
+        now = time.time()
+        self.warm()
+
+        with self._lock:
+            self._use_version(entity_registry)
+
+            entry = self._entries.get(normalized)
+            if entry and entry[2] > now:
+                self.exact_hits += 1
+                logging.info(f"⚡ Intent Cache: Exact hit '{normalized}'")
+                return copy.deepcopy(entry[1])
+
+            vector = self.embedder.embed(normalized)
+            best_score, best_key = 0.0, None
+            for key, (cached_vector, _, expires_at) in self._entries.items():
+                if expires_at <= now:
+                    continue
+                score = self.embedder.similarity(vector, cached_vector)
+                if score > best_score:
+                    best_score, best_key = score, key
+
+            if best_key and best_score >= self.embedder.threshold and self._compatible(normalized, best_key, self._entries[best_key][1]):
+                self.semantic_hits += 1
+                logging.info(f"⚡ Intent Cache: '{normalized}' ~ '{best_key}' ({best_score:.2f})")
+                return copy.deepcopy(self._entries[best_key][1])
+
+            self.misses += 1
+            return None
+
+    def put(self, command: str, entity_registry: Dict[str, Any], intents: List[Dict[str, Any]]):
+        if not intents or not self.is_cacheable(command):
+            return
+        if any(intent.get("tool_name") in UNCACHEABLE_TOOLS for intent in intents):
+            return
+
+        normalized = normalize_command(command)
+        if not normalized:
+            return
+        expires_at = time.time() + self.ttl
+        self.warm()
+
+        with self._lock:
+            self._use_version(entity_registry)
+            self._store(normalized, self.embedder.embed(normalized), copy.deepcopy(intents), expires_at)
+
+    def _store(self, normalized: str, vector: Any, intents: List[Dict[str, Any]], expires_at: float):
+        self._entries[normalized] = (vector, intents, expires_at)
+        if len(self._entries) > self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k][2])
+            del self._entries[oldest]
+
+        if self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO intent_cache (version, normalized, embedding, intents, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self._version, normalized, self.embedder.dumps(vector), json.dumps(intents), expires_at),
+            )
+            self._db.commit()
+
+    def _use_version(self, entity_registry: Dict[str, Any]):
+        """Swaps the in-memory entries when the registry (or embedder) changes."""
+        self._switch_version(registry_version(entity_registry))
+
+    def _switch_version(self, registry: str):
+        self._registry = registry
+        version = f"{self.embedder.name}:{registry}"
+        if version == self._version:
+            return
+        self._version = version
+        self._entries = {}
+        if not self._db:
+            return
+        rows = self._db.execute(
+            "SELECT normalized, embedding, intents, expires_at FROM intent_cache WHERE version = ? AND expires_at > ? "
+            "ORDER BY expires_at DESC LIMIT ?",
+            (version, time.time(), self.max_entries),
+        ).fetchall()
+        for normalized, embedding, intents, expires_at in rows:
+            self._entries[normalized] = (self.embedder.loads(embedding), json.loads(intents), expires_at)
+        if rows:
+            logging.info(f"🧠 Intent Cache: Loaded {len(rows)} intents for registry {version}")
+
+    @staticmethod
+    def _compatible(normalized: str, cached_normalized: str, intents: List[Dict[str, Any]]) -> bool:
+        """Guards a semantic match against swapped polarity or different slot values."""
+        words = set(normalized.split())
+        if words & POLARITY_WORDS != set(cached_normalized.split()) & POLARITY_WORDS:
+            return False
+        if {w for w in words if w.isdigit()} != {w for w in cached_normalized.split() if w.isdigit()}:
+            return False
+
+        for intent in intents:
+            slots = [intent.get("target_device")] + [v for v in (intent.get("arguments") or {}).values()]
+            for slot in slots:
+                if isinstance(slot, str) and not set(normalize_command(slot).split()) <= words:
+                    return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / total, 3) if total else 0.0,
+            "entries": len(self._entries),
+        }
@@ -1,8 +1,12 @@
 import json
 import logging
-import ollama
+from vision_agent.modules import llm_gateway
 import re
+import threading
 from urllib.parse import urlparse, parse_qs
+from vision_agent.modules.intent_cache import IntentCache
+from vision_agent.modules.entity_index import EntityIndex
+from vision_agent.modules.task_scheduler import run_async
 
 def _extract_video_id(url):
     """Extract YouTube video ID from URL (same logic as YouTube MCP server)"""
@@ -19,6 +23,107 @@ def _extract_video_id(url):
     return None
 
 
+# Static slow-path prompt. Kept byte-identical across calls (nothing interpolated)
+# so Ollama can reuse its KV cache for the prefix; per-call context goes at the
+# end of the user message instead.
+INTENT_SYSTEM_PROMPT = """
+# JARVIS SYSTEM PROTOCOL & USER MANUAL
+
+## IDENTITY
+You are **JARVIS**, a highly advanced, autonomous AI assistant. You are not just a chatbot; you are an **Action Engine**. Your purpose is to execute complex tasks, manage the user's digital life, and provide accurate information.
+
+## CORE DIRECTIVE
+**TASK**: Convert the user's natural language command into a structured **JSON List of Intents**.
+**OUTPUT**: JSON ONLY. No markdown, no explanations, no chatter.
+**INPUT**: The user message ends with a CONTEXT block (previous tool output, connected devices) followed by the COMMAND to convert.
+
+## TOOL MANUAL (CAPABILITIES)
+
+### 1. RESEARCH & AUTOMATION (The "Deep Dive")
+**Tool**: `run_automation(goal)`
+- **Description**: Your most powerful capability. It triggers a multi-step autonomous agent.
+- **Workflow**: 
+  1. Performs broad search (DuckDuckGo).
+  2. Performs specific search (Brave).
+  3. Checks factual sources (Wikipedia).
+  4. **Synthesizes** all findings using an LLM.
+  5. **Saves** a comprehensive Markdown note to the Obsidian Vault.
+- **When to Use**: 
+  - "Research X"
+  - "Deep dive into Y"
+  - "Find out about Z and save it"
+  - "Go to X and summarize" (Complex Navigation)
+  - ANY request that implies gathering info and saving it.
+- **Rule**: If the user says "Research...", you **MUST** use this tool. Do not use simple web search.
+
+### 2. CODING COUNCIL (Software Development)
+**Tool**: `run_coding_task(goal)`
+- **Description**: Delegates complex coding tasks to a specialized team (Architect, Engineer, Reviewer).
+- **When to Use**:
+  - "Write a python script to..."
+  - "Create a web app..."
+  - "Refactor this code..."
+  - "Build a tool to..."
+- **Capabilities**: Can write multiple files, plan architecture, and ensure code quality.
+
+### 3. WEB INTELLIGENCE (Quick Checks)
+- `duckduckgo_search(query)`: **Default Search**. Unlimited, private. Use for quick facts, general knowledge, and simple queries.
+- `brave_web_search(query)`: **High-Quality Search**. Rate-limited. Use when you need high-quality results or specific technical info.
+- `wikipedia_search(query)`: **Encyclopedia**. Use for definitions, history, biographies, and famous events.
+- `search_papers(query)`: **Academic**. Searches ArXiv/PubMed. Use for "scientific papers", "research papers", "studies".
+
+### 4. SECOND BRAIN (Obsidian Vault)
+- `create_note(title, content)`: Creates a new Markdown note. **CRITICAL**: If user doesn't provide content (e.g., "Make a note about AI"), YOU must generate a summary/content yourself.
+- `read_note(title)`: Reads a specific note.
+- `search_notes(query)`: Searches the content of existing notes.
+- `append_to_note(title, content)`: Adds text to the end of a note.
+- `delete_note(title)`: Permanently deletes a note.
+
+### 5. SYSTEM CONTROL
+- `list_containers(all=False)`: Lists Docker containers.
+- `fs_write_file(path, content)`: Writes a local file (outside vault).
+- `fs_read_file(path)`: Reads a local file.
+- `fs_list_files(directory)`: Lists files in a directory.
+- `get_system_stats`: Returns CPU, RAM, and Disk usage.
+
+### 6. ADVANCED CAPABILITIES
+- `query_database(query)`: Executes natural language SQL on SQLite databases.
+- `get_transcript(url)`: Extracts transcripts from YouTube videos.
+- `playwright_navigate(url)`: Opens a real browser to a URL.
+
+## OPERATIONAL RULES
+1. **Automation First**: Always prefer `run_automation` for "research" or "find and save" tasks. It provides the best user experience.
+2. **Content Generation**: For `create_note`, NEVER create an empty note. If the user is vague, use your internal knowledge to fill the content.
+3. **Chat Mode**: If the user is just chatting ("Hello", "How are you?", "Thanks"), return an **EMPTY LIST** `[]`. Do not force a tool call.
+4. **URL Integrity**: NEVER change the case of a URL. Keep it exactly as typed.
+5. **Tool Selection**: If the user specifies a tool ("Use Brave"), honor it. Otherwise, choose the most efficient tool.
+
+## JSON OUTPUT FORMAT
+[
+  {
+    "intent_type": "control" | "query" | "mcp_tool",
+    "target_device": "device_name" (or null), 
+    "action": "turn_on" | "turn_off" (or null),
+    "tool_name": "tool_name" (or null),
+    "arguments": { "arg": "val" }
+  }
+]
+
+## EXAMPLES
+User: "List docker containers" -> JSON: [{"intent_type": "mcp_tool", "tool_name": "list_containers", "arguments": {"all": false}}]
+User: "Search the web for quantum computing" -> JSON: [{"intent_type": "mcp_tool", "tool_name": "duckduckgo_search", "arguments": {"query": "quantum computing"}}]
+User: "Research the history of the internet and save it" -> JSON: [{"intent_type": "mcp_tool", "tool_name": "run_automation", "arguments": {"goal": "Research the history of the internet and save it"}}]
+User: "Create a note called Ideas" -> JSON: [{"intent_type": "mcp_tool", "tool_name": "create_note", "arguments": {"title": "Ideas", "content": "New note."}}]
+User: "Hello Jarvis" -> JSON: []
+"""
+
+# Keep the parser model loaded between commands, with a fixed context size so
+# differing requests never force a reload (which would drop the cached prefix).
+INTENT_KEEP_ALIVE = "30m"
+INTENT_OPTIONS = {"num_ctx": 8192}
+MAX_CONTEXT_CHARS = 1500  # Previous tool output can be a whole transcript
+
+
 class IntentParser:
     """
     The Semantic Brain of Jarvis.
@@ -26,8 +131,14 @@ class IntentParser:
     using the local LLM (Ollama).
     """
     
-    def __init__(self, model_name="llama3.1:latest"):
+    def __init__(self, model_name="llama3.1:latest", intent_cache=None):
         self.model = model_name
+        self.system_prompt = INTENT_SYSTEM_PROMPT  # Built once; never interpolated per call
+        # Successful LLM parses, reused for repeated/near-duplicate commands
+        self.intent_cache = intent_cache or IntentCache()
+        # Rebuilt only when the registry changes
+        self._entity_index = None
+        self._indexed_registry = None
         logging.info(f"🧠 Intent Parser initialized with model: {self.model}")
         
     def parse(self, command, entity_registry, context=None):
@@ -42,6 +153,53 @@ class IntentParser:
         Returns:
             dict: Structured intent with 'action', 'target', 'service', 'data'.
         """
+        local = self._parse_local(command, entity_registry)
+        if local:
+            return local
+
+        # --- SLOW PATH (LLM) ---
+        
+        # Only the tail of the request varies between calls
+        user_message = self._build_user_message(command, entity_registry, context)
+        
+        
+        # Attempt 1: Fast Model
+        result = self._query_model(self.model, user_message, command)
+        if result:
+            self.intent_cache.put(command, entity_registry, result)
+            return result
+            
+        # Attempt 2: Smart Model Fallback (if configured)
+        # We assume the caller might pass a fallback, or we can hardcode it here for safety.
+        # Ideally, InteractiveAgent should handle this, but for robustness, let's try a second pass 
+        # if the first one returned None (No JSON found).
+        
+        logging.warning(f"⚠️ Fast Brain failed. Falling back to Smart Brain (llama3.1)...")
+        result = self._query_model("llama3.1", user_message, command)
+        if result:
+            self.intent_cache.put(command, entity_registry, result)
+        return result
+
+    async def parse_async(self, command, entity_registry, context=None):
+        """
+        parse() for the event loop: the LLM calls are awaited instead of blocking a
+        thread, and the cache (embeddings, sqlite) and entity lookup run on the scheduler.
+        """
+        local = await run_async(self._parse_local, command, entity_registry)
+        if local:
+            return local
+
+        user_message = await run_async(self._build_user_message, command, entity_registry, context)
+        result = await self._aquery_model(self.model, user_message, command)
+        if not result:
+            logging.warning(f"⚠️ Fast Brain failed. Falling back to Smart Brain (llama3.1)...")
+            result = await self._aquery_model("llama3.1", user_message, command)
+        if result:
+            await run_async(self.intent_cache.put, command, entity_registry, result)
+        return result
+
+    def _parse_local(self, command, entity_registry):
+        """Fast paths, heuristics and the intent cache: everything that answers without the LLM."""
         # Create a simplified list of entities for the prompt context
         # We limit this to avoid context window overflow if there are hundreds
         available_devices = list(entity_registry.keys())
@@ -172,228 +330,168 @@ class IntentParser:
             logging.info(f"⚡ Fast Path: {action}")
             return [{"intent_type": "control", "target_device": "tv", "action": action, "tool_name": None, "arguments": {}}]
 
-        # --- SLOW PATH (LLM) ---
-        
-        # Construct the system prompt (Optimized for Phi-3/Small Models)
-        system_prompt = f"""
-        # JARVIS SYSTEM PROTOCOL & USER MANUAL
-        
-        ## IDENTITY
-        You are **JARVIS**, a highly advanced, autonomous AI assistant. You are not just a chatbot; you are an **Action Engine**. Your purpose is to execute complex tasks, manage the user's digital life, and provide accurate information.
-        
-        ## CORE DIRECTIVE
-        **TASK**: Convert the user's natural language command into a structured **JSON List of Intents**.
-        **OUTPUT**: JSON ONLY. No markdown, no explanations, no chatter.
-        
-        ## CONTEXT
-        - **Previous Output**: {context if context else "None"}
-        - **Connected Devices**: {json.dumps(list(entity_registry.keys())[:50])}
-        
-        ## TOOL MANUAL (CAPABILITIES)
-        
-        ### 1. RESEARCH & AUTOMATION (The "Deep Dive")
-        **Tool**: `run_automation(goal)`
-        - **Description**: Your most powerful capability. It triggers a multi-step autonomous agent.
-        - **Workflow**: 
-          1. Performs broad search (DuckDuckGo).
-          2. Performs specific search (Brave).
-          3. Checks factual sources (Wikipedia).
-          4. **Synthesizes** all findings using an LLM.
-          5. **Saves** a comprehensive Markdown note to the Obsidian Vault.
-        - **When to Use**: 
-          - "Research X"
-          - "Deep dive into Y"
-          - "Find out about Z and save it"
-          - "Go to X and summarize" (Complex Navigation)
-          - ANY request that implies gathering info and saving it.
-        - **Rule**: If the user says "Research...", you **MUST** use this tool. Do not use simple web search.
-        
-        ### 2. CODING COUNCIL (Software Development)
-        **Tool**: `run_coding_task(goal)`
-        - **Description**: Delegates complex coding tasks to a specialized team (Architect, Engineer, Reviewer).
-        - **When to Use**:
-          - "Write a python script to..."
-          - "Create a web app..."
-          - "Refactor this code..."
-          - "Build a tool to..."
-        - **Capabilities**: Can write multiple files, plan architecture, and ensure code quality.
-
-        ### 3. WEB INTELLIGENCE (Quick Checks)
-        - `duckduckgo_search(query)`: **Default Search**. Unlimited, private. Use for quick facts, general knowledge, and simple queries.
-        - `brave_web_search(query)`: **High-Quality Search**. Rate-limited. Use when you need high-quality results or specific technical info.
-        - `wikipedia_search(query)`: **Encyclopedia**. Use for definitions, history, biographies, and famous events.
-        - `search_papers(query)`: **Academic**. Searches ArXiv/PubMed. Use for "scientific papers", "research papers", "studies".
-        
-        ### 4. SECOND BRAIN (Obsidian Vault)
-        - `create_note(title, content)`: Creates a new Markdown note. **CRITICAL**: If user doesn't provide content (e.g., "Make a note about AI"), YOU must generate a summary/content yourself.
-        - `read_note(title)`: Reads a specific note.
-        - `search_notes(query)`: Searches the content of existing notes.
-        - `append_to_note(title, content)`: Adds text to the end of a note.
-        - `delete_note(title)`: Permanently deletes a note.
-        
-        ### 5. SYSTEM CONTROL
-        - `list_containers(all=False)`: Lists Docker containers.
-        - `fs_write_file(path, content)`: Writes a local file (outside vault).
-        - `fs_read_file(path)`: Reads a local file.
-        - `fs_list_files(directory)`: Lists files in a directory.
-        - `get_system_stats`: Returns CPU, RAM, and Disk usage.
-        
-        ### 6. ADVANCED CAPABILITIES
-        - `query_database(query)`: Executes natural language SQL on SQLite databases.
-        - `get_transcript(url)`: Extracts transcripts from YouTube videos.
-        - `playwright_navigate(url)`: Opens a real browser to a URL.
-        
-        ## OPERATIONAL RULES
-        1. **Automation First**: Always prefer `run_automation` for "research" or "find and save" tasks. It provides the best user experience.
-        2. **Content Generation**: For `create_note`, NEVER create an empty note. If the user is vague, use your internal knowledge to fill the content.
-        3. **Chat Mode**: If the user is just chatting ("Hello", "How are you?", "Thanks"), return an **EMPTY LIST** `[]`. Do not force a tool call.
-        4. **URL Integrity**: NEVER change the case of a URL. Keep it exactly as typed.
-        5. **Tool Selection**: If the user specifies a tool ("Use Brave"), honor it. Otherwise, choose the most efficient tool.
-        
-        ## JSON OUTPUT FORMAT
-        [
-          {{
-            "intent_type": "control" | "query" | "mcp_tool",
-            "target_device": "device_name" (or null), 
-            "action": "turn_on" | "turn_off" (or null),
-            "tool_name": "tool_name" (or null),
-            "arguments": {{ "arg": "val" }}
-          }}
+        # --- CACHED PATH (Previous LLM parses) ---
+        return self.intent_cache.get(command, entity_registry)
+
+    def entity_index(self, entity_registry):
+        """Returns the EntityIndex for this registry, rebuilding it if devices changed."""
+        if self._entity_index is None or entity_registry != self._indexed_registry:
+            self._entity_index = EntityIndex(entity_registry)
+            self._indexed_registry = dict(entity_registry)
+        return self._entity_index
+
+    def _build_user_message(self, command, entity_registry, context=None):
+        """Per-call context, appended after the static prompt so the prefix stays cacheable."""
+        if context and len(context) > MAX_CONTEXT_CHARS:
+            context = context[:MAX_CONTEXT_CHARS] + "... [truncated]"
+        return f"""## CONTEXT
+- **Previous Output**: {context if context else "None"}
+- **Connected Devices**: {json.dumps(self.entity_index(entity_registry).candidates(command))}
+
+## COMMAND
+{command}"""
+
+    def prewarm(self):
+        """
+        Loads the parser model and evaluates the static prompt in the background,
+        so the first real command only pays for its own tail tokens. Also starts
+        loading the intent cache's sentence model.
+        """
+        def _warm():
+            try:
+                llm_gateway.chat(model=self.model, messages=self._messages_for("## COMMAND\nHello"),
+                                 keep_alive=INTENT_KEEP_ALIVE, options=dict(INTENT_OPTIONS, num_predict=1))
+                logging.info(f"🔥 Intent Parser: {self.model} warmed up.")
+            except Exception as e:
+                logging.warning(f"⚠️ Intent Parser: Prewarm failed: {e}")
+        threading.Thread(target=_warm, daemon=True).start()
+        self.intent_cache.warm()
+
+    def _messages_for(self, user_message):
+        return [
+            {'role': 'system', 'content': self.system_prompt},
+            {'role': 'user', 'content': user_message}
         ]
+
+    def _query_model(self, model, user_message, command):
+        try:
+            response = llm_gateway.chat(model=model, messages=self._messages_for(user_message),
+                                       keep_alive=INTENT_KEEP_ALIVE, options=INTENT_OPTIONS)
+            return self._interpret(model, response['message']['content'], command)
+        except Exception as e:
+            logging.error(f"❌ Intent Parsing Error ({model}): {e}")
+            return None
+
+    async def _aquery_model(self, model, user_message, command):
+        try:
+            response = await llm_gateway.achat(model=model, messages=self._messages_for(user_message),
+                                               keep_alive=INTENT_KEEP_ALIVE, options=INTENT_OPTIONS)
+            return self._interpret(model, response['message']['content'], command)
+        except Exception as e:
+            logging.error(f"❌ Intent Parsing Error ({model}): {e}")
+            return None
+
+    def _interpret(self, model, content, command):
+        """Extracts, sanitizes and URL-restores the intent list from raw model output."""
+        logging.info(f"🧠 Raw LLM Output ({model}): {content}")
         
-        ## EXAMPLES
-        User: "List docker containers" -> JSON: [{{"intent_type": "mcp_tool", "tool_name": "list_containers", "arguments": {{"all": false}}}}]
-        User: "Search the web for quantum computing" -> JSON: [{{"intent_type": "mcp_tool", "tool_name": "duckduckgo_search", "arguments": {{"query": "quantum computing"}}}}]
-        User: "Research the history of the internet and save it" -> JSON: [{{"intent_type": "mcp_tool", "tool_name": "run_automation", "arguments": {{"goal": "Research the history of the internet and save it"}}}}]
-        User: "Create a note called Ideas" -> JSON: [{{"intent_type": "mcp_tool", "tool_name": "create_note", "arguments": {{"title": "Ideas", "content": "New note."}}}}]
-        User: "Hello Jarvis" -> JSON: []
-        """
+        json_str = None
         
-        # Attempt 1: Fast Model
-        result = self._query_model(self.model, system_prompt, command)
-        if result:
-            return result
-            
-        # Attempt 2: Smart Model Fallback (if configured)
-        # We assume the caller might pass a fallback, or we can hardcode it here for safety.
-        # Ideally, InteractiveAgent should handle this, but for robustness, let's try a second pass 
-        # if the first one returned None (No JSON found).
+        # 1. Try to extract from markdown code blocks
+        if "```json" in content:
+            json_str = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            json_str = content.split("```")[1].split("```")[0].strip()
         
-        logging.warning(f"⚠️ Fast Brain failed. Falling back to Smart Brain (llama3.1)...")
-        result = self._query_model("llama3.1", system_prompt, command)
-        return result
-
-    def _query_model(self, model, system_prompt, command):
-        try:
-            response = ollama.chat(model=model, messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': command}
-            ])
-            
-            content = response['message']['content']
-            logging.info(f"🧠 Raw LLM Output ({model}): {content}")
-            
-            json_str = None
-            
-            # 1. Try to extract from markdown code blocks
-            if "```json" in content:
-                json_str = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                json_str = content.split("```")[1].split("```")[0].strip()
-            
-            # 2. If no markdown, try regex (non-greedy for list or dict)
-            if not json_str:
-                match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
-                if match:
-                    json_str = match.group(1)
-            
-            if json_str:
-                try:
-                    parsed = json.loads(json_str)
-                    # Normalize to list
-                    if isinstance(parsed, dict):
-                        parsed = [parsed]
+        # 2. If no markdown, try regex (non-greedy for list or dict)
+        if not json_str:
+            match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
+            if match:
+                json_str = match.group(1)
+        
+        if json_str:
+            try:
+                parsed = json.loads(json_str)
+                # Normalize to list
+                if isinstance(parsed, dict):
+                    parsed = [parsed]
+                
+                # Sanitize: Ensure create_note always has a title
+                valid_intents = []
+                for intent in parsed:
+                    # Filter out empty/chat intents
+                    # If intent_type is 'query' but no target/tool/action, it's just a chat query.
+                    is_empty = (
+                        not intent.get('tool_name') and 
+                        not intent.get('action') and 
+                        (not intent.get('intent_type') or intent.get('intent_type') == 'query') and
+                        not intent.get('target_device')
+                    )
                     
-                    # Sanitize: Ensure create_note always has a title
-                    valid_intents = []
-                    for intent in parsed:
-                        # Filter out empty/chat intents
-                        # If intent_type is 'query' but no target/tool/action, it's just a chat query.
-                        is_empty = (
-                            not intent.get('tool_name') and 
-                            not intent.get('action') and 
-                            (not intent.get('intent_type') or intent.get('intent_type') == 'query') and
-                            not intent.get('target_device')
-                        )
-                        
-                        if is_empty:
-                            continue
-                            
-                        if intent.get('tool_name') == 'create_note':
-                            args = intent.get('arguments', {})
-                            if not args.get('title'):
-                                # Fallback: Use first 5 words of content or "Untitled Note"
-                                content = args.get('content', '')
-                                if content:
-                                    fallback_title = " ".join(content.split()[:5])
-                                    # Clean special chars
-                                    fallback_title = "".join([c for c in fallback_title if c.isalnum() or c == " "]).strip()
-                                    args['title'] = fallback_title
-                                else:
-                                    import time
-                                    args['title'] = f"Untitled Note {int(time.time())}"
-                                logging.warning(f"⚠️ Auto-generated title: {args['title']}")
+                    if is_empty:
+                        continue
                         
-                        valid_intents.append(intent)
+                    if intent.get('tool_name') == 'create_note':
+                        args = intent.get('arguments', {})
+                        if not args.get('title'):
+                            # Fallback: Use first 5 words of content or "Untitled Note"
+                            content = args.get('content', '')
+                            if content:
+                                fallback_title = " ".join(content.split()[:5])
+                                # Clean special chars
+                                fallback_title = "".join([c for c in fallback_title if c.isalnum() or c == " "]).strip()
+                                args['title'] = fallback_title
+                            else:
+                                import time
+                                args['title'] = f"Untitled Note {int(time.time())}"
+                            logging.warning(f"⚠️ Auto-generated title: {args['title']}")
                     
-                    if not valid_intents:
-                        logging.info(f"🧠 Intent Parsed: None (Chat/Empty)")
-                        return None
+                    valid_intents.append(intent)
+                
+                if not valid_intents:
+                    logging.info(f"🧠 Intent Parsed: None (Chat/Empty)")
+                    return None
 
-                    logging.info(f"🧠 Intent Parsed: {valid_intents}")
-                    
-                    # URL Restoration: Fix LLM lowercasing and format changes
-                    original_urls = re.findall(r'(https?://[^\s]+)', command)
-                    logging.info(f"🔍 URL Restoration: Found {len(original_urls)} URLs in original command")
-                    for url in original_urls:
-                        logging.info(f"  - Original URL: {url}")
+                logging.info(f"🧠 Intent Parsed: {valid_intents}")
+                
+                # URL Restoration: Fix LLM lowercasing and format changes
+                original_urls = re.findall(r'(https?://[^\s]+)', command)
+                logging.info(f"🔍 URL Restoration: Found {len(original_urls)} URLs in original command")
+                for url in original_urls:
+                    logging.info(f"  - Original URL: {url}")
+                
+                if original_urls:
+                    # Build a map of video_id (lowercased) -> original URL
+                    video_id_map = {}
+                    for orig_url in original_urls:
+                        vid_id = _extract_video_id(orig_url)
+                        if vid_id:
+                            video_id_map[vid_id.lower()] = orig_url
+                            logging.info(f"  - Mapped ID '{vid_id}' (lower: '{vid_id.lower()}') -> {orig_url}")
                     
-                    if original_urls:
-                        # Build a map of video_id (lowercased) -> original URL
-                        video_id_map = {}
-                        for orig_url in original_urls:
-                            vid_id = _extract_video_id(orig_url)
-                            if vid_id:
-                                video_id_map[vid_id.lower()] = orig_url
-                                logging.info(f"  - Mapped ID '{vid_id}' (lower: '{vid_id.lower()}') -> {orig_url}")
-                        
-                        # Restore URLs in intents
-                        for intent in valid_intents:
-                            args = intent.get('arguments', {})
-                            for key, value in args.items():
-                                if isinstance(value, str) and value.lower().startswith("http"):
-                                    llm_vid_id = _extract_video_id(value)
-                                    logging.info(f"🔧 LLM output URL: {value}")
-                                    logging.info(f"  - Extracted ID: {llm_vid_id} (lower: {llm_vid_id.lower() if llm_vid_id else 'None'})")
-                                    if llm_vid_id and llm_vid_id.lower() in video_id_map:
-                                        original_url = video_id_map[llm_vid_id.lower()]
-                                        logging.info(f"  ✅ Restoring URL: {value} -> {original_url}")
-                                        args[key] = original_url
-                                    else:
-                                        logging.warning(f"  ❌ No match found for ID '{llm_vid_id}' in map: {list(video_id_map.keys())}")
-
-                    return valid_intents
-                except json.JSONDecodeError:
-                    logging.warning(f"⚠️ JSON Decode Failed ({model}). Output was not valid JSON.")
-                    # Only log full garbage output if debugging
-                    # logging.debug(f"Garbage: {json_str[:100]}...") 
-                    return None
-            else:
-                logging.warning(f"⚠️ No JSON found in output ({model})")
+                    # Restore URLs in intents
+                    for intent in valid_intents:
+                        args = intent.get('arguments', {})
+                        for key, value in args.items():
+                            if isinstance(value, str) and value.lower().startswith("http"):
+                                llm_vid_id = _extract_video_id(value)
+                                logging.info(f"🔧 LLM output URL: {value}")
+                                logging.info(f"  - Extracted ID: {llm_vid_id} (lower: {llm_vid_id.lower() if llm_vid_id else 'None'})")
+                                if llm_vid_id and llm_vid_id.lower() in video_id_map:
+                                    original_url = video_id_map[llm_vid_id.lower()]
+                                    logging.info(f"  ✅ Restoring URL: {value} -> {original_url}")
+                                    args[key] = original_url
+                                else:
+                                    logging.warning(f"  ❌ No match found for ID '{llm_vid_id}' in map: {list(video_id_map.keys())}")
+
+                return valid_intents
+            except json.JSONDecodeError:
+                logging.warning(f"⚠️ JSON Decode Failed ({model}). Output was not valid JSON.")
+                # Only log full garbage output if debugging
+                # logging.debug(f"Garbage: {json_str[:100]}...") 
                 return None
-                
-        except Exception as e:
-            logging.error(f"❌ Intent Parsing Error ({model}): {e}")
+        else:
+            logging.warning(f"⚠️ No JSON found in output ({model})")
             return None
 
     def _heuristic_parse(self, command, entity_registry):
@@ -401,8 +499,6 @@ class IntentParser:
         Attempts to parse simple Home Automation commands using fuzzy matching
         instead of the LLM.
         """
-        import difflib
-        
         cmd_lower = command.lower().strip()
         
         # 0. Navigation Bypass
@@ -437,12 +533,10 @@ class IntentParser:
             return None
             
         # 2. Fuzzy Match Target against Entity Registry
-        # We look for the best match among the keys (friendly names)
-        # cutoff=0.6 means 60% similarity required
-        matches = difflib.get_close_matches(target_phrase, entity_registry.keys(), n=1, cutoff=0.6)
+        # Trigram index over friendly names + aliases; 0.6 means 60% similarity required
+        best_match = self.entity_index(entity_registry).best(target_phrase, min_score=0.6)
         
-        if matches:
-            best_match = matches[0]
+        if best_match:
             entity_id = entity_registry[best_match]
             logging.info(f"⚡ Fast Path: Heuristic Match '{target_phrase}' -> '{best_match}' ({entity_id})")
             
@@ -0,0 +1,337 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, AsyncIterator, Iterator, Optional
+
+# How many models we assume fit in VRAM at once (Ollama's OLLAMA_MAX_LOADED_MODELS).
+DEFAULT_MAX_RESIDENT = int(os.getenv("JARVIS_MAX_RESIDENT_MODELS", "2"))
+# Concurrent requests per loaded model (Ollama's OLLAMA_NUM_PARALLEL).
+DEFAULT_PARALLEL_PER_MODEL = int(os.getenv("JARVIS_OLLAMA_PARALLEL", "2"))
+# Models used on nearly every command; they are only evicted when no other model can be.
+DEFAULT_PINNED = [m for m in os.getenv("JARVIS_PINNED_MODELS", "qwen2.5:7b").split(",") if m]
+DEFAULT_KEEP_ALIVE = "10m"
+PINNED_KEEP_ALIVE = -1  # Stay loaded until the server restarts
+# A request for a non-resident model waits at most this long for a swap.
+MAX_AFFINITY_WAIT = 5.0
+# No request waits in the queue longer than this; it fails with LLMQueueTimeout instead.
+QUEUE_TIMEOUT = float(os.getenv("JARVIS_LLM_QUEUE_TIMEOUT", "120"))
+
+
+class LLMQueueTimeout(TimeoutError):
+    """A request could not be admitted within the gateway's queue deadline."""
+
+
+class _Waiter:
+    __slots__ = ("model", "enqueued_at", "wake")
+
+    def __init__(self, model: str, wake=None):
+        self.model = model
+        self.enqueued_at = time.perf_counter()
+        self.wake = wake  # Set for event-loop waiters, which can't block on the condition
+
+
+class _ModelStats:
+    __slots__ = ("requests", "errors", "timeouts", "swaps", "wait_total", "wait_max", "infer_total", "infer_max")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.swaps = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.infer_total = 0.0
+        self.infer_max = 0.0
+
+
+class LLMGateway:
+    """
+    Single entry point for every Ollama call in the agent.
+
+    Requests queue here and are admitted with model affinity: requests for
+    models already resident in VRAM go first (up to the per-model parallelism),
+    and a different model is only brought in when a resident one is idle. A
+    request for a cold model is never starved for more than MAX_AFFINITY_WAIT:
+    after that, resident models stop admitting new work until the swap happens.
+    Hot models are kept loaded with keep_alive (pinned ones indefinitely), and
+    per-model queue wait vs. inference time is recorded.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "LLMGateway":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, max_resident: int = DEFAULT_MAX_RESIDENT, parallel_per_model: int = DEFAULT_PARALLEL_PER_MODEL,
+                 pinned: List[str] = None, keep_alive: Any = DEFAULT_KEEP_ALIVE):
+        self.max_resident = max(1, max_resident)
+        self.parallel_per_model = max(1, parallel_per_model)
+        self.pinned = set(DEFAULT_PINNED if pinned is None else pinned)
+        self.keep_alive = keep_alive
+        self._cond = threading.Condition()
+        self._waiting: List[_Waiter] = []
+        self._in_flight: Dict[str, int] = {}
+        self._resident: "OrderedDict[str, float]" = OrderedDict()  # model -> last used (LRU order)
+        self._stats: Dict[str, _ModelStats] = {}
+        self._async_clients: Dict[int, "ollama.AsyncClient"] = {}  # id(loop) -> client (httpx clients are loop-bound)
+        logging.info(f"🚦 LLM Gateway: max_resident={self.max_resident}, parallel={self.parallel_per_model}, pinned={sorted(self.pinned)}")
+
+    # --- Admission ---
+
+    def _eviction_candidate(self) -> Optional[str]:
+        """LRU idle model to swap out: unpinned ones first, a pinned one only if nothing else is idle."""
+        idle = [m for m in self._resident if self._in_flight.get(m, 0) == 0]
+        for model in idle:
+            if model not in self.pinned:
+                return model
+        return idle[0] if idle else None
+
+    def _can_load(self, model: str) -> bool:
+        """True if `model` is resident, or a slot can be freed by evicting an idle model."""
+        if model in self._resident:
+            return True
+        if len(self._resident) < self.max_resident:
+            return True
+        return self._eviction_candidate() is not None
+
+    def _select(self) -> Optional[_Waiter]:
+        """Next waiter to admit (call with the lock held)."""
+        now = time.perf_counter()
+        for waiter in self._waiting:
+            if waiter.model not in self._resident and now - waiter.enqueued_at > MAX_AFFINITY_WAIT:
+                # Starving cold request: it goes next, and nothing else is admitted until it can load.
+                return waiter if self._can_load(waiter.model) else None
+
+        for waiter in self._waiting:
+            if waiter.model in self._resident and self._in_flight.get(waiter.model, 0) < self.parallel_per_model:
+                return waiter
+        for waiter in self._waiting:
+            if waiter.model not in self._resident and self._can_load(waiter.model):
+                return waiter
+        return None
+
+    def _admit(self, waiter: _Waiter):
+        model = waiter.model
+        self._waiting.remove(waiter)
+        stats = self._stats.setdefault(model, _ModelStats())
+        if model not in self._resident:
+            if len(self._resident) >= self.max_resident:
+                candidate = self._eviction_candidate()
+                if candidate is not None:
+                    del self._resident[candidate]
+                    pinned = " (pinned)" if candidate in self.pinned else ""
+                    logging.info(f"🚦 LLM Gateway: Swapping {candidate}{pinned} -> {model}")
+            stats.swaps += 1
+        self._resident[model] = time.time()
+        self._resident.move_to_end(model)
+        self._in_flight[model] = self._in_flight.get(model, 0) + 1
+
+        wait = time.perf_counter() - waiter.enqueued_at
+        stats.requests += 1
+        stats.wait_total += wait
+        stats.wait_max = max(stats.wait_max, wait)
+
+    def _acquire(self, model: str):
+        waiter = _Waiter(model)
+        deadline = waiter.enqueued_at + QUEUE_TIMEOUT
+        with self._cond:
+            self._waiting.append(waiter)
+            while self._select() is not waiter:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._abandon(waiter)
+                    raise LLMQueueTimeout(f"{model} not admitted within {QUEUE_TIMEOUT:g}s")
+                # Time out periodically so starvation is re-evaluated even without a release
+                self._cond.wait(timeout=min(1.0, remaining))
+            self._admit(waiter)
+            self._notify()
+
+    async def _aacquire(self, model: str):
+        """_acquire for coroutines: parks on an asyncio.Event instead of a thread."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = _Waiter(model, wake=lambda: loop.call_soon_threadsafe(event.set))
+        deadline = waiter.enqueued_at + QUEUE_TIMEOUT
+        with self._cond:
+            self._waiting.append(waiter)
+        try:
+            while True:
+                with self._cond:
+                    if self._select() is waiter:
+                        self._admit(waiter)
+                        self._notify()
+                        return
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise LLMQueueTimeout(f"{model} not admitted within {QUEUE_TIMEOUT:g}s")
+                    event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(1.0, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException as e:
+            # Timed out or cancelled while queued: give up the place in line
+            with self._cond:
+                self._abandon(waiter, timed_out=isinstance(e, LLMQueueTimeout))
+            raise
+
+    def _abandon(self, waiter: _Waiter, timed_out: bool = True):
+        """Removes a waiter that gave up (call with the lock held)."""
+        if waiter in self._waiting:
+            self._waiting.remove(waiter)
+            if timed_out:
+                self._stats.setdefault(waiter.model, _ModelStats()).timeouts += 1
+            self._notify()
+
+    def _notify(self):
+        """Wakes every waiter, threaded and async (call with the lock held)."""
+        self._cond.notify_all()
+        for waiter in self._waiting:
+            if waiter.wake is not None:
+                waiter.wake()
+
+    def _release(self, model: str, started: float, ok: bool):
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._in_flight[model] -= 1
+            stats = self._stats[model]
+            stats.infer_total += elapsed
+            stats.infer_max = max(stats.infer_max, elapsed)
+            if not ok:
+                stats.errors += 1
+            self._notify()
+
+    def _keep_alive_for(self, model: str, kwargs: Dict[str, Any]):
+        if "keep_alive" not in kwargs:
+            kwargs["keep_alive"] = PINNED_KEEP_ALIVE if model in self.pinned else self.keep_alive
+
+    # --- Public API (mirrors ollama.chat / ollama.generate) ---
+
+    def chat(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        import ollama  # Deferred: the client stack (httpx, pydantic) isn't needed until the first call
+        self._keep_alive_for(model, kwargs)
+        if stream:
+            return self._stream(ollama.chat, model, messages=messages, **kwargs)
+        return self._call(ollama.chat, model, messages=messages, **kwargs)
+
+    def generate(self, model: str, prompt: str = "", stream: bool = False, **kwargs):
+        import ollama
+        self._keep_alive_for(model, kwargs)
+        if stream:
+            return self._stream(ollama.generate, model, prompt=prompt, **kwargs)
+        return self._call(ollama.generate, model, prompt=prompt, **kwargs)
+
+    def _call(self, fn, model: str, **kwargs):
+        self._acquire(model)
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(model=model, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._release(model, started, ok)
+
+    def _stream(self, fn, model: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """The slot is held until the stream is exhausted or closed."""
+        self._acquire(model)
+        started = time.perf_counter()
+        ok = False
+        try:
+            for chunk in fn(model=model, stream=True, **kwargs):
+                yield chunk
+            ok = True
+        finally:
+            self._release(model, started, ok)
+
+    # --- Async API (mirrors ollama.AsyncClient.chat / generate) ---
+
+    def _async_client(self) -> "ollama.AsyncClient":
+        import ollama
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(id(loop))
+        if client is None:
+            client = self._async_clients[id(loop)] = ollama.AsyncClient()
+        return client
+
+    async def achat(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        self._keep_alive_for(model, kwargs)
+        client = self._async_client()
+        if stream:
+            return self._astream(client.chat, model, messages=messages, **kwargs)
+        return await self._acall(client.chat, model, messages=messages, **kwargs)
+
+    async def agenerate(self, model: str, prompt: str = "", stream: bool = False, **kwargs):
+        self._keep_alive_for(model, kwargs)
+        client = self._async_client()
+        if stream:
+            return self._astream(client.generate, model, prompt=prompt, **kwargs)
+        return await self._acall(client.generate, model, prompt=prompt, **kwargs)
+
+    async def _acall(self, fn, model: str, **kwargs):
+        await self._aacquire(model)
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await fn(model=model, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._release(model, started, ok)
+
+    async def _astream(self, fn, model: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        await self._aacquire(model)
+        started = time.perf_counter()
+        ok = False
+        try:
+            async for chunk in await fn(model=model, stream=True, **kwargs):
+                yield chunk
+            ok = True
+        finally:
+            self._release(model, started, ok)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            report = {"resident": list(self._resident), "waiting": len(self._waiting), "models": {}}
+            for model, s in self._stats.items():
+                report["models"][model] = {
+                    "requests": s.requests,
+                    "errors": s.errors,
+                    "timeouts": s.timeouts,
+                    "swaps": s.swaps,
+                    "in_flight": self._in_flight.get(model, 0),
+                    "queued": sum(1 for w in self._waiting if w.model == model),
+                    "avg_wait_ms": round(s.wait_total / s.requests * 1000, 1) if s.requests else 0.0,
+                    "max_wait_ms": round(s.wait_max * 1000, 1),
+                    "avg_inference_ms": round(s.infer_total / s.requests * 1000, 1) if s.requests else 0.0,
+                    "max_inference_ms": round(s.infer_max * 1000, 1),
+                }
+            return report
+
+
+def chat(model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+    """Drop-in replacement for ollama.chat that goes through the shared gateway."""
+    return LLMGateway.get().chat(model, messages, stream=stream, **kwargs)
+
+
+def generate(model: str, prompt: str = "", stream: bool = False, **kwargs):
+    """Drop-in replacement for ollama.generate that goes through the shared gateway."""
+    return LLMGateway.get().generate(model, prompt, stream=stream, **kwargs)
+
+
+async def achat(model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+    """Async ollama chat through the shared gateway; no thread is held while the model runs."""
+    return await LLMGateway.get().achat(model, messages, stream=stream, **kwargs)
+
+
+async def agenerate(model: str, prompt: str = "", stream: bool = False, **kwargs):
+    """Async ollama generate through the shared gateway."""
+    return await LLMGateway.get().agenerate(model, prompt, stream=stream, **kwargs)
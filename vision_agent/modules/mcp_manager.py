@@ -1,15 +1,29 @@
+import asyncio
 import json
-import subprocess
 import logging
 import os
-import ollama
+from vision_agent.modules import llm_gateway
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Tuple
 from vision_agent.modules.filesystem_mcp import FilesystemMCP
 from vision_agent.modules.obsidian_mcp import ObsidianMCP
 from vision_agent.modules.coding_agent import CodingAgent
 from vision_agent.modules.system_repair import SystemRepairAgent
+from vision_agent.modules.mcp_session_pool import MCPSessionPool, MCPSessionError, MCPRemoteError
+from vision_agent.modules.tool_catalog import ToolCatalog, FALLBACK_TOOLS, TOOL_ALIASES, to_tool_schema
+from vision_agent.modules.tool_cache import ToolResultCache
+from vision_agent.modules.capabilities import Capability, CapabilityRegistry
+from vision_agent.modules.task_scheduler import run_async
 
 class MCPManager:
+    # Internal MCPs and sub-agents, built on their first tool call
+    fs_mcp = Capability()
+    obsidian_mcp = Capability()
+    coding_agent = Capability()
+    system_repair = Capability()
+
     def __init__(self):
+        self.capabilities = CapabilityRegistry(self)
         self.servers = {
             "docker": ["/mnt/fast_data/projects/vision_agent/docker_launcher.sh"],
             "brave": ["/mnt/fast_data/projects/vision_agent/brave_search_launcher.sh"],
@@ -23,29 +37,29 @@ class MCPManager:
             # "filesystem": REMOVED (Internal)
             # "obsidian": REMOVED (Internal)
         }
+        self.session_pool = MCPSessionPool(self.servers)
+        self.catalog = ToolCatalog(self.servers)
+        self.result_cache = ToolResultCache()
+        self._parallel_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mcp-tool")
+        self.discovery_timeout = 45  # Docker may need to pull an image on first discovery
         self.tools = []
+        self.tool_routes: Dict[str, Tuple[str, str]] = {}  # exposed name -> (server, actual MCP name)
         self.internal_tools: Dict[str, Callable] = {}
         self.internal_tool_schemas: List[Dict] = []
         
-        # Initialize Internal MCPs
-        self.fs_mcp = FilesystemMCP()
-        self.obsidian_mcp = ObsidianMCP()
-        self.coding_agent = CodingAgent(self)
-        self.system_repair = SystemRepairAgent(self)
-        
         # Register Filesystem Tools
-        for tool in self.fs_mcp.get_tools():
+        for tool in FilesystemMCP.get_tools():
             method_name = tool["name"].replace("fs_", "") if tool["name"].startswith("fs_") else tool["name"]
-            self.register_tool(tool["name"], self._wrap_mcp_method(getattr(self.fs_mcp, method_name)), tool)
+            self.register_tool(tool["name"], self._wrap_mcp_method("fs_mcp", method_name), tool)
 
         # Register Obsidian Tools
-        for tool in self.obsidian_mcp.get_tools():
-            self.register_tool(tool["name"], self._wrap_mcp_method(getattr(self.obsidian_mcp, tool["name"])), tool)
+        for tool in ObsidianMCP.get_tools():
+            self.register_tool(tool["name"], self._wrap_mcp_method("obsidian_mcp", tool["name"]), tool)
             
         # Register Coding Agent
         self.register_tool(
             "run_coding_task",
-            self.coding_agent.run_coding_task,
+            lambda tool_name, args: self.coding_agent.run_coding_task(tool_name, args),
             {
                 "name": "run_coding_task",
                 "description": "Delegate a complex coding or software development task to the Council of Agents.",
@@ -62,7 +76,7 @@ class MCPManager:
         # Register System Repair Agent
         self.register_tool(
             "run_system_repair",
-            self.system_repair.run_repair,
+            lambda tool_name, args: self.system_repair.run_repair(tool_name, args),
             {
                 "name": "run_system_repair",
                 "description": "Diagnose and repair system issues (Linux, Network, Packages).",
@@ -96,12 +110,24 @@ class MCPManager:
         
         self.refresh_tools()
 
-    def _wrap_mcp_method(self, method: Callable) -> Callable:
-        """Wraps an MCP class method to match the (tool_name, args) signature."""
+    def _wrap_mcp_method(self, owner: str, method_name: str) -> Callable:
+        """Wraps an internal MCP's method to match the (tool_name, args) signature; the MCP is built on first call."""
         def wrapper(tool_name: str, args: Dict[str, Any]) -> Any:
-            return method(**args)
+            return getattr(getattr(self, owner), method_name)(**args)
         return wrapper
 
+    def _build_fs_mcp(self):
+        return FilesystemMCP()
+
+    def _build_obsidian_mcp(self):
+        return ObsidianMCP()
+
+    def _build_coding_agent(self):
+        return CodingAgent(self)
+
+    def _build_system_repair(self):
+        return SystemRepairAgent(self)
+
     def _synthesize_content(self, tool_name: str, args: Dict[str, Any]) -> str:
         """Internal tool to synthesize content using Llama 3.1."""
         topic = args.get("topic", "Unknown Topic")
@@ -117,7 +143,7 @@ class MCPManager:
         logging.info(f"🧠 Synthesizing content for topic: {topic}")
         
         try:
-            response = ollama.chat(model="llama3.1", messages=[
+            response = llm_gateway.chat(model="llama3.1", messages=[
                 {'role': 'system', 'content': f"You are a research assistant. Synthesize the provided content into a comprehensive, well-structured markdown summary about '{topic}'. Focus on clarity, key facts, and actionable insights."},
                 {'role': 'user', 'content': content}
             ])
@@ -136,7 +162,52 @@ class MCPManager:
         return self.tools + self.internal_tool_schemas
 
     def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Execute a tool (either internal or external)."""
+        """Execute a tool (either internal or external), serving idempotent tools from the result cache."""
+        cached = self.result_cache.get(tool_name, arguments)
+        if cached is not None:
+            logging.info(f"⚡ Tool Cache Hit: {tool_name}({arguments}) [{self.result_cache.stats()['hit_rate']:.0%} hit rate]")
+            return cached
+
+        result = self._dispatch_tool(tool_name, arguments)
+        self.result_cache.put(tool_name, arguments, result)
+        return result
+
+    async def execute_tool_async(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """
+        execute_tool() for the event loop: external calls are awaited on the session
+        pool without holding a thread; the sqlite result cache runs on the scheduler.
+        """
+        cached = await run_async(self.result_cache.get, tool_name, arguments)
+        if cached is not None:
+            logging.info(f"⚡ Tool Cache Hit: {tool_name}({arguments}) [{self.result_cache.stats()['hit_rate']:.0%} hit rate]")
+            return cached
+
+        if tool_name in self.internal_tools:
+            # Internal handlers are plain (blocking) Python: run them in the scheduler's tool class
+            result = await run_async(self._dispatch_tool, tool_name, arguments, priority="tool", name=tool_name)
+        else:
+            route = self.tool_routes.get(tool_name)
+            if not route:
+                return f"Error: Tool '{tool_name}' not found."
+            result = await self.acall_tool(route[0], route[1], arguments, idempotent=self._is_idempotent(tool_name))
+        await run_async(self.result_cache.put, tool_name, arguments, result)
+        return result
+
+    def execute_tools_parallel(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Execute independent tool calls concurrently.
+        Results come back in the same order as `calls`; a failing call yields an error string.
+        """
+        futures = [self._parallel_executor.submit(self.execute_tool, name, args) for name, args in calls]
+        results = []
+        for (name, _), future in zip(calls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(f"Error executing tool {name}: {e}")
+        return results
+
+    def _dispatch_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         # Check internal first
         if tool_name in self.internal_tools:
             try:
@@ -145,150 +216,130 @@ class MCPManager:
                 return f"Error executing internal tool {tool_name}: {e}"
         
         # Fallback to external
-        server = self.get_server_for_tool(tool_name)
-        if server:
-            # Tool Name Mapping (Internal -> Actual MCP Name)
-            # Some MCP servers use generic names like "search" which we rename internally to avoid conflicts
-            actual_tool_name = tool_name
-            if tool_name == "duckduckgo_search":
-                actual_tool_name = "search"
-            elif tool_name == "wikipedia_search":
-                actual_tool_name = "search"
-            
-            return self.call_tool(server, actual_tool_name, arguments)
+        route = self.tool_routes.get(tool_name)
+        if route:
+            server, actual_tool_name = route
+            return self.call_tool(server, actual_tool_name, arguments, idempotent=self._is_idempotent(tool_name))
         
         return f"Error: Tool '{tool_name}' not found."
 
-    def refresh_tools(self):
+    def refresh_tools(self, force: bool = False, wait: bool = False):
         """
-        Connects to all servers and fetches their tool definitions.
-        (Simplified: We just hardcode the known tools for now to avoid async complexity in this synchronous agent, 
-         or we could implement a quick 'list_tools' call via subprocess).
+        Loads external tool definitions.
+        Fresh entries from the on-disk catalog are used as-is, so a warm start never
+        touches docker. Missing or expired servers get their fallback schemas right
+        away and are discovered with a parallel `tools/list` in the background
+        (or in the foreground when `wait=True`).
         """
-        # For this v1 implementation, we will define the tools we KNOW exist because
-        # implementing a full async JSON-RPC client in this synchronous codebase is complex.
-        # Ideally, we would query the servers.
-        
-        self.tools = [
-            # Docker Tools
-            {
-                "name": "list_containers",
-                "description": "List all docker containers. Returns JSON.",
-                "parameters": {"type": "object", "properties": {"all": {"type": "boolean"}}}
-            },
-            {
-                "name": "inspect_container",
-                "description": "Get detailed info about a container.",
-                "parameters": {"type": "object", "properties": {"container_id": {"type": "string"}}, "required": ["container_id"]}
-            },
-            {
-                "name": "get_logs",
-                "description": "Get logs from a container.",
-                "parameters": {"type": "object", "properties": {"container_id": {"type": "string"}, "tail": {"type": "integer"}}, "required": ["container_id"]}
-            },
-            # Brave Tools
-            {
-                "name": "brave_web_search",
-                "description": "Search the internet for information.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            # DuckDuckGo Tools
-            {
-                "name": "duckduckgo_search",
-                "description": "Search the web using DuckDuckGo (privacy-focused).",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            # Wikipedia Tools
-            {
-                "name": "wikipedia_search",
-                "description": "Search Wikipedia for factual information.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            # Paper Search Tools (ArXiv, PubMed, etc.)
-            {
-                "name": "search_papers",
-                "description": "Search academic papers from ArXiv, PubMed, and other sources.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-             # GitHub Tools
-            {
-                "name": "search_repositories",
-                "description": "Search for GitHub repositories.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            # YouTube Tools
-            {
-                "name": "get_transcript",
-                "description": "Get the transcript of a YouTube video.",
-                "parameters": {"type": "object", "properties": {"url": {"type": "string"}}, "required": ["url"]}
-            },
-            # Playwright Tools (Web Automation)
-            {
-                "name": "playwright_navigate",
-                "description": "Navigate to a URL in a browser.",
-                "parameters": {"type": "object", "properties": {"url": {"type": "string"}}, "required": ["url"]}
-            },
-            {
-                "name": "playwright_screenshot",
-                "description": "Take a screenshot of the current page.",
-                "parameters": {"type": "object", "properties": {}}
-            },
-            {
-                "name": "playwright_get_content",
-                "description": "Get the text content of the current page.",
-                "parameters": {"type": "object", "properties": {}}
-            },
-            # SQL Tools (Natural Language Database Queries)
-            {
-                "name": "query_database",
-                "description": "Execute SQL queries on SQLite databases using natural language.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            {
-                "name": "create_table",
-                "description": "Create a new table in the database.",
-                "parameters": {"type": "object", "properties": {"table_name": {"type": "string"}, "schema": {"type": "string"}}, "required": ["table_name", "schema"]}
-            },
-            # Obsidian Tools
-            {
-                "name": "create_note",
-                "description": "Create a new note in Obsidian.",
-                "parameters": {"type": "object", "properties": {"title": {"type": "string"}, "content": {"type": "string"}, "folder": {"type": "string"}}, "required": ["title", "content"]}
-            },
-            {
-                "name": "read_note",
-                "description": "Read a note from Obsidian.",
-                "parameters": {"type": "object", "properties": {"title": {"type": "string"}}, "required": ["title"]}
-            },
-            {
-                "name": "search_notes",
-                "description": "Search for notes in Obsidian.",
-                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
-            },
-            {
-                "name": "append_to_note",
-                "description": "Append content to an existing note.",
-                "parameters": {"type": "object", "properties": {"title": {"type": "string"}, "content": {"type": "string"}}, "required": ["title", "content"]}
-            },
-            {
-                "name": "delete_note",
-                "description": "Delete a note from Obsidian.",
-                "parameters": {"type": "object", "properties": {"title": {"type": "string"}}, "required": ["title"]}
-            }
-        ]
-        logging.info(f"🔌 MCP Manager: Loaded {len(self.tools)} external tools.")
+        stale = list(self.servers) if force else self.catalog.stale_servers()
+        self._rebuild_routes()
+        logging.info(f"🔌 MCP Manager: Loaded {len(self.tools)} external tools ({len(self.servers) - len(stale)} servers from catalog).")
 
-    def call_tool(self, server_name, tool_name, arguments):
+        if not stale:
+            return
+        future = self.session_pool.event_loop.submit(self._discover(stale))
+        if wait:
+            future.result()
+
+    async def _discover(self, server_names: List[str]):
+        """Runs `tools/list` against every stale server concurrently."""
+        async def discover_one(name):
+            try:
+                tools = await asyncio.wait_for(self.session_pool.alist_tools(name), self.discovery_timeout)
+                self.catalog.put(name, [to_tool_schema(t) for t in tools])
+                return True
+            except Exception as e:
+                logging.warning(f"⚠️ MCP Manager: Discovery failed for '{name}': {e or type(e).__name__}")
+                return False
+
+        logging.info(f"🔍 MCP Manager: Discovering tools on {', '.join(server_names)}...")
+        results = await asyncio.gather(*(discover_one(name) for name in server_names))
+        if any(results):
+            try:
+                self.catalog.save()
+            except Exception as e:
+                logging.warning(f"⚠️ MCP Manager: Could not save tool catalog: {e}")
+        self._rebuild_routes()
+        logging.info(f"✅ MCP Manager: Discovered {sum(results)}/{len(server_names)} servers. {len(self.tools)} external tools available.")
+
+    def _rebuild_routes(self):
+        """Builds the tool name -> (server, MCP name) index from catalog + fallbacks."""
+        per_server = {}
+        for name in self.servers:
+            tools = self.catalog.get(name)
+            if tools is None:
+                tools = FALLBACK_TOOLS.get(name, [])
+            per_server[name] = tools
+
+        # Names offered by more than one server get a server prefix.
+        counts: Dict[str, int] = {}
+        for tools in per_server.values():
+            for tool in tools:
+                counts[tool["name"]] = counts.get(tool["name"], 0) + 1
+
+        routes: Dict[str, Tuple[str, str]] = {}
+        exposed_tools = []
+        for server, tools in per_server.items():
+            for tool in tools:
+                actual_name = tool["name"]
+                exposed_name = TOOL_ALIASES.get((server, actual_name))
+                if not exposed_name:
+                    exposed_name = f"{server}_{actual_name}" if counts[actual_name] > 1 else actual_name
+                if exposed_name in self.internal_tools or exposed_name in routes:
+                    continue  # Internal handlers always win
+                routes[exposed_name] = (server, actual_name)
+                exposed_tools.append({**tool, "name": exposed_name})
+
+        # Swap in whole objects so concurrent readers never see a half-built index.
+        self.tool_routes = routes
+        self.tools = exposed_tools
+
+    def _is_idempotent(self, tool_name: str) -> bool:
+        """Tools with a result-cache TTL are pure lookups, so they may be resent after a transport failure."""
+        return tool_name in self.result_cache.ttls
+
+    def call_tool(self, server_name, tool_name, arguments, idempotent=False):
         """
-        Executes a tool on the specified server using a temporary subprocess.
-        Note: This is a 'stateless' call. Long-lived sessions would require keeping the process open.
+        Executes a tool on the specified server through the persistent session pool.
+        The first call to a server pays the launcher start + initialize handshake;
+        every call after that is a single JSON-RPC round trip.
+        Safe to call from many threads at once: requests to the same server are
+        multiplexed on one session and matched back by JSON-RPC request ID.
         """
         command = self.servers.get(server_name)
         if not command:
             return f"Error: Server '{server_name}' not configured."
 
         logging.info(f"🔌 MCP Call: {server_name} -> {tool_name}({arguments})")
-        
+        self._fill_required_arguments(tool_name, arguments)
+
+        try:
+            return self.session_pool.call_tool(server_name, tool_name, arguments, idempotent)
+        except (MCPSessionError, MCPRemoteError) as e:
+            logging.error(f"❌ Tool Execution Failed: {e}")
+            return f"Tool Execution Failed: {e}"
+        except Exception as e:
+            logging.error(f"❌ MCP Error: {e}")
+            return f"Error: {e}"
+
+    async def acall_tool(self, server_name, tool_name, arguments, idempotent=False):
+        """call_tool() as a coroutine; awaits the pooled session's response from any event loop."""
+        if server_name not in self.servers:
+            return f"Error: Server '{server_name}' not configured."
+
+        logging.info(f"🔌 MCP Call: {server_name} -> {tool_name}({arguments})")
+        self._fill_required_arguments(tool_name, arguments)
+
+        try:
+            return await asyncio.wrap_future(self.session_pool.submit_tool(server_name, tool_name, arguments, idempotent))
+        except (MCPSessionError, MCPRemoteError) as e:
+            logging.error(f"❌ Tool Execution Failed: {e}")
+            return f"Tool Execution Failed: {e}"
+        except Exception as e:
+            logging.error(f"❌ MCP Error: {e}")
+            return f"Error: {e}"
+
+    def _fill_required_arguments(self, tool_name, arguments):
         # FAILSAFE: Ensure create_note has a title
         if tool_name == "create_note" and isinstance(arguments, dict):
             if not arguments.get("title"):
@@ -306,70 +357,12 @@ class MCPManager:
             if "content" not in arguments:
                 arguments["content"] = ""
                 logging.warning("🛡️ MCP Manager: Auto-filled empty content")
-        
-        # We need to construct a JSON-RPC request
-        # Since we are using 'docker run', we can't easily keep the connection open in this simple implementation.
-        # However, MCP servers usually expect an 'initialize' handshake.
-        # A full client is complex. 
-        
-        # ALTERNATIVE: Use 'claude code' as a subprocess? No, that requires auth.
-        
-        # Let's try to run a simple python script that uses the 'mcp' library to make ONE call.
-        # We can generate a temporary script to execute the call.
-        
-        try:
-            # Create a temp script to run the tool
-            script_content = f"""
-import asyncio
-import os
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-
-async def run():
-    server_params = StdioServerParameters(
-        command="{command[0]}",
-        args=[],
-        env=os.environ
-    )
-    
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            result = await session.call_tool("{tool_name}", {arguments})
-            print(result.content[0].text)
-
-if __name__ == "__main__":
-    asyncio.run(run())
-"""
-            temp_script = "/tmp/mcp_call.py"
-            with open(temp_script, "w") as f:
-                f.write(script_content)
-                
-            # Run it
-            # Capture ONLY stdout to get the clean JSON result.
-            # Stderr will contain logs from the server/docker, which we don't want in the result.
-            process = subprocess.run(["python3", temp_script], capture_output=True, text=True, check=True)
-            return process.stdout
-            
-        except subprocess.CalledProcessError as e:
-            error_output = e.stderr # Capture stderr for the error message
-            logging.error(f"❌ Tool Execution Failed: {error_output}")
-            return f"Tool Execution Failed: {error_output}"
-        except Exception as e:
-            logging.error(f"❌ MCP Error: {e}")
-            return f"Error: {e}"
+
+    def shutdown(self):
+        """Closes all pooled MCP sessions."""
+        self._parallel_executor.shutdown(wait=False)
+        self.session_pool.close_all()
 
     def get_server_for_tool(self, tool_name):
-        # Map tools to servers (Simple mapping for now)
-        if "container" in tool_name or "docker" in tool_name: return "docker"
-        if "brave" in tool_name: return "brave"
-        if "duckduckgo" in tool_name: return "duckduckgo"
-        if "wikipedia" in tool_name: return "wikipedia"
-        if "paper" in tool_name: return "paper_search"
-        if "playwright" in tool_name: return "playwright"
-        if "database" in tool_name or "sql" in tool_name or "table" in tool_name: return "sqlite"
-        if "github" in tool_name or "repo" in tool_name: return "github"
-        if "file" in tool_name: return "filesystem"
-        if "transcript" in tool_name or "youtube" in tool_name: return "youtube"
-        if "note" in tool_name or "obsidian" in tool_name: return "obsidian"
-        return None
+        route = self.tool_routes.get(tool_name)
+        return route[0] if route else None
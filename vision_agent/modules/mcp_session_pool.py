@@ -0,0 +1,396 @@
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "jarvis", "version": "1.0"}
+STREAM_LIMIT = 16 * 1024 * 1024  # Transcripts and page dumps arrive as a single JSON line
+# Methods that are safe to resend on a fresh session after the transport dies.
+RETRYABLE_METHODS = {"tools/list", "ping"}
+
+
+class MCPSessionError(Exception):
+    """Raised when an MCP session dies or times out (the session should be restarted)."""
+
+
+class MCPTimeoutError(MCPSessionError):
+    """Raised when a single request times out. The session stays up and its other requests are unaffected."""
+
+
+class MCPRemoteError(Exception):
+    """Raised when the server answers with a JSON-RPC error (the session is still healthy)."""
+
+
+class MCPEventLoop:
+    """
+    A dedicated asyncio loop running in a daemon thread.
+    All MCP I/O happens here, so synchronous callers (agent threads, the FastAPI
+    threadpool) never need their own loop or interpreter.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="mcp-event-loop", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls) -> "MCPEventLoop":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = MCPEventLoop()
+            return cls._instance
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedules a coroutine on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Runs a coroutine on the loop and blocks the calling thread for its result."""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("MCPEventLoop.run() called from the loop thread; await the coroutine instead.")
+        return self.submit(coro).result(timeout)
+
+
+class MCPSession:
+    """
+    A long-lived stdio connection to one MCP server.
+    Speaks newline-delimited JSON-RPC 2.0 and multiplexes any number of
+    outstanding requests, matching responses back to callers by request ID.
+    Must only be used from the MCPEventLoop thread.
+    """
+
+    def __init__(self, name: str, command: List[str], timeout: float = 60.0):
+        self.name = name
+        self.command = command
+        self.timeout = timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.last_used = 0.0
+        self.server_info: Dict[str, Any] = {}
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._stderr_tail = deque(maxlen=50)
+        self._tasks: List[asyncio.Task] = []
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Spawns the server process and performs the MCP initialize handshake."""
+        logging.info(f"🔌 MCP Pool: Starting session '{self.name}' ({self.command[0]})")
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=os.environ.copy(),
+            limit=STREAM_LIMIT,
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_stdout(self.process)),
+            asyncio.create_task(self._read_stderr(self.process)),
+        ]
+
+        result = await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO,
+        })
+        self.server_info = result.get("serverInfo", {})
+        self.last_used = time.time()
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        logging.info(f"✅ MCP Pool: Session '{self.name}' ready ({self.server_info.get('name', 'unknown server')})")
+
+    async def close(self):
+        """Terminates the server process and fails any requests still in flight."""
+        process, self.process = self.process, None
+        self._fail_pending(MCPSessionError(f"Session '{self.name}' closed."))
+        if not process:
+            return
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+        if process.returncode is None:
+            try:
+                process.terminate()
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except Exception:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+        for task in self._tasks:
+            task.cancel()
+        logging.info(f"🔌 MCP Pool: Closed session '{self.name}'")
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None and not self.process.stdout.at_eof()
+
+    def stderr_tail(self) -> str:
+        return "\n".join(self._stderr_tail)
+
+    # --- JSON-RPC ---
+
+    async def request(self, method: str, params: Dict[str, Any] = None, timeout: float = None) -> Dict[str, Any]:
+        """Sends a request and waits for the response carrying the same ID."""
+        if not self.is_alive():
+            raise MCPSessionError(f"Session '{self.name}' is not running. {self.stderr_tail()}")
+
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+
+        try:
+            await self._send(message)
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # Other requests on this session are unaffected; a late reply is simply dropped.
+            raise MCPTimeoutError(f"Timed out waiting for '{method}' on '{self.name}'")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _send(self, message: Dict[str, Any]):
+        try:
+            self.process.stdin.write((json.dumps(message) + "\n").encode())
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError, OSError, AttributeError) as e:
+            raise MCPSessionError(f"Failed to write to '{self.name}': {e}")
+
+    async def _handle_server_message(self, message: Dict[str, Any]):
+        """Answers server-initiated requests; notifications are only logged."""
+        if "id" not in message:
+            logging.debug(f"MCP Notification ({self.name}): {message.get('method')}")
+            return
+        if message["method"] == "ping":
+            await self._send({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+        else:
+            await self._send({
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": -32601, "message": f"Method not supported: {message['method']}"},
+            })
+
+    def _dispatch_response(self, message: Dict[str, Any]):
+        future = self._pending.get(message.get("id"))
+        if future is None or future.done():
+            logging.warning(f"⚠️ MCP Pool: Dropping stale response {message.get('id')} on '{self.name}'")
+            return
+        if "error" in message:
+            error = message["error"]
+            future.set_exception(MCPRemoteError(f"{error.get('message', 'Unknown error')} (code {error.get('code')})"))
+        else:
+            future.set_result(message.get("result", {}))
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _read_stdout(self, process: asyncio.subprocess.Process):
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    # Some launchers print banners on stdout before the server starts.
+                    logging.debug(f"MCP Non-JSON Output ({self.name}): {line[:200]}")
+                    continue
+                if "method" in message:
+                    await self._handle_server_message(message)
+                else:
+                    self._dispatch_response(message)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logging.error(f"❌ MCP Pool: Reader for '{self.name}' crashed: {e}")
+        self._fail_pending(MCPSessionError(f"Session '{self.name}' exited. {self.stderr_tail()}"))
+
+    async def _read_stderr(self, process: asyncio.subprocess.Process):
+        try:
+            while True:
+                line = await process.stderr.readline()
+                if not line:
+                    break
+                self._stderr_tail.append(line.decode(errors="replace").rstrip())
+        except asyncio.CancelledError:
+            return
+
+
+class MCPSessionPool:
+    """
+    Keeps one warm MCP session per configured server.
+    Sessions start lazily on first use, are restarted automatically when they die,
+    and are reaped after `idle_timeout` seconds without traffic.
+
+    Coroutine methods (`acall_tool`, `arequest`) run on the shared MCPEventLoop;
+    the plain methods are thread-safe blocking wrappers around them, so many
+    threads can have calls outstanding on the same server at once.
+    """
+
+    def __init__(self, servers: Dict[str, List[str]], idle_timeout: float = 600, health_interval: float = 60, call_timeout: float = 60):
+        self.servers = servers
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.call_timeout = call_timeout
+        self.sessions: Dict[str, MCPSession] = {}
+        self.event_loop = MCPEventLoop.get()
+        self._start_locks: Dict[str, asyncio.Lock] = {}
+        self._reaper = self.event_loop.submit(self._reap_loop())
+        atexit.register(self.close_all)
+
+    # --- Async API (MCPEventLoop thread) ---
+
+    async def get_session(self, server_name: str) -> MCPSession:
+        """Returns a live session for the server, starting (or restarting) it if needed."""
+        command = self.servers.get(server_name)
+        if not command:
+            raise MCPSessionError(f"Server '{server_name}' not configured.")
+
+        # Per-server lock so a slow docker start doesn't block other servers,
+        # and concurrent first calls share a single start.
+        start_lock = self._start_locks.setdefault(server_name, asyncio.Lock())
+        async with start_lock:
+            session = self.sessions.get(server_name)
+            if session and session.is_alive():
+                return session
+            if session:
+                logging.warning(f"⚠️ MCP Pool: Session '{server_name}' died. Restarting...")
+                await session.close()
+
+            session = MCPSession(server_name, command, timeout=self.call_timeout)
+            try:
+                await session.start()
+            except Exception:
+                await session.close()
+                raise
+            self.sessions[server_name] = session
+            return session
+
+    async def arequest(self, server_name: str, method: str, params: Dict[str, Any] = None, retry: bool = None) -> Dict[str, Any]:
+        """
+        Sends a request. A timeout (MCPTimeoutError) is raised as-is: the session
+        stays up for everyone else and nothing is resent. If the transport itself
+        died, the session is replaced, and the request is resent once only when
+        `retry` is set (default: the RETRYABLE_METHODS), so side-effecting tool
+        calls never run twice.
+        """
+        if retry is None:
+            retry = method in RETRYABLE_METHODS
+        session = await self.get_session(server_name)
+        try:
+            session.last_used = time.time()
+            return await session.request(method, params)
+        except MCPTimeoutError:
+            raise
+        except MCPSessionError as e:
+            if self.sessions.get(server_name) is session:
+                await self.aclose_session(server_name)
+            if not retry:
+                raise
+            logging.warning(f"⚠️ MCP Pool: {server_name}.{method} failed ({e}). Retrying on a fresh session...")
+            session = await self.get_session(server_name)
+            session.last_used = time.time()
+            return await session.request(method, params)
+
+    async def acall_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any], idempotent: bool = False) -> str:
+        """Calls a tool and flattens its text content into a single string. Only idempotent calls are retried."""
+        result = await self.arequest(server_name, "tools/call", {"name": tool_name, "arguments": arguments or {}},
+                                     retry=idempotent)
+        text = "\n".join(
+            item.get("text", "") for item in result.get("content", []) if item.get("type") == "text"
+        )
+        if result.get("isError"):
+            return f"Tool Execution Failed: {text}"
+        return text
+
+    async def alist_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        result = await self.arequest(server_name, "tools/list")
+        return result.get("tools", [])
+
+    async def aclose_session(self, server_name: str):
+        session = self.sessions.pop(server_name, None)
+        if session:
+            await session.close()
+
+    # --- Blocking API (any thread) ---
+
+    def request(self, server_name: str, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        return self.event_loop.run(self.arequest(server_name, method, params))
+
+    def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any], idempotent: bool = False) -> str:
+        return self.event_loop.run(self.acall_tool(server_name, tool_name, arguments, idempotent))
+
+    def submit_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any], idempotent: bool = False) -> concurrent.futures.Future:
+        """Starts a tool call without waiting for it."""
+        return self.event_loop.submit(self.acall_tool(server_name, tool_name, arguments, idempotent))
+
+    def list_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        return self.event_loop.run(self.alist_tools(server_name))
+
+    def close_session(self, server_name: str):
+        self.event_loop.run(self.aclose_session(server_name))
+
+    def close_all(self):
+        self._reaper.cancel()
+        if not self.event_loop.loop.is_running():
+            return
+
+        async def _close_all():
+            for name in list(self.sessions):
+                await self.aclose_session(name)
+
+        try:
+            self.event_loop.run(_close_all(), timeout=10)
+        except Exception as e:
+            logging.warning(f"⚠️ MCP Pool: Shutdown incomplete: {e}")
+
+    async def _reap_loop(self):
+        """Closes idle sessions and pings quiet ones so dead servers are noticed early."""
+        while True:
+            await asyncio.sleep(min(self.health_interval, self.idle_timeout) / 2)
+            now = time.time()
+            for name, session in list(self.sessions.items()):
+                idle = now - session.last_used
+                if idle > self.idle_timeout and not session._pending:
+                    logging.info(f"💤 MCP Pool: Reaping idle session '{name}' ({int(idle)}s idle)")
+                    await self.aclose_session(name)
+                elif idle > self.health_interval:
+                    try:
+                        await session.request("ping", timeout=10)
+                    except MCPRemoteError:
+                        pass  # Server doesn't implement ping, but it answered
+                    except MCPTimeoutError as e:
+                        # Busy, not necessarily dead: only restart a session nobody is waiting on
+                        if session._pending:
+                            logging.warning(f"⚠️ MCP Pool: '{name}' slow to answer ping with {len(session._pending)} requests in flight: {e}")
+                        else:
+                            logging.warning(f"⚠️ MCP Pool: Health check timed out for idle '{name}': {e}")
+                            await self.aclose_session(name)
+                    except MCPSessionError as e:
+                        logging.warning(f"⚠️ MCP Pool: Health check failed for '{name}': {e}")
+                        await self.aclose_session(name)
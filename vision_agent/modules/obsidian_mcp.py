@@ -1,12 +1,15 @@
 import os
 import logging
 from typing import List, Dict, Any
+from vision_agent.modules.vault_index import VaultIndex
 
 class ObsidianMCP:
     def __init__(self, vault_path: str = "/mnt/fast_data/projects/vision_agent/obsidian_vault"):
         self.vault_path = vault_path
         if not os.path.exists(self.vault_path):
             os.makedirs(self.vault_path)
+        # Full-text index + title map, kept current incrementally
+        self.index = VaultIndex(self.vault_path)
         logging.info(f"📓 Obsidian MCP initialized at {self.vault_path}")
 
     def create_note(self, title: str, content: str, folder: str = "") -> str:
@@ -29,6 +32,7 @@ class ObsidianMCP:
                 
             with open(file_path, "w") as f:
                 f.write(content)
+            self.index.update_file(file_path)
                 
             return f"Successfully created note: {filename}"
         except Exception as e:
@@ -37,59 +41,37 @@ class ObsidianMCP:
     def read_note(self, title: str) -> str:
         """Reads the content of a note from the Obsidian Vault."""
         try:
-            # Simple recursive search
-            for root, dirs, files in os.walk(self.vault_path):
-                for file in files:
-                    if file.lower() == f"{title.lower()}.md" or title.lower() in file.lower():
-                        path = os.path.join(root, file)
-                        with open(path, "r") as f:
-                            return f.read()
-                            
-            return f"Error: Note '{title}' not found."
+            path = self.index.find(title)
+            if not path:
+                return f"Error: Note '{title}' not found."
+
+            with open(path, "r") as f:
+                return f.read()
         except Exception as e:
             return f"Error reading note: {str(e)}"
 
     def search_notes(self, query: str) -> str:
-        """Searches for notes containing the query string."""
+        """Searches for notes containing the query string (ranked, with snippets)."""
         try:
-            results = []
-            for root, dirs, files in os.walk(self.vault_path):
-                for file in files:
-                    if not file.endswith(".md"): continue
-                    
-                    path = os.path.join(root, file)
-                    try:
-                        with open(path, "r") as f:
-                            content = f.read()
-                            if query.lower() in content.lower() or query.lower() in file.lower():
-                                results.append(file)
-                    except:
-                        continue
-                        
+            results = self.index.search(query, limit=10)
             if not results:
                 return "No notes found matching query."
-                
-            return f"Found {len(results)} notes:\n" + "\n".join(results[:10])
+
+            lines = [f"{os.path.basename(r['path'])}: {r['snippet']}" for r in results]
+            return f"Found {len(results)} notes:\n" + "\n".join(lines)
         except Exception as e:
             return f"Error searching notes: {str(e)}"
 
     def append_to_note(self, title: str, content: str) -> str:
         """Appends content to an existing note."""
         try:
-            # Simple recursive search
-            target_path = None
-            for root, dirs, files in os.walk(self.vault_path):
-                for file in files:
-                    if file.lower() == f"{title.lower()}.md":
-                        target_path = os.path.join(root, file)
-                        break
-                if target_path: break
-                
+            target_path = self.index.find(title, fuzzy=False)
             if not target_path:
                 return f"Error: Note '{title}' not found."
                 
             with open(target_path, "a") as f:
                 f.write("\n" + content)
+            self.index.update_file(target_path)
                 
             return f"Successfully appended to {title}."
         except Exception as e:
@@ -98,24 +80,18 @@ class ObsidianMCP:
     def delete_note(self, title: str) -> str:
         """Deletes a note from the Obsidian Vault."""
         try:
-            # Simple recursive search
-            target_path = None
-            for root, dirs, files in os.walk(self.vault_path):
-                for file in files:
-                    if file.lower() == f"{title.lower()}.md" or title.lower() in file.lower():
-                        target_path = os.path.join(root, file)
-                        break
-                if target_path: break
-                
+            target_path = self.index.find(title)
             if not target_path:
                 return f"Error: Note '{title}' not found."
                 
             os.remove(target_path)
+            self.index.remove_file(target_path)
             return f"Successfully deleted note: {os.path.basename(target_path)}"
         except Exception as e:
             return f"Error deleting note: {str(e)}"
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def get_tools() -> List[Dict[str, Any]]:
         """Return the list of tools provided by this MCP."""
         return [
             {
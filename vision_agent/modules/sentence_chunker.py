@@ -0,0 +1,58 @@
+import re
+from typing import List
+
+# Common abbreviations that end in a period but don't end a sentence.
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+# Either terminal punctuation followed by whitespace, or a paragraph break
+# (lists and headings often end without punctuation).
+SENTENCE_END = re.compile(r'([.!?…]+["\')\]]*)(\s+)|(\n\s*\n)')
+
+
+class SentenceChunker:
+    """
+    Splits a token stream into speakable sentences as soon as they are complete.
+    Very short sentences ("Sure.") are held back and merged with the next one,
+    so TTS doesn't get a burst of tiny clips.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Adds streamed text and returns any sentences it completed."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            is_paragraph = match.group(3) is not None or "\n\n" in (match.group(2) or "").replace(" ", "")
+            end = match.start(3) if match.group(3) is not None else match.end(1)
+            candidate = self.buffer[start:end].strip()
+            if not is_paragraph and (self._ends_with_abbreviation(candidate) or len(candidate) < self.min_chars):
+                continue
+            if candidate:
+                sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Returns whatever is left once the stream ends."""
+        remainder, self.buffer = self.buffer.strip(), ""
+        return [remainder] if remainder else []
+
+    @staticmethod
+    def _ends_with_abbreviation(candidate: str) -> bool:
+        words = candidate.rstrip('"\')]').rstrip(".").split()
+        if not words:
+            return False
+        last = words[-1].lower()
+        # "3." in "Step 3. Do X" or decimals split by the tokenizer
+        return last in ABBREVIATIONS or (len(last) == 1 and last.isalpha()) or last.isdigit()
+
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Splits a complete text into the same chunks a stream would produce."""
+    chunker = SentenceChunker(min_chars=min_chars)
+    return chunker.feed(text + " ") + chunker.flush()
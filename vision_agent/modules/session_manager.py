@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Any, Iterator, Optional
+
+SESSION_TTL = 3600      # Idle seconds before a session is dropped
+MAX_SESSIONS = 500
+LOCK_POLL = 0.02        # Seconds between lock attempts for a coroutine waiting on a busy session
+
+_current: ContextVar[Optional["AgentSession"]] = ContextVar("jarvis_session", default=None)
+
+
+def current_session() -> Optional["AgentSession"]:
+    return _current.get()
+
+
+class AgentSession:
+    """Conversation state that belongs to one client; everything heavyweight stays on the shared agent."""
+
+    def __init__(self, session_id: str, chat_model: str = None, chat_history: List[Dict[str, Any]] = None):
+        self.id = session_id
+        self.chat_history: List[Dict[str, Any]] = chat_history if chat_history is not None else []
+        self.chat_model = chat_model
+        self.last_response = None
+        self.last_audio = None
+        self.last_tool_output = None  # Also the intent parser's context for follow-up commands
+        self.last_tool_name = None
+        self.last_seen = time.time()
+        self.lock = threading.Lock()  # Requests within one session run in order
+
+    @contextmanager
+    def activate(self):
+        """Makes this the session that the agent's session attributes resolve to (in this context)."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def run(self, fn, *args, **kwargs):
+        """Calls fn with this session active, serialized against other requests of the same session."""
+        self.last_seen = time.time()
+        with self.lock, self.activate():
+            return fn(*args, **kwargs)
+
+    @asynccontextmanager
+    async def locked(self):
+        """
+        Holds the session lock from a coroutine. Polls it so a busy session never
+        blocks the event loop (and a cancelled request never leaves it acquired).
+        """
+        self.last_seen = time.time()
+        while not self.lock.acquire(blocking=False):
+            await asyncio.sleep(LOCK_POLL)
+        try:
+            yield self
+        finally:
+            self.lock.release()
+
+    async def arun(self, fn, *args, **kwargs):
+        """run() for coroutine functions; shares the same lock."""
+        async with self.locked():
+            with self.activate():
+                return await fn(*args, **kwargs)
+
+    def bind(self, iterator: Iterator) -> Iterator:
+        """
+        Advances a generator with this session active at every step (each step may
+        run on a different thread). Doesn't take the lock; hold locked() around it.
+        """
+        while True:
+            self.last_seen = time.time()
+            with self.activate():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+class SessionAttribute:
+    """
+    Agent attribute stored on the current session instead of the agent, so
+    existing `self.chat_history`-style code is per-client without changes.
+    Outside any session (local voice mode) it resolves to the agent's default session.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _session(self, agent) -> AgentSession:
+        return current_session() or agent.default_session
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        return getattr(self._session(agent), self.name)
+
+    def __set__(self, agent, value):
+        setattr(self._session(agent), self.name, value)
+
+
+class SessionManager:
+    """Creates, looks up and expires sessions for the API server."""
+
+    def __init__(self, agent, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.agent = agent
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, AgentSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str = None) -> AgentSession:
+        """The session for this ID, created empty if unknown or expired."""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                # Only the model choice carries over: the default session's history
+                # belongs to the local voice user and must not leak to API clients.
+                session = AgentSession(session_id or secrets.token_urlsafe(12), chat_model=self.agent.default_session.chat_model)
+                self._sessions[session.id] = session
+                logging.info(f"👤 Session Manager: New session {session.id} ({len(self._sessions)} active)")
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session.id)
+            session.last_seen = time.time()
+            return session
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_seen > cutoff:
+                break
+            del self._sessions[session_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"active": len(self._sessions), "ttl": self.ttl}
@@ -0,0 +1,321 @@
+import array
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+import pyaudio
+
+from vision_agent.modules.alsa_utils import no_alsa_error
+
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+FALLBACK_RATES = (48000, 32000, 8000)  # Also accepted by webrtcvad, tried before the device default
+VAD_RATES = {8000, 16000, 32000, 48000}  # The only rates webrtcvad accepts
+FRAME_MS = 30           # webrtcvad accepts 10/20/30 ms frames
+PAUSE_SECONDS = 1.0     # Silence that ends an utterance
+PREROLL_MS = 300        # Audio kept from before speech onset so first syllables aren't clipped
+MAX_PHRASE_SECONDS = 20
+MIN_SPEECH_MS = 150     # Shorter bursts (clicks, bumps) are ignored
+
+
+def _rms(frame: bytes) -> float:
+    samples = array.array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+# --- Voice activity detection ---
+
+class EnergyVAD:
+    """
+    Energy threshold over a continuously updated ambient-noise floor. The floor
+    tracks silence with an exponential moving average, replacing a fixed
+    adjust_for_ambient_noise() pass before every utterance.
+    """
+
+    def __init__(self, ratio: float = 2.5, min_energy: float = 200.0, adapt_rate: float = 0.05):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt_rate = adapt_rate
+        self.noise_floor: Optional[float] = None
+
+    def is_speech(self, frame: bytes, rate: int) -> bool:
+        energy = _rms(frame)
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        speech = energy > max(self.min_energy, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+        return speech
+
+
+class WebRTCVAD:
+    """webrtcvad's GMM classifier, gated by the energy floor so steady hum never counts as speech."""
+
+    def __init__(self, aggressiveness: int = 2):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.energy = EnergyVAD(ratio=1.5)
+
+    @property
+    def noise_floor(self):
+        return self.energy.noise_floor
+
+    def is_speech(self, frame: bytes, rate: int) -> bool:
+        loud = self.energy.is_speech(frame, rate)
+        return loud and self.vad.is_speech(frame, rate)
+
+
+def load_vad():
+    return WebRTCVAD() if WEBRTCVAD_AVAILABLE else EnergyVAD()
+
+
+# --- Recognizer backends ---
+
+class RecognizerBackend:
+    """
+    Speech-to-text backend. accept() is called for each frame while the user is
+    speaking, so streaming backends can decode as audio arrives and finish()
+    only has to flush; batch backends just buffer and transcribe at the end.
+    """
+    name = "base"
+    offline = True
+
+    def begin(self, rate: int):
+        self.rate = rate
+        self._frames: List[bytes] = []
+
+    def accept(self, frame: bytes):
+        self._frames.append(frame)
+
+    def finish(self) -> str:
+        return self.transcribe(b"".join(self._frames), self.rate)
+
+    def transcribe(self, pcm: bytes, rate: int) -> str:
+        raise NotImplementedError
+
+
+class VoskBackend(RecognizerBackend):
+    name = "vosk"
+
+    def __init__(self, model_path: str = None):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path or os.getenv("JARVIS_VOSK_MODEL", os.path.expanduser("~/.cache/jarvis/vosk-model")))
+
+    def begin(self, rate: int):
+        self.rate = rate
+        self._recognizer = self._vosk.KaldiRecognizer(self.model, rate)
+
+    def accept(self, frame: bytes):
+        self._recognizer.AcceptWaveform(frame)
+
+    def finish(self) -> str:
+        return json.loads(self._recognizer.FinalResult()).get("text", "")
+
+
+class WhisperBackend(RecognizerBackend):
+    name = "whisper"
+
+    def __init__(self, model_size: str = None):
+        import numpy as np
+        from faster_whisper import WhisperModel
+        self._np = np
+        self.model = WhisperModel(model_size or os.getenv("JARVIS_WHISPER_MODEL", "base.en"), device="auto", compute_type="int8")
+
+    def transcribe(self, pcm: bytes, rate: int) -> str:
+        audio = self._np.frombuffer(pcm, dtype=self._np.int16).astype(self._np.float32) / 32768.0
+        if rate != SAMPLE_RATE:
+            positions = self._np.linspace(0, len(audio) - 1, int(len(audio) * SAMPLE_RATE / rate))
+            audio = self._np.interp(positions, self._np.arange(len(audio)), audio).astype(self._np.float32)
+        segments, _ = self.model.transcribe(audio, beam_size=1, language="en", vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+class GoogleBackend(RecognizerBackend):
+    """The previous behaviour (network round-trip); used only when no offline engine is installed."""
+    name = "google"
+    offline = False
+
+    def __init__(self):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm: bytes, rate: int) -> str:
+        try:
+            return self.recognizer.recognize_google(self._sr.AudioData(pcm, rate, 2))
+        except self._sr.UnknownValueError:
+            return ""
+
+
+BACKENDS = {"vosk": VoskBackend, "whisper": WhisperBackend, "google": GoogleBackend}
+
+
+def load_recognizer(name: str = None) -> RecognizerBackend:
+    """JARVIS_STT_BACKEND picks one explicitly; otherwise the first offline engine that loads wins."""
+    name = name or os.getenv("JARVIS_STT_BACKEND")
+    order = [name] if name else ["vosk", "whisper", "google"]
+    for candidate in order:
+        try:
+            backend = BACKENDS[candidate]()
+            logging.info(f"🎙️ Speech Stream: Using {candidate} recognizer.")
+            return backend
+        except Exception as e:
+            logging.warning(f"⚠️ Speech Stream: {candidate} recognizer unavailable ({e}).")
+    raise RuntimeError("No speech recognizer backend available")
+
+
+# --- Capture ---
+
+class SpeechStream:
+    """
+    Persistent microphone stream with local end-of-utterance detection.
+
+    The device is opened once; a PyAudio callback pushes fixed-size frames into
+    a bounded queue. listen() runs the VAD over those frames, keeping a short
+    pre-roll ring so speech onset isn't clipped, feeds speech frames to the
+    recognizer as they arrive, and returns the transcript as soon as
+    PAUSE_SECONDS of silence follow the utterance. pause()/resume() drop audio
+    while the agent itself is talking.
+    """
+
+    def __init__(self, device_index: int = None, recognizer: RecognizerBackend = None, vad=None,
+                 pause_seconds: float = PAUSE_SECONDS, max_phrase_seconds: float = MAX_PHRASE_SECONDS):
+        self.device_index = device_index
+        self.recognizer = recognizer or load_recognizer()
+        self.vad = vad or load_vad()
+        self.pause_seconds = pause_seconds
+        self.max_phrase_seconds = max_phrase_seconds
+        self._frames: "queue.Queue" = queue.Queue(maxsize=int(60_000 / FRAME_MS))  # ~1 minute of audio
+        self._paused = threading.Event()
+        self._pa = None
+        self._stream = None
+        self.rate = SAMPLE_RATE
+        self.last_latency = None  # Seconds from end of speech to transcript
+
+    def _open(self):
+        with no_alsa_error():
+            self._pa = pyaudio.PyAudio()
+            rates = [SAMPLE_RATE, *FALLBACK_RATES]
+            if self.device_index is not None:
+                default_rate = int(self._pa.get_device_info_by_index(self.device_index)["defaultSampleRate"])
+                if default_rate not in rates:
+                    rates.append(default_rate)
+            last_error = None
+            for rate in rates:
+                try:
+                    self._stream = self._pa.open(
+                        format=pyaudio.paInt16, channels=1, rate=rate, input=True,
+                        input_device_index=self.device_index,
+                        frames_per_buffer=rate * FRAME_MS // 1000,
+                        stream_callback=self._on_audio,
+                    )
+                    self.rate = rate
+                    break
+                except OSError as e:
+                    last_error = e
+            else:
+                self._pa.terminate()
+                self._pa = None
+                raise last_error
+        logging.info(f"🎙️ Speech Stream: Microphone open at {self.rate} Hz.")
+        if isinstance(self.vad, WebRTCVAD) and self.rate not in VAD_RATES:
+            # webrtcvad would raise on every frame at e.g. 44.1 kHz
+            logging.warning(f"⚠️ Speech Stream: webrtcvad doesn't support {self.rate} Hz. Using the energy VAD.")
+            self.vad = EnergyVAD()
+
+    def _on_audio(self, data, frame_count, time_info, status):
+        if not self._paused.is_set():
+            try:
+                self._frames.put_nowait(data)
+            except queue.Full:
+                pass  # Nobody is listening; newer audio is dropped until listen() drains
+        return (None, pyaudio.paContinue)
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        """Resumes capture, discarding anything buffered before the pause."""
+        self.drain()
+        self._paused.clear()
+
+    def drain(self):
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                return
+
+    def listen(self, timeout: float = 5.0) -> str:
+        """Blocks until an utterance is transcribed, or returns "" if no speech starts within timeout."""
+        if self._stream is None:
+            self._open()
+
+        frame_seconds = FRAME_MS / 1000
+        preroll: deque = deque(maxlen=max(1, PREROLL_MS // FRAME_MS))
+        silence_limit = int(self.pause_seconds / frame_seconds)
+        min_speech = max(1, MIN_SPEECH_MS // FRAME_MS)
+        max_frames = int(self.max_phrase_seconds / frame_seconds)
+
+        deadline = time.time() + timeout
+        speech_frames = silent_frames = total_frames = 0
+        in_speech = False
+
+        while True:
+            try:
+                frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                if not in_speech and time.time() > deadline:
+                    return ""
+                continue
+
+            is_speech = self.vad.is_speech(frame, self.rate)
+            if not in_speech:
+                preroll.append(frame)
+                if is_speech:
+                    speech_frames += 1
+                    if speech_frames >= min_speech:
+                        in_speech = True
+                        self.recognizer.begin(self.rate)
+                        for buffered in preroll:
+                            self.recognizer.accept(buffered)
+                        total_frames = len(preroll)
+                        preroll.clear()
+                else:
+                    speech_frames = 0
+                    if time.time() > deadline:
+                        return ""
+                continue
+
+            self.recognizer.accept(frame)
+            total_frames += 1
+            silent_frames = 0 if is_speech else silent_frames + 1
+            if silent_frames >= silence_limit or total_frames >= max_frames:
+                ended = time.time()
+                text = self.recognizer.finish().strip()
+                self.last_latency = time.time() - ended
+                logging.info(f"🎙️ Speech Stream: Transcribed in {self.last_latency * 1000:.0f} ms ({self.recognizer.name}).")
+                return text
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
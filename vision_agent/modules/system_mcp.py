@@ -25,7 +25,8 @@ class SystemMCP:
         except Exception as e:
             return f"Error getting stats: {e}"
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def get_tools() -> List[Dict[str, Any]]:
         return [
             {
                 "name": "get_system_stats",
@@ -1,5 +1,5 @@
 import logging
-import ollama
+from vision_agent.modules import llm_gateway
 import subprocess
 import json
 from typing import Dict, Any, List
@@ -94,5 +94,5 @@ class SystemRepairAgent:
         OUTPUT FORMAT:
         Markdown. Use code blocks for commands.
         """
-        response = ollama.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
+        response = llm_gateway.chat(model=self.model, messages=[{'role': 'user', 'content': prompt}])
         return response['message']['content']
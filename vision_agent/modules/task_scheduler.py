@@ -0,0 +1,209 @@
+import asyncio
+import atexit
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional
+
+# Highest priority first. Workers always take the most important runnable task.
+PRIORITY_CLASSES = ("interactive", "tool", "background")
+
+# Max tasks of each class running at once. Most tasks end up in an Ollama call,
+# so these also cap how many generations hit the GPU concurrently.
+DEFAULT_LIMITS = {"interactive": 4, "tool": 2, "background": 1}
+
+_current = threading.local()
+
+
+def current_task_cancelled() -> bool:
+    """Lets long-running tasks stop cooperatively after TaskScheduler.cancel()."""
+    task = getattr(_current, "task", None)
+    return bool(task and task.cancel_event.is_set())
+
+
+class _Task:
+    __slots__ = ("name", "priority", "fn", "args", "kwargs", "future", "cancel_event", "submitted_at", "context")
+
+    def __init__(self, name, priority, fn, args, kwargs):
+        self.name = name
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.perf_counter()
+        self.context = contextvars.copy_context()  # Tasks see the submitter's context vars (e.g. the active session)
+
+
+class _ClassStats:
+    __slots__ = ("completed", "failed", "cancelled", "wait_total", "wait_max", "run_total", "run_max")
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+
+class TaskScheduler:
+    """
+    Central pool for the agent's background work.
+
+    Tasks are queued per priority class and run on a fixed set of worker threads
+    (one per unit of total concurrency). Each class has its own concurrency
+    limit, so a burst of background jobs can't starve interactive requests and a
+    burst of requests can't fan out into dozens of concurrent model calls.
+    submit() returns a Future; queued tasks can be cancelled outright, running
+    ones are asked to stop via current_task_cancelled().
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "TaskScheduler":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.shutdown)
+            return cls._instance
+
+    def __init__(self, limits: Dict[str, int] = None):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._queues = {name: deque() for name in PRIORITY_CLASSES}
+        self._running = {name: 0 for name in PRIORITY_CLASSES}
+        self._stats = {name: _ClassStats() for name in PRIORITY_CLASSES}
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._tasks: Dict[Future, _Task] = {}
+
+        self._workers = []
+        for i in range(sum(self.limits.values())):
+            worker = threading.Thread(target=self._work, daemon=True, name=f"task-worker-{i}")
+            worker.start()
+            self._workers.append(worker)
+        logging.info(f"🧵 Task Scheduler: {len(self._workers)} workers, limits {self.limits}")
+
+    def submit(self, fn: Callable, *args, priority: str = "background", name: str = None, **kwargs) -> Future:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class '{priority}'. Use one of {PRIORITY_CLASSES}.")
+        task = _Task(name or getattr(fn, "__name__", "task"), priority, fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("TaskScheduler is shut down")
+            self._queues[priority].append(task)
+            self._tasks[task.future] = task
+            self._cond.notify()
+        return task.future
+
+    def cancel(self, future: Future) -> bool:
+        """Cancels a queued task, or flags a running one to stop. Returns True if it won't complete normally."""
+        with self._cond:
+            task = self._tasks.get(future)
+        if task is None:
+            return False
+        task.cancel_event.set()
+        return future.cancel() or future.running()
+
+    def _next_task(self) -> Optional[_Task]:
+        """Highest-priority queued task whose class is under its limit (call with the lock held)."""
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue and queue[0].future.cancelled():
+                cancelled = queue.popleft()
+                self._tasks.pop(cancelled.future, None)
+                self._stats[priority].cancelled += 1
+            if queue and self._running[priority] < self.limits[priority]:
+                return queue.popleft()
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    task = self._next_task()
+                self._running[task.priority] += 1
+
+            stats = self._stats[task.priority]
+            started = time.perf_counter()
+            wait = started - task.submitted_at
+            if task.future.set_running_or_notify_cancel():
+                _current.task = task
+                try:
+                    task.future.set_result(task.context.run(task.fn, *task.args, **task.kwargs))
+                    ok = True
+                except BaseException as e:
+                    logging.error(f"❌ Task '{task.name}' ({task.priority}) failed: {e}")
+                    task.future.set_exception(e)
+                    ok = False
+                finally:
+                    _current.task = None
+            else:
+                ok = None
+            elapsed = time.perf_counter() - started
+
+            with self._cond:
+                self._running[task.priority] -= 1
+                self._tasks.pop(task.future, None)
+                if ok is None:
+                    stats.cancelled += 1
+                else:
+                    stats.completed += ok
+                    stats.failed += not ok
+                    stats.wait_total += wait
+                    stats.wait_max = max(stats.wait_max, wait)
+                    stats.run_total += elapsed
+                    stats.run_max = max(stats.run_max, elapsed)
+                self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and latency per priority class."""
+        with self._cond:
+            report = {}
+            for priority in PRIORITY_CLASSES:
+                s = self._stats[priority]
+                finished = s.completed + s.failed
+                report[priority] = {
+                    "queued": len(self._queues[priority]),
+                    "running": self._running[priority],
+                    "limit": self.limits[priority],
+                    "completed": s.completed,
+                    "failed": s.failed,
+                    "cancelled": s.cancelled,
+                    "avg_wait_ms": round(s.wait_total / finished * 1000, 1) if finished else 0.0,
+                    "max_wait_ms": round(s.wait_max * 1000, 1),
+                    "avg_run_ms": round(s.run_total / finished * 1000, 1) if finished else 0.0,
+                    "max_run_ms": round(s.run_max * 1000, 1),
+                }
+            return report
+
+    def shutdown(self, wait: bool = False, cancel_pending: bool = True):
+        with self._cond:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            if cancel_pending:
+                for queue in self._queues.values():
+                    for task in queue:
+                        task.cancel_event.set()
+                        task.future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+def run_async(fn: Callable, *args, priority: str = "interactive", **kwargs) -> "asyncio.Future":
+    """Awaitable for fn(*args) on the shared scheduler: keeps blocking work (sqlite, embeddings) off the event loop."""
+    return asyncio.wrap_future(TaskScheduler.get().submit(fn, *args, priority=priority, **kwargs))
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/jarvis/tool_cache.db")
+
+# Seconds each idempotent tool's result stays valid. Tools not listed are never cached.
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    "duckduckgo_search": 6 * 3600,
+    "brave_web_search": 6 * 3600,
+    "wikipedia_search": 7 * 24 * 3600,
+    "search_papers": 24 * 3600,
+    "search_repositories": 24 * 3600,
+    "get_transcript": 30 * 24 * 3600,  # Transcripts don't change once published
+}
+
+# Results that mean "the call failed" must not be replayed from the cache.
+FAILURE_PREFIXES = ("error", "tool execution failed", "brain freeze")
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        value = re.sub(r"\s+", " ", value.strip())
+        # URLs keep their case (YouTube video IDs are case-sensitive).
+        return value if value.lower().startswith("http") else value.lower()
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize_value(v) for v in value]
+    return value
+
+
+def make_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Builds a stable key from the tool name and whitespace/case-normalized arguments."""
+    normalized = _normalize_value(arguments or {})
+    return f"{tool_name}:{json.dumps(normalized, sort_keys=True, ensure_ascii=False)}"
+
+
+class ToolResultCache:
+    """
+    Two-level cache for idempotent tool results.
+    An in-memory LRU sits in front of a SQLite table so results survive restarts.
+    Both levels are size-bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: str = None, ttls: Dict[str, float] = None, max_memory_entries: int = 256, max_disk_entries: int = 5000):
+        self.path = path or os.getenv("JARVIS_TOOL_CACHE", DEFAULT_CACHE_PATH)
+        self.ttls = dict(DEFAULT_TOOL_TTLS if ttls is None else ttls)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._db = None
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_tool_cache_access ON tool_cache(last_access)")
+            self._db.execute("DELETE FROM tool_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            logging.warning(f"⚠️ Tool Cache: Disk cache unavailable ({e}). Using memory only.")
+            self._db = None
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return tool_name in self.ttls
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        if not self.is_cacheable(tool_name):
+            return None
+        key = make_cache_key(tool_name, arguments)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            if self._db:
+                row = self._db.execute(
+                    "SELECT result, expires_at FROM tool_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row:
+                    self._db.execute("UPDATE tool_cache SET last_access = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._remember(key, row[1], row[0])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], result: Any):
+        if not self.is_cacheable(tool_name) or not isinstance(result, str) or not result.strip():
+            return
+        if result.strip().lower().startswith(FAILURE_PREFIXES):
+            return
+
+        key = make_cache_key(tool_name, arguments)
+        now = time.time()
+        expires_at = now + self.ttls[tool_name]
+
+        with self._lock:
+            self._remember(key, expires_at, result)
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO tool_cache (key, tool, result, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, tool_name, result, expires_at, now),
+                )
+                overflow = self._db.execute("SELECT COUNT(*) FROM tool_cache").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM tool_cache WHERE key IN (SELECT key FROM tool_cache ORDER BY last_access ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self.evictions += overflow
+                self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, result: str):
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db:
+                self._db.execute("DELETE FROM tool_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+        }
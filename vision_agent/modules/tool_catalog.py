@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+DEFAULT_CATALOG_PATH = os.path.expanduser("~/.cache/jarvis/mcp_tool_catalog.json")
+DEFAULT_TTL = 24 * 3600  # Re-discover once a day even if nothing changed
+
+# Some servers expose generic names ("search") that would collide.
+# These keep the names the intent parser and automation prompts already use.
+TOOL_ALIASES: Dict[Tuple[str, str], str] = {
+    ("duckduckgo", "search"): "duckduckgo_search",
+    ("wikipedia", "search"): "wikipedia_search",
+}
+
+# Used when a server has never been discovered (or discovery failed),
+# so routing keeps working on a cold box without docker.
+FALLBACK_TOOLS: Dict[str, List[Dict[str, Any]]] = {
+    "docker": [
+        {
+            "name": "list_containers",
+            "description": "List all docker containers. Returns JSON.",
+            "parameters": {"type": "object", "properties": {"all": {"type": "boolean"}}}
+        },
+        {
+            "name": "inspect_container",
+            "description": "Get detailed info about a container.",
+            "parameters": {"type": "object", "properties": {"container_id": {"type": "string"}}, "required": ["container_id"]}
+        },
+        {
+            "name": "get_logs",
+            "description": "Get logs from a container.",
+            "parameters": {"type": "object", "properties": {"container_id": {"type": "string"}, "tail": {"type": "integer"}}, "required": ["container_id"]}
+        },
+    ],
+    "brave": [
+        {
+            "name": "brave_web_search",
+            "description": "Search the internet for information.",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+    ],
+    "duckduckgo": [
+        {
+            "name": "search",
+            "description": "Search the web using DuckDuckGo (privacy-focused).",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+    ],
+    "wikipedia": [
+        {
+            "name": "search",
+            "description": "Search Wikipedia for factual information.",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+    ],
+    "paper_search": [
+        {
+            "name": "search_papers",
+            "description": "Search academic papers from ArXiv, PubMed, and other sources.",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+    ],
+    "github": [
+        {
+            "name": "search_repositories",
+            "description": "Search for GitHub repositories.",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+    ],
+    "youtube": [
+        {
+            "name": "get_transcript",
+            "description": "Get the transcript of a YouTube video.",
+            "parameters": {"type": "object", "properties": {"url": {"type": "string"}}, "required": ["url"]}
+        },
+    ],
+    "playwright": [
+        {
+            "name": "playwright_navigate",
+            "description": "Navigate to a URL in a browser.",
+            "parameters": {"type": "object", "properties": {"url": {"type": "string"}}, "required": ["url"]}
+        },
+        {
+            "name": "playwright_screenshot",
+            "description": "Take a screenshot of the current page.",
+            "parameters": {"type": "object", "properties": {}}
+        },
+        {
+            "name": "playwright_get_content",
+            "description": "Get the text content of the current page.",
+            "parameters": {"type": "object", "properties": {}}
+        },
+    ],
+    "sqlite": [
+        {
+            "name": "query_database",
+            "description": "Execute SQL queries on SQLite databases using natural language.",
+            "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        },
+        {
+            "name": "create_table",
+            "description": "Create a new table in the database.",
+            "parameters": {"type": "object", "properties": {"table_name": {"type": "string"}, "schema": {"type": "string"}}, "required": ["table_name", "schema"]}
+        },
+    ],
+}
+
+
+def to_tool_schema(mcp_tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts an MCP `tools/list` entry to the schema format used by our prompts."""
+    return {
+        "name": mcp_tool["name"],
+        "description": mcp_tool.get("description", ""),
+        "parameters": mcp_tool.get("inputSchema") or {"type": "object", "properties": {}},
+    }
+
+
+class ToolCatalog:
+    """
+    On-disk cache of each server's `tools/list` result.
+    Entries are valid while they are younger than `ttl` and the catalog's version
+    hash (server commands + launcher script mtimes) still matches the config.
+    """
+
+    def __init__(self, servers: Dict[str, List[str]], path: str = None, ttl: float = DEFAULT_TTL):
+        self.servers = servers
+        self.path = path or os.getenv("JARVIS_MCP_CATALOG", DEFAULT_CATALOG_PATH)
+        self.ttl = ttl
+        self.version = self._compute_version()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _compute_version(self) -> str:
+        """Hashes the server config so edits to a launcher invalidate its cached tools."""
+        digest = hashlib.sha256()
+        for name in sorted(self.servers):
+            command = self.servers[name]
+            digest.update(json.dumps([name, command]).encode())
+            try:
+                stat = os.stat(command[0])
+                digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+            except OSError:
+                digest.update(b"missing")
+        return digest.hexdigest()[:16]
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"⚠️ Tool Catalog: Ignoring unreadable catalog {self.path}: {e}")
+            return
+
+        if data.get("version") != self.version:
+            logging.info("🔄 Tool Catalog: Server config changed. Catalog invalidated.")
+            return
+        self.entries = data.get("servers", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": self.version, "servers": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, server_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns cached tools for a server, or None if missing/expired."""
+        entry = self.entries.get(server_name)
+        if not entry or time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry["tools"]
+
+    def put(self, server_name: str, tools: List[Dict[str, Any]]):
+        self.entries[server_name] = {"fetched_at": time.time(), "tools": tools}
+
+    def stale_servers(self) -> List[str]:
+        return [name for name in self.servers if self.get(name) is None]
@@ -0,0 +1,242 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import wave
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterator, Optional
+
+from vision_agent.modules.sentence_chunker import split_sentences
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/jarvis/tts")
+MEMORY_ENTRIES = 128     # WAVs kept in RAM
+DISK_ENTRIES = 4000      # WAVs kept on disk (oldest pruned at startup)
+
+# Short confirmations the agent says constantly; synthesized once at startup.
+COMMON_PHRASES = [
+    "Done.", "Yes?", "I am listening.", "Sleeping.", "Going to sleep.", "Clicking.",
+    "Analyzing screen...", "Looking at you...",
+    "Turning on the TV.", "Turning off the TV.", "Turning up the volume.", "Turning down the volume.",
+]
+
+
+def voice_id(neural_voice) -> Optional[str]:
+    """
+    Identifies the voice/model so a voice change never serves stale audio.
+    Model files count with their mtime, so retraining in place also invalidates.
+    None if the engine exposes nothing that tells voices apart.
+    """
+    parts = []
+    for attr in ("voice", "voice_name", "model_name", "speaker"):
+        value = getattr(neural_voice, attr, None)
+        if isinstance(value, (str, int)):
+            parts.append(f"{attr}={value}")
+    for attr in ("model_path", "config_path"):
+        value = getattr(neural_voice, attr, None)
+        if isinstance(value, str):
+            try:
+                mtime = os.path.getmtime(value)
+            except OSError:
+                mtime = None
+            parts.append(f"{attr}={value}@{mtime}")
+    return f"{type(neural_voice).__name__}:{','.join(parts)}" if parts else None
+
+
+class PlaybackInterrupted(Exception):
+    """Local playback failed part-way; `remaining` is the text that wasn't played."""
+
+    def __init__(self, remaining: str, cause: Exception):
+        super().__init__(f"Playback interrupted: {cause}")
+        self.remaining = remaining
+
+
+class TTSCache:
+    """
+    Synthesized-speech cache in front of NeuralVoice.
+
+    Text is synthesized sentence by sentence, and each sentence's WAV is cached
+    in memory and on disk under a hash of (voice, text). Fixed confirmations
+    are therefore synthesized once ever, and a long reply only pays for the
+    sentences it hasn't said before. Sentences are joined into one WAV for
+    callers that need a single clip.
+
+    The voice comes from `voice`, JARVIS_TTS_VOICE, or the engine's own
+    attributes. If none identifies it, clips are cached in memory only: a
+    disk entry could outlive a voice change.
+    """
+
+    def __init__(self, neural_voice, cache_dir: str = None, voice: str = None):
+        self.neural_voice = neural_voice
+        self.voice = voice or os.getenv("JARVIS_TTS_VOICE") or voice_id(neural_voice)
+        self.persistent = self.voice is not None
+        if not self.persistent:
+            logging.warning("⚠️ TTS Cache: Can't identify the voice (set JARVIS_TTS_VOICE). Caching in memory only.")
+            self.voice = "unidentified"
+        self.cache_dir = cache_dir or os.getenv("JARVIS_TTS_CACHE", DEFAULT_CACHE_DIR)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._synth_lock = threading.Lock()  # The TTS model isn't assumed to be thread-safe
+        self.hits = 0
+        self.misses = 0
+        if self.persistent:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._prune_disk()
+
+    def _key(self, text: str) -> str:
+        normalized = re.sub(r"\s+", " ", text).strip()
+        return hashlib.sha1(f"{self.voice}\0{normalized}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _prune_disk(self):
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".wav")]
+        except OSError:
+            return
+        if len(entries) <= DISK_ENTRIES:
+            return
+        entries.sort(key=lambda e: e.stat().st_atime)
+        for entry in entries[:len(entries) - DISK_ENTRIES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _remember(self, key: str, wav: bytes):
+        with self._lock:
+            self._memory[key] = wav
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _render(self, text: str) -> Optional[bytes]:
+        import soundfile as sf
+        with self._synth_lock:
+            samples, rate = self.neural_voice.generate_audio(text)
+        if samples is None:
+            return None
+        buffer = io.BytesIO()
+        sf.write(buffer, samples, rate, format='WAV', subtype='PCM_16')
+        return buffer.getvalue()
+
+    def sentence_wav(self, sentence: str) -> Optional[bytes]:
+        """WAV bytes for one sentence, synthesized only on a cache miss."""
+        key = self._key(sentence)
+        with self._lock:
+            wav = self._memory.get(key)
+            if wav is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return wav
+
+        wav = self._read_disk(key)
+        if wav is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            wav = self._render(sentence)
+            if wav is None:
+                return None
+            self._write_disk(key, wav)
+        self._remember(key, wav)
+        return wav
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.persistent:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, wav: bytes):
+        if not self.persistent:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(wav)
+        os.replace(tmp_path, path)
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        """One WAV per sentence, each yielded as soon as it is ready."""
+        for sentence in split_sentences(text):
+            wav = self.sentence_wav(sentence)
+            if wav is not None:
+                yield wav
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        """Whole text as a single WAV, assembled from cached sentence clips."""
+        clips = list(self.stream(text))
+        if not clips:
+            return None
+        if len(clips) == 1:
+            return clips[0]
+        return join_wavs(clips)
+
+    def play(self, text: str) -> bool:
+        """
+        Plays text locally from cached sentence clips; the next sentence is
+        synthesized while the current one plays. False (nothing played) when
+        sounddevice isn't installed, so the caller can fall back to NeuralVoice.
+        Raises PlaybackInterrupted with the unplayed text if it fails part-way.
+        """
+        try:
+            import sounddevice as sd
+            import soundfile as sf
+        except ImportError:
+            return False
+        sentences = split_sentences(text)
+        started = 0  # Sentences handed to the device so far
+        try:
+            for sentence in sentences:
+                wav = self.sentence_wav(sentence)
+                if wav is not None:
+                    samples, rate = sf.read(io.BytesIO(wav))
+                    sd.wait()
+                    sd.play(samples, rate)
+                started += 1
+            sd.wait()
+        except Exception as e:
+            if started == 0:
+                raise
+            try:
+                sd.wait()  # Let the clip already on the device finish
+                resume = started
+            except Exception:
+                resume = started - 1  # The device failed mid-clip; say that sentence again
+            raise PlaybackInterrupted(" ".join(sentences[resume:]), e) from e
+        return True
+
+    def prewarm(self, phrases: List[str] = None):
+        """Synthesizes the common confirmations in the background."""
+        def _warm():
+            for phrase in phrases or COMMON_PHRASES:
+                try:
+                    self.sentence_wav(phrase)
+                except Exception as e:
+                    logging.warning(f"⚠️ TTS Cache: Prewarm failed for '{phrase}': {e}")
+                    return
+            logging.info(f"🔥 TTS Cache: {len(phrases or COMMON_PHRASES)} common phrases ready.")
+        threading.Thread(target=_warm, daemon=True, name="tts-prewarm").start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"voice": self.voice, "persistent": self.persistent, "hits": self.hits, "misses": self.misses, "in_memory": len(self._memory)}
+
+
+def join_wavs(clips: List[bytes]) -> bytes:
+    """Concatenates PCM WAV clips that share a format."""
+    out = io.BytesIO()
+    writer = None
+    for clip in clips:
+        with wave.open(io.BytesIO(clip), "rb") as reader:
+            if writer is None:
+                writer = wave.open(out, "wb")
+                writer.setparams(reader.getparams())
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    writer.close()
+    return out.getvalue()
@@ -0,0 +1,246 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+DEFAULT_INDEX_DIR = os.path.expanduser("~/.cache/jarvis/vault_index")
+RESCAN_INTERVAL = 15  # Seconds between mtime rescans when watchdog isn't installed
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+
+def _is_hidden(rel_path: str) -> bool:
+    """True for anything under a dot-directory (.obsidian, .trash) or a dotfile."""
+    return any(part.startswith(".") for part in rel_path.split(os.sep))
+
+
+class _VaultEventHandler(FileSystemEventHandler):
+    def __init__(self, index: "VaultIndex"):
+        self.index = index
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.index.update_file(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.index.update_file(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.index.remove_file(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.index.remove_file(event.src_path)
+            self.index.update_file(event.dest_path)
+
+
+class VaultIndex:
+    """
+    Persistent full-text index of an Obsidian vault (SQLite FTS5).
+
+    Notes are re-read only when their mtime/size changes: on startup, on
+    watchdog events if available, otherwise by a throttled stat-only rescan
+    before queries. Titles are also kept in memory for O(1) lookup.
+    """
+
+    def __init__(self, vault_path: str, db_path: str = None, watch: bool = True):
+        self.vault_path = os.path.abspath(vault_path)
+        vault_hash = hashlib.sha1(self.vault_path.encode()).hexdigest()[:12]
+        self.db_path = db_path or os.path.join(os.getenv("JARVIS_VAULT_INDEX_DIR", DEFAULT_INDEX_DIR), f"{vault_hash}.db")
+        self.titles: Dict[str, Set[str]] = {}  # lowercased title -> relative paths (same-named notes in different folders)
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._last_scan = 0.0
+        self._observer = None
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, tokenize='porter unicode61');
+        """)
+        for path, title in self._db.execute("SELECT path, title FROM notes"):
+            self.titles.setdefault(title.lower(), set()).add(path)
+
+        # First sync may read the whole vault; don't block startup on it.
+        threading.Thread(target=self._initial_sync, args=(watch,), daemon=True).start()
+
+    def _initial_sync(self, watch: bool):
+        try:
+            self.sync()
+        except Exception as e:
+            logging.error(f"❌ Vault Index: Initial sync failed: {e}")
+        finally:
+            self._ready.set()
+
+        if watch and WATCHDOG_AVAILABLE:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_VaultEventHandler(self), self.vault_path, recursive=True)
+                self._observer.daemon = True
+                self._observer.start()
+                logging.info("👀 Vault Index: Watching vault for changes.")
+            except Exception as e:
+                logging.warning(f"⚠️ Vault Index: File watcher unavailable ({e}). Falling back to rescans.")
+                self._observer = None
+
+    # --- Indexing ---
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.vault_path)
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        """Stat-only walk of the vault: relative path -> (mtime, size)."""
+        found = {}
+        stack = [self.vault_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue  # .obsidian, .trash
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".md"):
+                            stat = entry.stat()
+                            found[self._relative(entry.path)] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                continue
+        return found
+
+    def sync(self):
+        """Brings the index up to date with the vault, re-reading only changed notes."""
+        start = time.time()
+        on_disk = self._scan()
+        with self._lock:
+            indexed = {path: (mtime, size) for path, mtime, size in self._db.execute("SELECT path, mtime, size FROM notes")}
+            changed = [p for p, meta in on_disk.items() if indexed.get(p) != meta]
+            removed = [p for p in indexed if p not in on_disk]
+            for path in removed:
+                self._delete(path)
+            for path in changed:
+                self._index(path, *on_disk[path])
+            self._db.commit()
+            self._last_scan = time.time()
+        if changed or removed:
+            logging.info(f"📓 Vault Index: {len(changed)} updated, {len(removed)} removed in {time.time() - start:.2f}s ({len(on_disk)} notes)")
+
+    def _index(self, rel_path: str, mtime: float, size: int):
+        try:
+            with open(os.path.join(self.vault_path, rel_path), "r", errors="ignore") as f:
+                content = f.read()
+        except OSError:
+            return
+        title = os.path.splitext(os.path.basename(rel_path))[0]
+        row = self._db.execute("SELECT id FROM notes WHERE path = ?", (rel_path,)).fetchone()
+        if row:
+            self._db.execute("UPDATE notes SET title = ?, mtime = ?, size = ? WHERE id = ?", (title, mtime, size, row[0]))
+            self._db.execute("DELETE FROM notes_fts WHERE rowid = ?", (row[0],))
+            note_id = row[0]
+        else:
+            note_id = self._db.execute(
+                "INSERT INTO notes (path, title, mtime, size) VALUES (?, ?, ?, ?)", (rel_path, title, mtime, size)
+            ).lastrowid
+        self._db.execute("INSERT INTO notes_fts (rowid, title, content) VALUES (?, ?, ?)", (note_id, title, content))
+        self.titles.setdefault(title.lower(), set()).add(rel_path)
+
+    def _delete(self, rel_path: str):
+        row = self._db.execute("SELECT id, title FROM notes WHERE path = ?", (rel_path,)).fetchone()
+        if not row:
+            return
+        self._db.execute("DELETE FROM notes_fts WHERE rowid = ?", (row[0],))
+        self._db.execute("DELETE FROM notes WHERE id = ?", (row[0],))
+        paths = self.titles.get(row[1].lower())
+        if paths is not None:
+            paths.discard(rel_path)
+            if not paths:
+                del self.titles[row[1].lower()]
+
+    def update_file(self, path: str):
+        """Re-indexes a single note (called after our own writes and by the watcher)."""
+        rel_path = self._relative(path)
+        if not path.endswith(".md") or _is_hidden(rel_path):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return self.remove_file(path)
+        with self._lock:
+            self._index(rel_path, stat.st_mtime, stat.st_size)
+            self._db.commit()
+
+    def remove_file(self, path: str):
+        with self._lock:
+            self._delete(self._relative(path))
+            self._db.commit()
+
+    def _ensure_fresh(self):
+        self._ready.wait()
+        if self._observer is None and time.time() - self._last_scan > RESCAN_INTERVAL:
+            self.sync()
+
+    # --- Queries ---
+
+    def find(self, title: str, fuzzy: bool = True) -> Optional[str]:
+        """Absolute path of the note with this title (exact match first, then substring)."""
+        self._ensure_fresh()
+        key = title.lower().strip()
+        if key.endswith(".md"):
+            key = key[:-3]
+        with self._lock:
+            paths = self.titles.get(key)
+            if not paths and fuzzy and key:
+                matches = sorted((t for t in self.titles if key in t), key=len)
+                paths = self.titles[matches[0]] if matches else None
+            # Same-named notes in different folders: prefer the shallowest, then alphabetical.
+            rel_path = min(paths, key=lambda p: (p.count(os.sep), p)) if paths else None
+        return os.path.join(self.vault_path, rel_path) if rel_path else None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """BM25-ranked notes matching all query terms (any term if none match all)."""
+        self._ensure_fresh()
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+
+        with self._lock:
+            for joiner in (" AND ", " OR "):
+                match = joiner.join(f'"{t}"' for t in terms)
+                rows = self._db.execute(
+                    """
+                    SELECT notes.path, notes.title, snippet(notes_fts, 1, '**', '**', '…', 12)
+                    FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+                    WHERE notes_fts MATCH ?
+                    ORDER BY bm25(notes_fts, 5.0, 1.0)
+                    LIMIT ?
+                    """,
+                    (match, limit),
+                ).fetchall()
+                if rows or len(terms) == 1:
+                    break
+
+        return [{"path": path, "title": title, "snippet": " ".join(snippet.split())} for path, title, snippet in rows]
+
+    def close(self):
+        if self._observer:
+            self._observer.stop()
+        with self._lock:
+            self._db.close()
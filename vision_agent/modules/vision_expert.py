@@ -1,9 +1,20 @@
 import logging
-import ollama
+from vision_agent.modules import llm_gateway
 import cv2
 import base64
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from vision_agent.modules.camera_service import CameraService
+from vision_agent.modules import image_utils
+
+DETAIL_PROMPT = "Describe everything you see in this image in extreme detail."
+CACHE_SIZE = 128
+CACHE_TTL = 600           # Seconds a description stays valid
+CACHE_DISTANCE = 3        # Max differing dHash bits to reuse a description (near_duplicate lookups only)
 
 class VisionExpert:
     def __init__(self):
@@ -11,60 +22,127 @@ class VisionExpert:
         self.analysis_model = "llama3.1" # For deeper reasoning about the image
         self.webcam_path = "webcam_input.jpg"
         self.screenshot_path = "vision_input.png"
+        # (prompt, dhash, content digest) -> (timestamp, description), LRU order
+        self._descriptions = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def capture_webcam(self) -> str:
-        """Captures an image from the webcam."""
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        """Captures an image from the shared webcam service."""
+        frame = CameraService.get().latest_frame()
+        if frame is None:
             return None
-        
-        ret, frame = cap.read()
-        cap.release()
-        
-        if ret:
-            cv2.imwrite(self.webcam_path, frame)
-            return self.webcam_path
+        cv2.imwrite(self.webcam_path, frame)
+        return self.webcam_path
+
+    def preprocess(self, image, crop=None):
+        """
+        Decodes (path, bytes or frame), optionally crops to (x, y, w, h), then
+        downscales to the model's native resolution and JPEG-encodes once.
+        Bytes that are already model-ready JPEG (see_screen/see_webcam) pass
+        straight through. Returns (jpeg bytes, dhash).
+        """
+        if not crop and image_utils.model_ready_jpeg(image):
+            image_bytes = bytes(image)
+            return image_bytes, image_utils.dhash(image_bytes)
+        frame = image_utils.decode_image(image)
+        if frame is None:
+            raise ValueError("Could not decode image")
+        if crop:
+            x, y, w, h = crop
+            frame = frame[y:y + h, x:x + w]
+        image_bytes = image_utils.encode_frame(frame)
+        return image_bytes, image_utils.dhash(image_bytes)
+
+    def _cached_description(self, prompt, phash, digest, near_duplicate=False):
+        """
+        Exact lookups need identical image bytes: a 9x8 dHash barely moves when only
+        text changes (another file in the same editor), so screens must match exactly.
+        near_duplicate also accepts a dHash within CACHE_DISTANCE bits (webcam frames
+        are never byte-identical).
+        """
+        if phash is None:
+            return None
+        now = time.time()
+        with self._cache_lock:
+            if not near_duplicate:
+                key = (prompt, phash, digest)
+                entry = self._descriptions.get(key)
+                if entry and now - entry[0] <= CACHE_TTL:
+                    self._descriptions.move_to_end(key)
+                    return entry[1]
+                return None
+            for key in reversed(self._descriptions):
+                cached_prompt, cached_hash, _ = key
+                timestamp, description = self._descriptions[key]
+                if now - timestamp > CACHE_TTL:
+                    continue
+                if cached_prompt == prompt and image_utils.hamming(phash, cached_hash) <= CACHE_DISTANCE:
+                    self._descriptions.move_to_end(key)
+                    return description
         return None
 
-    def analyze_image(self, image_path: str, prompt: str = "Describe this image in detail.") -> str:
+    def _store_description(self, prompt, phash, digest, description):
+        if phash is None:
+            return
+        key = (prompt, phash, digest)
+        with self._cache_lock:
+            self._descriptions[key] = (time.time(), description)
+            self._descriptions.move_to_end(key)
+            while len(self._descriptions) > CACHE_SIZE:
+                self._descriptions.popitem(last=False)
+
+    def analyze_image(self, image, prompt: str = "Describe this image in detail.", crop=None,
+                      near_duplicate: bool = False) -> str:
         """
-        Analyzes an image using LLaVA.
+        Analyzes an image (path, encoded bytes or frame) using LLaVA.
+        Descriptions are cached, so the same screen asked about again skips the
+        vision model. Pass near_duplicate=True for camera frames to also reuse
+        the description of a perceptually similar frame.
         """
-        if not os.path.exists(image_path):
+        if isinstance(image, str) and not os.path.exists(image):
             return "Error: Image file not found."
-            
-        logging.info(f"👁️ Vision Expert: Analyzing {image_path} with prompt: '{prompt}'")
-        
+
         try:
-            with open(image_path, "rb") as f:
-                image_bytes = f.read()
-                
-            response = ollama.generate(model=self.model, prompt=prompt, images=[image_bytes])
+            image_bytes, phash = self.preprocess(image, crop)
+            digest = hashlib.sha1(image_bytes).hexdigest()
+            description = self._cached_description(prompt, phash, digest, near_duplicate)
+            if description is not None:
+                self.cache_hits += 1
+                logging.info(f"👁️ Vision Expert: Reusing cached description ({phash:016x}).")
+                return description
+            self.cache_misses += 1
+
+            logging.info(f"👁️ Vision Expert: Analyzing image with prompt: '{prompt}'")
+            response = llm_gateway.generate(model=self.model, prompt=prompt, images=[image_bytes])
             description = response['response']
-            
+            self._store_description(prompt, phash, digest, description)
+
             return description
         except Exception as e:
             return f"Error analyzing image: {str(e)}"
 
-    def deep_analysis(self, image_path: str, question: str) -> str:
+    def deep_analysis(self, image, question: str, crop=None, near_duplicate: bool = False) -> str:
         """
         Performs a two-step analysis: LLaVA describes -> Llama reasons.
+        The description step is cached, so follow-up questions only pay for the reasoning.
         """
         # Step 1: See
-        description = self.analyze_image(image_path, "Describe everything you see in this image in extreme detail.")
-        
+        description = self.analyze_image(image, DETAIL_PROMPT, crop, near_duplicate)
+
         # Step 2: Think
         prompt = f"""
         You are The Vision Expert.
-        
+
         IMAGE DESCRIPTION:
         {description}
-        
+
         USER QUESTION:
         "{question}"
-        
+
         Based on the description, answer the user's question.
         """
-        
-        response = ollama.chat(model=self.analysis_model, messages=[{'role': 'user', 'content': prompt}])
+
+        response = llm_gateway.chat(model=self.analysis_model, messages=[{'role': 'user', 'content': prompt}])
         return response['message']['content']
@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any
+
+from vision_agent.modules.image_utils import dhash, hamming
+
+DEFAULT_HISTORY_DIR = "vision_history"
+MAX_BYTES = int(os.getenv("JARVIS_VISION_HISTORY_MB", "500")) * 1024 * 1024
+MAX_AGE_DAYS = int(os.getenv("JARVIS_VISION_HISTORY_DAYS", "30"))
+DUPLICATE_DISTANCE = 4   # Max differing dHash bits for two frames to count as the same scene
+RECENT_HASHES = 256      # Hashes kept in memory for near-duplicate checks
+PRUNE_EVERY = 50         # Captures between retention passes
+
+_STOP = object()
+
+
+def _to_sql(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _from_sql(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class VisionHistory:
+    """
+    Content-addressed store for screen and webcam captures.
+
+    Each unique image is written once under objects/<sha[:2]>/<sha>.jpg; frames whose
+    perceptual hash is within DUPLICATE_DISTANCE bits of a recent capture are
+    recorded as another sighting of that image instead of a new file. Metadata
+    lives in SQLite, and old images are pruned to stay within a size and age
+    budget. add() only enqueues: hashing and disk I/O happen on a writer thread.
+    """
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR, max_bytes: int = MAX_BYTES, max_age_days: int = MAX_AGE_DAYS,
+                 max_pending: int = 32):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.stored = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.pruned = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._recent: deque = deque(maxlen=RECENT_HASHES)  # (dhash, sha256)
+        self._since_prune = PRUNE_EVERY  # Prune on the first capture after startup
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS images (
+                sha256 TEXT PRIMARY KEY,
+                dhash INTEGER,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                sightings INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS captures (
+                id INTEGER PRIMARY KEY,
+                sha256 TEXT NOT NULL REFERENCES images(sha256),
+                source TEXT NOT NULL,
+                timestamp REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_images_last_seen ON images(last_seen);
+            CREATE INDEX IF NOT EXISTS idx_captures_sha ON captures(sha256);
+        """)
+        rows = self._db.execute(
+            "SELECT dhash, sha256 FROM images WHERE dhash IS NOT NULL ORDER BY last_seen DESC LIMIT ?", (RECENT_HASHES,)
+        ).fetchall()
+        for value, sha in reversed(rows):
+            self._recent.append((_from_sql(value), sha))
+
+        self._worker = threading.Thread(target=self._run, daemon=True, name="vision-history")
+        self._worker.start()
+
+    # --- Producer side (never blocks) ---
+
+    def add(self, image_bytes: bytes, source: str):
+        item = (image_bytes, source, time.time())
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    # --- Worker side ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            try:
+                with self._lock:
+                    self._store(*item)
+                self._since_prune += 1
+                if self._since_prune >= PRUNE_EVERY:
+                    self.prune()
+                    self._since_prune = 0
+            except Exception as e:
+                logging.error(f"❌ Vision History: Failed to store capture: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _store(self, image_bytes: bytes, source: str, timestamp: float):
+        sha = hashlib.sha256(image_bytes).hexdigest()
+        known = self._db.execute("SELECT 1 FROM images WHERE sha256 = ?", (sha,)).fetchone()
+        value = None
+        if not known:
+            value = dhash(image_bytes)
+            if value is not None:
+                for seen_value, seen_sha in reversed(self._recent):
+                    if hamming(value, seen_value) <= DUPLICATE_DISTANCE:
+                        sha, known = seen_sha, True
+                        break
+
+        if known:
+            self._db.execute("UPDATE images SET last_seen = ?, sightings = sightings + 1 WHERE sha256 = ?", (timestamp, sha))
+            self.deduplicated += 1
+        else:
+            path = os.path.join(self.objects_dir, sha[:2], f"{sha}.jpg")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(image_bytes)
+            self._db.execute(
+                "INSERT INTO images (sha256, dhash, path, size, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                (sha, _to_sql(value) if value is not None else None, path, len(image_bytes), timestamp, timestamp),
+            )
+            if value is not None:
+                self._recent.append((value, sha))
+            self.stored += 1
+        self._db.execute("INSERT INTO captures (sha256, source, timestamp) VALUES (?, ?, ?)", (sha, source, timestamp))
+        self._db.commit()
+
+    def prune(self):
+        """Drops images older than the age budget, then least recently seen ones until under the size budget."""
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        cutoff = time.time() - self.max_age
+        doomed = [row[0] for row in self._db.execute("SELECT sha256 FROM images WHERE last_seen < ?", (cutoff,))]
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM images WHERE last_seen >= ?", (cutoff,)).fetchone()[0]
+        if total > self.max_bytes:
+            for sha, size in self._db.execute("SELECT sha256, size FROM images WHERE last_seen >= ? ORDER BY last_seen", (cutoff,)):
+                if total <= self.max_bytes:
+                    break
+                doomed.append(sha)
+                total -= size
+        if not doomed:
+            return
+
+        for sha in doomed:
+            row = self._db.execute("SELECT path FROM images WHERE sha256 = ?", (sha,)).fetchone()
+            if row:
+                try:
+                    os.remove(row[0])
+                except FileNotFoundError:
+                    pass
+            self._db.execute("DELETE FROM captures WHERE sha256 = ?", (sha,))
+            self._db.execute("DELETE FROM images WHERE sha256 = ?", (sha,))
+        self._db.commit()
+        doomed_set = set(doomed)
+        self._recent = deque(((v, s) for v, s in self._recent if s not in doomed_set), maxlen=RECENT_HASHES)
+        self.pruned += len(doomed)
+        logging.info(f"🗑️ Vision History: Pruned {len(doomed)} images.")
+
+    # --- Queries ---
+
+    def recent(self, limit: int = 20, source: str = None) -> List[Dict[str, Any]]:
+        """Latest captures (newest first) with the path of the stored image."""
+        query = "SELECT captures.source, captures.timestamp, images.path FROM captures JOIN images USING (sha256)"
+        params: List[Any] = []
+        if source:
+            query += " WHERE captures.source = ?"
+            params.append(source)
+        query += " ORDER BY captures.timestamp DESC LIMIT ?"
+        params.append(limit)
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [{"source": s, "timestamp": ts, "path": p} for s, ts, p in rows]
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.02)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 5.0):
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            images, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images").fetchone()
+        return {
+            "images": images,
+            "bytes": size,
+            "pending": self._queue.qsize(),
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "pruned": self.pruned,
+        }